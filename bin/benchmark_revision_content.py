@@ -0,0 +1,78 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Compare Json text and compact storage formats of revision content.
+
+The script loads content of the latest revisions from the database, converts
+it into both formats in memory and prints their sizes and load times. The
+database is not modified.
+
+Usage:
+  python benchmark_revision_content.py [number of revisions]
+"""
+
+import json
+import sys
+import timeit
+
+import sqlalchemy as sa
+
+import ggrc.app  # noqa pylint: disable=unused-import
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.models.types import CompactJsonType
+
+
+def load_samples(limit):
+  """Load raw Json text of the latest revisions."""
+  table = all_models.Revision.__table__
+  rows = db.session.execute(
+      sa.select([
+          sa.type_coerce(table.c.content, sa.UnicodeText),
+          sa.type_coerce(table.c.content_compact, sa.LargeBinary),
+      ]).order_by(table.c.id.desc()).limit(limit)
+  )
+  samples = []
+  for text, compact in rows:
+    if text is None:
+      text = json.dumps(CompactJsonType.loads(compact))
+    samples.append(text.encode("utf-8") if isinstance(text, unicode)
+                   else text)
+  return samples
+
+
+def measure(name, func, samples, repeat=3):
+  """Print the best total time of func called for all samples."""
+  best = min(timeit.repeat(lambda: [func(sample) for sample in samples],
+                           number=1, repeat=repeat))
+  print "{:<24} {:>10.3f} ms {:>10.1f} us/revision".format(
+      name, best * 1000, best * 1000000 / len(samples))
+
+
+def run(limit=10000):
+  """Run the benchmark on the latest revisions."""
+  text_samples = load_samples(limit)
+  if not text_samples:
+    print "No revisions found"
+    return
+  compact_samples = [CompactJsonType.dumps(sample) for sample in text_samples]
+
+  text_size = sum(len(sample) for sample in text_samples)
+  compact_size = sum(len(sample) for sample in compact_samples)
+  print "Revisions:              {:>10}".format(len(text_samples))
+  print "Json text size:         {:>10} bytes".format(text_size)
+  print "Compact size:           {:>10} bytes ({:.1%})".format(
+      compact_size, float(compact_size) / text_size)
+
+  measure("Json text load", json.loads, text_samples)
+  measure("Compact load", CompactJsonType.loads, compact_samples)
+  measure("Json text single key",
+          lambda data: CompactJsonType.loads_keys(data, ["child_type"]),
+          text_samples)
+  measure("Compact single key",
+          lambda data: CompactJsonType.loads_keys(data, ["child_type"]),
+          compact_samples)
+
+
+if __name__ == "__main__":
+  run(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,299 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Materialized ACL permissions of every user.
+
+Permissions granted to a person through access control list entries are
+stored in person_acl_permissions table as a compressed blob with the
+structure {action: {object_type: IdSet(object_ids)}}. The blob is built on the
+first permissions load of the person and then maintained by ACL propagation:
+
+- ACL entries added by propagation are merged into the blobs of the people
+  mapped to their base entries.
+- Changes that can revoke permissions (removed people, deleted objects or
+  relationships, changed roles) drop only the blobs of the affected people,
+  which are rebuilt on their next permissions load.
+
+Every change of a row bumps its version. A rebuilt blob is only stored if the
+version did not change while it was being computed, so a concurrent update
+can never be overwritten by outdated data.
+"""
+
+import cPickle
+import itertools
+import zlib
+from collections import defaultdict
+
+import flask
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.utils import structures
+
+
+ACTIONS = ("read", "update", "delete")
+
+
+class PersonAclPermissions(db.Model):
+  """Db model for materialized ACL permissions of a person."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "person_acl_permissions"
+
+  MAX_BINARY_LENGTH = 16777215
+
+  person_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  version = db.Column(db.Integer, nullable=False, default=0)
+  content = db.Column(db.LargeBinary(length=MAX_BINARY_LENGTH),
+                      nullable=True)
+
+
+def _dumps(permissions):
+  return zlib.compress(cPickle.dumps(permissions, cPickle.HIGHEST_PROTOCOL))
+
+
+def _loads(content):
+  return cPickle.loads(zlib.decompress(content))
+
+
+def _acl_permissions_query(person_ids=None, min_acl_id=None):
+  """Query permissions granted by propagated ACL entries.
+
+  Args:
+    person_ids: ids of people whose permissions are queried, all people if
+      None.
+    min_acl_id: if set, only ACL entries with greater ids are queried.
+
+  Returns:
+    query of (person_id, object_type, object_id, read, update, delete) rows.
+  """
+  acl_base = db.aliased(all_models.AccessControlList, name="acl_base")
+  acl_propagated = db.aliased(all_models.AccessControlList,
+                              name="acl_propagated")
+  acr = all_models.AccessControlRole
+  acp = all_models.AccessControlPerson
+  query = db.session.query(
+      acp.person_id,
+      acl_propagated.object_type,
+      acl_propagated.object_id,
+      acr.read,
+      acr.update,
+      acr.delete,
+  ).filter(
+      acp.ac_list_id == acl_base.id,
+      acl_base.id == acl_propagated.base_id,
+      acl_propagated.ac_role_id == acr.id,
+      acl_propagated.object_type != all_models.Relationship.__name__,
+  )
+  if person_ids is not None:
+    query = query.filter(acp.person_id.in_(person_ids))
+  if min_acl_id is not None:
+    query = query.filter(acl_propagated.id > min_acl_id)
+  return query
+
+
+def get_object_ids_query(person_id, object_type, action):
+  """Query ids of objects the person has ACL permission for.
+
+  Args:
+    person_id: id of the person.
+    object_type: type of the objects.
+    action: one of ACTIONS.
+
+  Returns:
+    query of object ids.
+  """
+  acl_base = db.aliased(all_models.AccessControlList, name="acl_base")
+  acl_propagated = db.aliased(all_models.AccessControlList,
+                              name="acl_propagated")
+  acr = all_models.AccessControlRole
+  acp = all_models.AccessControlPerson
+  return db.session.query(acl_propagated.object_id).filter(
+      acp.person_id == person_id,
+      acp.ac_list_id == acl_base.id,
+      acl_base.id == acl_propagated.base_id,
+      acl_propagated.ac_role_id == acr.id,
+      acl_propagated.object_type == object_type,
+      getattr(acr, action) == sa.true(),
+  )
+
+
+def _collect(rows):
+  """Group permission rows into permissions dicts by person id."""
+  result = defaultdict(dict)
+  for person_id, object_type, object_id, read, update, delete in rows:
+    for action, allowed in zip(ACTIONS, (read, update, delete)):
+      if allowed:
+        result[person_id].setdefault(action, {})\
+            .setdefault(object_type, structures.IdSet())\
+            .add(object_id)
+  return result
+
+
+def _has_pending_acl_changes():
+  """Check if the current transaction has uncommitted ACL changes.
+
+  These are ACL related objects that are not flushed yet and the changes
+  gathered by the flush hooks, which are only handled after the commit.
+  """
+  session = db.session
+  acl_models = (all_models.AccessControlList, all_models.AccessControlPerson,
+                all_models.AccessControlRole, all_models.Relationship)
+  for obj in itertools.chain(session.new, session.dirty, session.deleted):
+    if isinstance(obj, acl_models):
+      return True
+  if not flask.has_app_context():
+    return False
+  return any(getattr(flask.g, name, None) for name in (
+      "new_acl_ids",
+      "new_relationship_ids",
+      "deleted_objects",
+      "changed_acl_person_ids",
+      "changed_acl_role_ids",
+  ))
+
+
+def get_acl_permissions(person_id):
+  """Get materialized ACL permissions of a person.
+
+  The permissions are built and stored if they are not materialized yet. The
+  store is accessed through a separate autocommit connection, so the current
+  session transaction is neither committed nor blocked.
+
+  If the current transaction has uncommitted ACL changes, the separate
+  connection can not see them. The permissions are then built in the
+  current transaction and are not stored.
+
+  Returns:
+    dict {action: {object_type: IdSet(object_ids)}}
+  """
+  if _has_pending_acl_changes():
+    rows = _acl_permissions_query([person_id]).all()
+    return _collect(rows).get(person_id, {})
+
+  table = PersonAclPermissions.__table__
+  with db.engine.connect() as connection:
+    row = connection.execute(
+        sa.select([table.c.version, table.c.content]).where(
+            table.c.person_id == person_id
+        )
+    ).first()
+    if row is not None and row.content is not None:
+      return _loads(row.content)
+
+    if row is None:
+      connection.execute(
+          table.insert().prefix_with("IGNORE"),
+          {"person_id": person_id, "version": 0, "content": None},
+      )
+      version = 0
+    else:
+      version = row.version
+    rows = connection.execute(
+        _acl_permissions_query([person_id]).statement
+    )
+    permissions = _collect(rows).get(person_id, {})
+    connection.execute(
+        table.update().where(sa.and_(
+            table.c.person_id == person_id,
+            table.c.version == version,
+        )).values(content=_dumps(permissions))
+    )
+  return permissions
+
+
+def get_last_acl_id():
+  """Get id of the last ACL entry, entries added later are new ones."""
+  return db.session.query(
+      sa.func.max(all_models.AccessControlList.id)
+  ).scalar() or 0
+
+
+def merge_new_entries(min_acl_id):
+  """Merge permissions of ACL entries added after min_acl_id.
+
+  Only the materialized blobs are updated, people without them get the new
+  entries when their blobs are built. Versions of all affected rows are
+  bumped, so a blob that is being built concurrently from data without the
+  new entries is not stored.
+
+  Returns:
+    set of ids of people whose permissions were extended.
+  """
+  new_permissions = _collect(_acl_permissions_query(min_acl_id=min_acl_id))
+  if not new_permissions:
+    return set()
+  table = PersonAclPermissions.__table__
+  rows = db.session.execute(
+      sa.select([table.c.person_id, table.c.content]).where(
+          table.c.person_id.in_(new_permissions.keys()),
+      ).with_for_update()
+  ).fetchall()
+  empty_ids = [person_id for person_id, content in rows if content is None]
+  if empty_ids:
+    db.session.execute(
+        table.update().where(
+            table.c.person_id.in_(empty_ids)
+        ).values(version=table.c.version + 1)
+    )
+  for person_id, content in rows:
+    if content is None:
+      continue
+    permissions = _loads(content)
+    for action, resources in new_permissions[person_id].iteritems():
+      for object_type, object_ids in resources.iteritems():
+        permissions.setdefault(action, {})\
+            .setdefault(object_type, structures.IdSet())\
+            .update(object_ids)
+    db.session.execute(
+        table.update().where(
+            table.c.person_id == person_id
+        ).values(content=_dumps(permissions), version=table.c.version + 1)
+    )
+  db.session.plain_commit()
+  return set(new_permissions)
+
+
+def get_affected_people(object_keys=None, role_ids=None):
+  """Get ids of people mapped to ACL entries on objects or with roles.
+
+  Args:
+    object_keys: iterable of (object_type, object_id) tuples.
+    role_ids: iterable of access control role ids.
+  """
+  acl = all_models.AccessControlList
+  acp = all_models.AccessControlPerson
+  conditions = []
+  if object_keys:
+    conditions.append(sa.tuple_(acl.object_type, acl.object_id).in_(
+        list(object_keys)))
+  if role_ids:
+    conditions.append(acl.ac_role_id.in_(list(role_ids)))
+  if not conditions:
+    return set()
+  query = db.session.query(acp.person_id).join(
+      acl, acp.ac_list_id == acl.base_id,
+  ).filter(sa.or_(*conditions)).distinct()
+  return {person_id for person_id, in query}
+
+
+def invalidate(person_ids):
+  """Drop materialized permissions of the given people."""
+  if not person_ids:
+    return
+  table = PersonAclPermissions.__table__
+  db.session.execute(
+      table.update().where(
+          table.c.person_id.in_(list(person_ids))
+      ).values(content=None, version=table.c.version + 1)
+  )
+  db.session.plain_commit()
+
+
+def invalidate_all():
+  """Drop materialized permissions of all people."""
+  table = PersonAclPermissions.__table__
+  db.session.execute(
+      table.update().values(content=None, version=table.c.version + 1)
+  )
+  db.session.plain_commit()
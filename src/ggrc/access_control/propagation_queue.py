@@ -0,0 +1,266 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Deferred ACL propagation queue.
+
+If ACL_DEFERRED_PROPAGATION setting is enabled, new ACL entries and new
+relationships are not propagated inside the committing request. Their ids
+are committed into acl_propagation_queue table together with the object
+changes and the queue is drained later in separately committed chunks.
+
+Revoking changes (removed people, deleted objects, changed roles) are still
+handled inside the committing request, only the propagation of new entries
+is deferred.
+
+Queued entries are processed by a worker that runs every minute. Before a
+request of a user runs, the queued entries that can change permissions of
+that user are propagated: entries queued by the user, new ACL entries with
+the user and relationships of objects the user has ACL entries on. So users
+always see their own changes and the access they were given, while other
+requests do not pay for the propagation.
+
+Workers and requests claim the rows they process, so concurrent requests
+do not propagate the same entries twice. The only exception are the entries
+of a user that another worker has claimed when a request of the user starts.
+The request propagates them again without waiting for the worker, which is
+safe as propagated ACL entries are inserted with INSERT IGNORE.
+"""
+
+import datetime
+import logging
+from collections import Counter, defaultdict
+
+import flask
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import login
+from ggrc import settings
+from ggrc.cache import utils as cache_utils
+from ggrc.models import all_models
+from ggrc.models.mixins.claimable import Claimable
+from ggrc.utils import benchmark
+
+
+logger = logging.getLogger(__name__)
+
+DRAIN_CHUNK_SIZE = 500
+
+
+class AclPropagationQueue(Claimable, db.Model):
+  """Db model for ACL entries and relationships waiting for propagation."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "acl_propagation_queue"
+
+  id = db.Column(db.Integer, primary_key=True)  # noqa
+  object_type = db.Column(db.String(64), nullable=False)
+  object_id = db.Column(db.Integer, nullable=False)
+  modified_by_id = db.Column(db.Integer, nullable=True)
+  created_at = db.Column(db.DateTime, nullable=False)
+
+  __table_args__ = (
+      db.Index("ix_acl_propagation_queue_object", "object_type", "object_id"),
+      db.Index("ix_acl_propagation_queue_modified_by_id", "modified_by_id"),
+  )
+
+
+def is_enabled():
+  return bool(getattr(settings, "ACL_DEFERRED_PROPAGATION", False))
+
+
+def enqueue_pending():
+  """Move ids gathered for propagation in flask.g into the queue.
+
+  The rows are inserted into the current transaction, so they are committed
+  together with the changes that caused them.
+  """
+  if not flask.has_app_context():
+    return
+  user_id = login.get_current_user_id()
+  now = datetime.datetime.utcnow()
+  values = []
+  for name, model in (("new_acl_ids", all_models.AccessControlList),
+                      ("new_relationship_ids", all_models.Relationship)):
+    ids = getattr(flask.g, name, None)
+    if not ids:
+      continue
+    values.extend(
+        {
+            "object_type": model.__name__,
+            "object_id": object_id,
+            "modified_by_id": user_id,
+            "created_at": now,
+        }
+        for object_id in ids
+    )
+    setattr(flask.g, name, set())
+  if values:
+    db.session.execute(AclPropagationQueue.__table__.insert(), values)
+
+
+def _query_entries(*criteria):
+  """Get queued entries matching the criteria."""
+  return db.session.query(
+      AclPropagationQueue.object_type,
+      AclPropagationQueue.object_id,
+      AclPropagationQueue.modified_by_id,
+  ).filter(*criteria).all()
+
+
+def _propagate_rows(rows):
+  """Propagate queued entries on behalf of the users who queued them.
+
+  Returns:
+    number of propagated ACL entries.
+  """
+  from ggrc.models.hooks.acl import propagation
+  entries = defaultdict(lambda: defaultdict(set))
+  for row in rows:
+    entries[row.modified_by_id][row.object_type].add(row.object_id)
+  propagated = 0
+  for user_id, ids in entries.iteritems():
+    count, person_ids = propagation.propagate_entries(
+        ids[all_models.AccessControlList.__name__],
+        ids[all_models.Relationship.__name__],
+        user_id,
+    )
+    cache_utils.clear_users_permission_cache(person_ids)
+    propagated += count
+  return propagated
+
+
+def _propagate_chunk(token):
+  """Propagate queued entries claimed with the token and remove them.
+
+  Returns:
+    tuple of the number of processed queue entries and the number of
+    propagated ACL entries.
+  """
+  rows = _query_entries(AclPropagationQueue.claimed_by == token)
+  try:
+    propagated = _propagate_rows(rows)
+  except Exception:
+    db.session.rollback()
+    AclPropagationQueue.release(token)
+    raise
+  AclPropagationQueue.delete_claimed(token)
+  db.session.plain_commit()
+  return len(rows), propagated
+
+
+def _affecting_user(user_id):
+  """Get filter of queued entries that can change permissions of the user.
+
+  These are the entries queued by the user, new ACL entries with the user
+  and new relationships of objects the user has ACL entries on. Relationship
+  endpoints are checked per queued row, as the queue is much smaller than
+  the sets of objects of users.
+  """
+  acl = all_models.AccessControlList
+  acp = all_models.AccessControlPerson
+  relationship = all_models.Relationship
+  user_acl_ids = db.session.query(acp.ac_list_id).filter(
+      acp.person_id == user_id,
+  )
+
+  def user_has_acl_on(type_column, id_column):
+    return sa.exists().where(sa.and_(
+        relationship.id == AclPropagationQueue.object_id,
+        acl.object_type == type_column,
+        acl.object_id == id_column,
+        acp.ac_list_id == acl.base_id,
+        acp.person_id == user_id,
+    ))
+
+  return sa.or_(
+      AclPropagationQueue.modified_by_id == user_id,
+      sa.and_(
+          AclPropagationQueue.object_type == acl.__name__,
+          AclPropagationQueue.object_id.in_(user_acl_ids),
+      ),
+      sa.and_(
+          AclPropagationQueue.object_type == relationship.__name__,
+          sa.or_(
+              user_has_acl_on(relationship.source_type,
+                              relationship.source_id),
+              user_has_acl_on(relationship.destination_type,
+                              relationship.destination_id),
+          ),
+      ),
+  )
+
+
+def drain(user_id=None, chunk_size=DRAIN_CHUNK_SIZE):
+  """Propagate queued entries.
+
+  Args:
+    user_id: if set, only the entries that can change permissions of this
+      user are propagated, otherwise the whole queue is drained.
+    chunk_size: number of queue entries propagated and committed at once.
+
+  Returns:
+    Counter with the number of "queued" entries processed and the number of
+    "propagated" ACL entries.
+  """
+  query = db.session.query(AclPropagationQueue.id)
+  if user_id is not None:
+    query = query.filter(_affecting_user(user_id))
+
+  stats = Counter()
+  with benchmark("Drain ACL propagation queue"):
+    while True:
+      token = AclPropagationQueue.claim(query, chunk_size)
+      if token is None:
+        break
+      queued, propagated = _propagate_chunk(token)
+      stats["queued"] += queued
+      stats["propagated"] += propagated
+  if stats["queued"]:
+    logger.info("ACL propagation queue drained: %s entries, propagated: %s",
+                stats["queued"], stats["propagated"])
+  return stats
+
+
+def _propagate_claimed(user_id):
+  """Propagate entries of the user that are claimed by other workers.
+
+  The entries are left in the queue for the workers that claimed them.
+
+  Returns:
+    number of propagated ACL entries.
+  """
+  rows = _query_entries(
+      _affecting_user(user_id),
+      AclPropagationQueue.claimed_by.isnot(None),
+  )
+  if not rows:
+    return 0
+  with benchmark("Propagate ACL entries claimed by other workers"):
+    propagated = _propagate_rows(rows)
+    db.session.plain_commit()
+  return propagated
+
+
+def drain_for_read():
+  """Propagate queued entries that can change permissions of the user.
+
+  Entries that other workers are processing right now, or that are left
+  claimed by a failed worker, are propagated as well, so the request never
+  reads permissions without them.
+  """
+  if not is_enabled():
+    return
+  user_id = login.get_current_user_id()
+  if user_id is None:
+    return
+  drain(user_id=user_id)
+  _propagate_claimed(user_id)
+
+
+def process_queue():
+  """Worker job that drains the whole queue.
+
+  Chunked imports queue their entries even if deferred propagation is
+  disabled, so the queue is drained regardless of the setting.
+  """
+  drain()
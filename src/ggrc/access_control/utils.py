@@ -8,13 +8,14 @@ This package should have the single hook that should handle all acl propagation
 and deletion.
 """
 
+import contextlib
 import logging
 
 import sqlalchemy as sa
 
 from ggrc import db
+from ggrc.cache import data_version
 from ggrc.models import all_models
-from ggrc import utils
 
 logger = logging.getLogger(__name__)
 
@@ -22,8 +23,61 @@ logger = logging.getLogger(__name__)
 PROPAGATION_RETRIES = 10
 
 
+# binlog_format of the database, read on first use
+_binlog_format = []
+
+
+def _is_statement_binlog():
+  """Check if the database uses statement-based binary logging.
+
+  INSERT ... SELECT can not run under READ COMMITTED with statement-based
+  binary logging (error 1665).
+  """
+  if not _binlog_format:
+    _binlog_format.append(
+        db.session.execute("SELECT @@binlog_format").scalar()
+    )
+  return _binlog_format[0] == "STATEMENT"
+
+
+@contextlib.contextmanager
+def _read_committed():
+  """Run the next transaction of the session under READ COMMITTED.
+
+  The current transaction is committed first, because the isolation level
+  of a running transaction can not be changed. The previous level of the
+  connection is restored before the transaction is committed, so the
+  connection is returned to the pool unchanged. With statement-based binary
+  logging the current isolation level is kept.
+  """
+  if _is_statement_binlog():
+    yield
+    return
+  db.session.plain_commit()
+  level = db.session.execute("SELECT @@session.tx_isolation").scalar()
+  db.session.execute(
+      "SET SESSION TRANSACTION ISOLATION LEVEL READ COMMITTED"
+  )
+  try:
+    yield
+  finally:
+    db.session.execute(
+        "SET SESSION TRANSACTION ISOLATION LEVEL {}".format(
+            level.replace("-", " ")
+        )
+    )
+
+
 def insert_select_acls(select_statement):
   """Insert acl records from the select statement
+
+  The records are inserted with a single INSERT IGNORE ... SELECT statement,
+  so they are never fetched from the database. Records that already exist
+  are skipped. Under REPEATABLE READ the statement would hold shared locks
+  on all selected rows until the commit, so it runs under READ COMMITTED,
+  where the selected rows are read without locks, unless the database uses
+  statement-based binary logging.
+
   Args:
     select_statement: sql statement that contains the following columns
       ac_role_id,
@@ -35,57 +89,45 @@ def insert_select_acls(select_statement):
       parent_id,
       parent_id_nn,
       base_id,
+  Returns:
+    number of inserted acl records.
   """
 
   acl_table = all_models.AccessControlList.__table__
-  inserter = acl_table.insert().prefix_with("IGNORE")
-
-  to_insert = db.session.execute(select_statement).fetchall()
-
-  if to_insert:
-    # TODO: investigate whether the select above sets locks on any tables
-    db.session.plain_commit()
-
-  def to_dict(record):
-    """Match selected and inserted columns."""
-    return dict(
-        zip(
-            [
-                'ac_role_id',
-                'object_id',
-                'object_type',
-                'created_at',
-                'modified_by_id',
-                'updated_at',
-                'parent_id',
-                'parent_id_nn',
-                'base_id',
-            ],
-            record,
-        ),
-    )
+  inserter = acl_table.insert().prefix_with("IGNORE").from_select(
+      [
+          'ac_role_id',
+          'object_id',
+          'object_type',
+          'created_at',
+          'modified_by_id',
+          'updated_at',
+          'parent_id',
+          'parent_id_nn',
+          'base_id',
+      ],
+      select_statement,
+  )
 
-  # process to_insert in chunks, retry failed inserts, allow maximum of
-  # PROPAGATION_RETRIES total retries
+  # retry failed inserts, allow maximum of PROPAGATION_RETRIES retries
   failures = 0
-  for chunk in utils.list_chunks(to_insert, chunk_size=10000):
-    inserted_successfully = False
-    while not inserted_successfully:
-      try:
-        db.session.execute(
-            inserter,
-            [to_dict(record) for record in chunk],
+  while True:
+    try:
+      with _read_committed():
+        inserted = db.session.execute(inserter).rowcount
+      if inserted:
+        # Propagated entries change the resources visible to users
+        data_version.mark_changed(db.session)
+      db.session.plain_commit()
+    except sa.exc.OperationalError as error:
+      failures += 1
+      if failures == PROPAGATION_RETRIES:
+        logger.critical(
+            "ACL propagation failed with %d retries on statement: \n %s",
+            failures,
+            select_statement,
         )
-        db.session.plain_commit()
-      except sa.exc.OperationalError as error:
-        failures += 1
-        if failures == PROPAGATION_RETRIES:
-          logger.critical(
-              "ACL propagation failed with %d retries on statement: \n %s",
-              failures,
-              select_statement,
-          )
-          raise
-        logger.exception(error)
-      else:
-        inserted_successfully = True
+        raise
+      logger.exception(error)
+    else:
+      return inserted
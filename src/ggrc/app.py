@@ -65,6 +65,20 @@ def _ensure_session_teardown():
     db.session.remove()
 
 
+@app.before_request
+def _propagate_queued_acl_entries():
+  """Propagate queued ACL entries before permissions of the request are used.
+
+  This runs before any other query of the request, so the whole request sees
+  the propagated entries that can change permissions of the current user.
+  """
+  if request.endpoint == "static":
+    return
+  from ggrc.access_control import propagation_queue
+  with benchmark("Propagate queued ACL entries"):
+    propagation_queue.drain_for_read()
+
+
 @app.before_request
 def setup_user_timezone_offset():
   """Setup user timezon for current request
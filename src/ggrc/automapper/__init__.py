@@ -11,6 +11,7 @@ import flask
 
 from ggrc import db
 from ggrc.automapper import rules
+from ggrc.cache import data_version
 from ggrc import login
 from ggrc.models.audit import Audit
 from ggrc.models.automapping import Automapping
@@ -145,6 +146,7 @@ class AutomapperGenerator(object):
           "is_external": False}
           for src, dst in self.auto_mappings
           if (src, dst) != original]))  # (src, dst) is sorted
+      data_version.mark_changed(db.session)
 
       self._set_audit_id_for_issues(automapping_id)
 
@@ -60,6 +60,8 @@ def get_db():  # noqa
       database.session.flush()
       if hasattr(database.session, "reindex_set"):
         database.session.reindex_set.push_ft_records()
+      from ggrc.models.hooks import acl
+      acl.before_commit()
 
   def post_commit_hooks():
     """All post commit hooks handler."""
@@ -13,6 +13,7 @@ import dateutil
 import sqlalchemy
 from sqlalchemy.ext.associationproxy import AssociationProxy
 from sqlalchemy.orm.attributes import InstrumentedAttribute
+from sqlalchemy.orm.properties import ColumnProperty
 from sqlalchemy.orm.properties import RelationshipProperty
 from werkzeug.exceptions import BadRequest
 
@@ -80,6 +81,73 @@ def publish(obj, inclusions=(), inclusion_filter=None,
   return obj
 
 
+def publish_projection(objects, fields):
+  """Publish only the requested ``fields`` of every object in the list.
+
+  Attributes that are not in ``fields`` are neither computed nor loaded, so
+  narrow field sets skip the expensive relationship and ACL serialization.
+  The result contains exactly the requested keys for every object.
+  """
+  objects_json = [publish(obj, attribute_whitelist=set(fields))
+                  for obj in objects]
+  objects_json = publish_representation(objects_json)
+  return [{f: o.get(f) for f in fields} for o in objects_json]
+
+
+def _projection_load_options(model, fields):
+  """Get query options needed to publish ``fields`` of ``model`` objects.
+
+  Returns None if any of the fields requires loading state that can not be
+  described with column or relationship loader options, in which case the
+  full ``eager_query`` of the model must be used.
+  """
+  # pylint: disable=protected-access
+  builder = get_json_builder(model)
+  publish_attrs = {getattr(attr, "attr_name", attr)
+                   for attr in builder._publish_attrs}
+  include_links = set(builder._include_links)
+  options = []
+  for field in fields:
+    if field in ("selfLink", "viewLink"):
+      continue
+    if field not in publish_attrs:
+      # Not published at all, the value is always None
+      continue
+    if field in include_links:
+      return None
+    if any(field in getattr(cls, "_custom_publish", {})
+           for cls in model.__mro__):
+      return None
+    class_attr = getattr(model, field, None)
+    if isinstance(class_attr, ggrc.builder.simple_property):
+      if field in ("id", "type"):
+        continue
+      return None
+    if not isinstance(class_attr, InstrumentedAttribute):
+      return None
+    if isinstance(class_attr.property, RelationshipProperty):
+      options.append(sqlalchemy.orm.subqueryload(field))
+    elif isinstance(class_attr.property, ColumnProperty):
+      options.append(sqlalchemy.orm.undefer(field))
+    else:
+      return None
+  return options
+
+
+def projection_query(model, fields=None):
+  """Get a query for ``model`` that loads only what ``fields`` need.
+
+  Falls back to ``model.eager_query()`` when no fields are given or when the
+  published value of some field can not be loaded selectively.
+  """
+  if not fields:
+    return model.eager_query()
+  options = _projection_load_options(model, fields)
+  if options is None:
+    return model.eager_query()
+  return db.session.query(model).options(*options)
+
+
 def update(obj, json_obj):
   """Translate the state represented by ``json_obj`` into update actions
   performed upon the model object ``obj``. After performing the update ``obj``
@@ -0,0 +1,482 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Pluggable backends of the shared cache.
+
+The backend is selected with the CACHE_BACKEND setting and every user of the
+shared cache gets its client with get_cache_client. Clients implement the
+subset of the App Engine memcache.Client api used in GGRC:
+
+  get, gets, get_multi, set, set_multi, add, add_multi, cas, cas_multi,
+  delete, delete_multi and flush_all.
+
+Available backends:
+
+  AppEngineBackend: App Engine memcache, the default one.
+  LocalBackend: bounded LRU cache with expiration inside the process. It is
+    only usable when a single process serves the requests, a second process
+    using it with the same database is rejected.
+  SocketBackend: client of a LocalBackend served by ggrc.cache.server for
+    local development with several processes. Messages are signed with
+    SECRET_KEY and unsigned messages are rejected before they are decoded.
+
+Namespaces and delete lock times are supported by App Engine memcache only,
+other backends ignore them.
+"""
+
+import cPickle
+import errno
+import fcntl
+import hashlib
+import hmac
+import itertools
+import logging
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+from google.appengine.api import memcache
+
+from ggrc import extensions
+
+
+logger = logging.getLogger(__name__)
+
+# memcache.Client.delete return values
+DELETE_ITEM_MISSING = memcache.DELETE_ITEM_MISSING
+DELETE_SUCCESSFUL = memcache.DELETE_SUCCESSFUL
+
+# Expiration times longer than this are absolute unix timestamps
+MAX_RELATIVE_EXPIRATION = 30 * 24 * 60 * 60
+
+# Max size of a message between cache servers and clients
+MAX_MESSAGE_SIZE = 64 * 1024 * 1024
+
+# SECRET_KEY of settings/default.py, messages signed with it are not trusted
+DEFAULT_SECRET_KEY = "Replace-with-something-secret"
+
+
+def get_cache_client():
+  """Get client of the cache backend selected in settings."""
+  return extensions.get_extension_instance(
+      "CACHE_BACKEND", "ggrc.cache.backends.AppEngineBackend").client()
+
+
+class CacheBackend(object):
+  """Base class of cache clients.
+
+  Subclasses implement the *_entries methods and flush_all on full keys,
+  memcache api methods are built on top of them. Every entry has a version
+  that changes on every write, versions of entries read with for_cas are
+  remembered per thread and checked by cas.
+  """
+
+  def __init__(self):
+    self._local = threading.local()
+
+  def client(self):
+    """Get client of the backend, backends are their own clients."""
+    return self
+
+  def get_entries(self, keys):
+    """Get dict {key: (value, version)} of found keys."""
+    raise NotImplementedError()
+
+  def set_entries(self, mapping, time=0):
+    """Set values of mapping {key: value}, return list of failed keys."""
+    # pylint: disable=redefined-outer-name
+    raise NotImplementedError()
+
+  def add_entries(self, mapping, time=0):
+    """Add values of missing keys, return list of not added keys."""
+    # pylint: disable=redefined-outer-name
+    raise NotImplementedError()
+
+  def cas_entries(self, mapping, time=0):
+    """Set values of mapping {key: (value, version)} whose entries still
+    have the given versions, return list of not set keys."""
+    # pylint: disable=redefined-outer-name
+    raise NotImplementedError()
+
+  def delete_entries(self, keys):
+    raise NotImplementedError()
+
+  def flush_all(self):
+    raise NotImplementedError()
+
+  def _cas_ids(self):
+    cas_ids = getattr(self._local, "cas_ids", None)
+    if cas_ids is None:
+      cas_ids = self._local.cas_ids = {}
+    return cas_ids
+
+  def get_multi(self, keys, key_prefix='', namespace=None, for_cas=False):
+    entries = self.get_entries([key_prefix + key for key in keys])
+    if for_cas:
+      self._cas_ids().update(
+          (key, version) for key, (_, version) in entries.iteritems()
+      )
+    return {key[len(key_prefix):]: value
+            for key, (value, _) in entries.iteritems()}
+
+  def set_multi(self, mapping, time=0, key_prefix='', min_compress_len=0,
+                namespace=None):
+    # pylint: disable=redefined-outer-name
+    failed = self.set_entries(
+        {key_prefix + key: value for key, value in mapping.iteritems()}, time)
+    return [key[len(key_prefix):] for key in failed]
+
+  def add_multi(self, mapping, time=0, key_prefix='', min_compress_len=0,
+                namespace=None):
+    # pylint: disable=redefined-outer-name
+    not_added = self.add_entries(
+        {key_prefix + key: value for key, value in mapping.iteritems()}, time)
+    return [key[len(key_prefix):] for key in not_added]
+
+  def cas_multi(self, mapping, time=0, key_prefix='', min_compress_len=0,
+                namespace=None):
+    """Set values of keys that did not change since they were read with
+    for_cas, keys that were not read that way are not set."""
+    # pylint: disable=redefined-outer-name
+    cas_ids = self._cas_ids()
+    entries = {}
+    failed = []
+    for key, value in mapping.iteritems():
+      if key_prefix + key in cas_ids:
+        entries[key_prefix + key] = (value, cas_ids.pop(key_prefix + key))
+      else:
+        failed.append(key)
+    if entries:
+      failed.extend(key[len(key_prefix):]
+                    for key in self.cas_entries(entries, time))
+    return failed
+
+  def delete_multi(self, keys, seconds=0, key_prefix='', namespace=None):
+    return self.delete_entries([key_prefix + key for key in keys])
+
+  def get(self, key, namespace=None, for_cas=False):
+    return self.get_multi([key], for_cas=for_cas).get(key)
+
+  def gets(self, key, namespace=None):
+    return self.get(key, namespace, for_cas=True)
+
+  def set(self, key, value, time=0, min_compress_len=0, namespace=None):
+    # pylint: disable=redefined-outer-name,unused-argument
+    return not self.set_multi({key: value}, time)
+
+  def add(self, key, value, time=0, min_compress_len=0, namespace=None):
+    # pylint: disable=redefined-outer-name,unused-argument
+    return not self.add_multi({key: value}, time)
+
+  def cas(self, key, value, time=0, min_compress_len=0, namespace=None):
+    # pylint: disable=redefined-outer-name,unused-argument
+    return not self.cas_multi({key: value}, time)
+
+  def delete(self, key, seconds=0, namespace=None):
+    # pylint: disable=unused-argument
+    if key not in self.get_multi([key]):
+      return DELETE_ITEM_MISSING
+    self.delete_multi([key])
+    return DELETE_SUCCESSFUL
+
+
+class AppEngineBackend(object):
+  """App Engine memcache backend."""
+
+  def __init__(self, settings):
+    pass
+
+  @staticmethod
+  def client():
+    return memcache.Client()
+
+
+def _now():
+  """Get current time, set methods have an argument named time."""
+  return time.time()
+
+
+# Lock files held by LocalBackends of this process, keyed by path
+_PROCESS_LOCKS = {}
+_PROCESS_LOCKS_LOCK = threading.Lock()
+
+
+def _lock_single_process(name):
+  """Ensure no other process holds the lock of the given name.
+
+  Raises:
+    RuntimeError: if another process holds the lock.
+  """
+  path = os.path.join(tempfile.gettempdir(), "ggrc_local_cache_{}.lock".format(
+      hashlib.sha1(name).hexdigest()))
+  with _PROCESS_LOCKS_LOCK:
+    if path in _PROCESS_LOCKS:
+      return
+    lock_file = open(path, "a")
+    try:
+      fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except IOError as error:
+      lock_file.close()
+      if error.errno not in (errno.EAGAIN, errno.EACCES):
+        raise
+      raise RuntimeError("LocalBackend is used by another process, use a "
+                         "shared cache backend when several processes serve "
+                         "requests")
+    _PROCESS_LOCKS[path] = lock_file
+
+
+class LocalBackend(CacheBackend):
+  """Bounded LRU cache with expiration, shared by threads of the process.
+
+  Values are pickled like in memcache, so the cached values are never
+  shared with the callers.
+
+  Invalidations of a process local cache can not reach other processes, so
+  the backend refuses to run on App Engine and in a second process that
+  uses the same database.
+
+  Attributes:
+    max_entries: max number of entries, the least recently used entries are
+      evicted first.
+    default_ttl: expiration time in seconds of entries added without one,
+      0 means no expiration.
+  """
+
+  def __init__(self, settings):
+    super(LocalBackend, self).__init__()
+    if os.environ.get("SERVER_SOFTWARE", "").startswith("Google App Engine"):
+      raise RuntimeError("LocalBackend can not be shared by App Engine "
+                         "instances, use AppEngineBackend")
+    self._pid = os.getpid()
+    _lock_single_process(str(getattr(settings, "SQLALCHEMY_DATABASE_URI", "")))
+    self.max_entries = settings.CACHE_LOCAL_MAX_ENTRIES
+    self.default_ttl = settings.CACHE_LOCAL_TTL
+    self._entries = OrderedDict()
+    self._versions = itertools.count(1)
+    self._lock = threading.Lock()
+
+  def client(self):
+    if os.getpid() != self._pid:
+      raise RuntimeError("LocalBackend was created by another process, use a "
+                         "shared cache backend when several processes serve "
+                         "requests")
+    return self
+
+  def _expires_at(self, expiration, now):
+    expiration = expiration or self.default_ttl
+    if not expiration:
+      return None
+    if expiration > MAX_RELATIVE_EXPIRATION:
+      return expiration
+    return now + expiration
+
+  def _pop_alive(self, key, now):
+    """Pop entry of the key if it has not expired yet."""
+    entry = self._entries.pop(key, None)
+    if entry is None:
+      return None
+    expires_at = entry[0]
+    if expires_at is not None and expires_at <= now:
+      return None
+    return entry
+
+  def _store(self, key, value, expiration, now):
+    self._entries[key] = (self._expires_at(expiration, now),
+                          next(self._versions),
+                          cPickle.dumps(value, cPickle.HIGHEST_PROTOCOL))
+    while len(self._entries) > self.max_entries:
+      self._entries.popitem(last=False)
+
+  def get_entries(self, keys):
+    now = _now()
+    result = {}
+    with self._lock:
+      for key in keys:
+        entry = self._pop_alive(key, now)
+        if entry is not None:
+          self._entries[key] = entry
+          result[key] = entry[1:]
+    return {key: (cPickle.loads(value), version)
+            for key, (version, value) in result.iteritems()}
+
+  def set_entries(self, mapping, time=0):
+    # pylint: disable=redefined-outer-name
+    now = _now()
+    with self._lock:
+      for key, value in mapping.iteritems():
+        self._entries.pop(key, None)
+        self._store(key, value, time, now)
+    return []
+
+  def add_entries(self, mapping, time=0):
+    # pylint: disable=redefined-outer-name
+    now = _now()
+    not_added = []
+    with self._lock:
+      for key, value in mapping.iteritems():
+        entry = self._pop_alive(key, now)
+        if entry is not None:
+          self._entries[key] = entry
+          not_added.append(key)
+        else:
+          self._store(key, value, time, now)
+    return not_added
+
+  def cas_entries(self, mapping, time=0):
+    # pylint: disable=redefined-outer-name
+    now = _now()
+    failed = []
+    with self._lock:
+      for key, (value, version) in mapping.iteritems():
+        entry = self._pop_alive(key, now)
+        if entry is None:
+          failed.append(key)
+        elif entry[1] != version:
+          self._entries[key] = entry
+          failed.append(key)
+        else:
+          self._store(key, value, time, now)
+    return failed
+
+  def delete_entries(self, keys):
+    with self._lock:
+      for key in keys:
+        self._entries.pop(key, None)
+    return True
+
+  def flush_all(self):
+    with self._lock:
+      self._entries.clear()
+    return True
+
+
+class SocketBackend(CacheBackend):
+  """Client of a LocalBackend served by ggrc.cache.server.
+
+  Every thread uses its own connection. Network errors are logged and
+  reported like memcache reports them: gets miss, sets and deletes fail.
+  """
+
+  def __init__(self, settings):
+    super(SocketBackend, self).__init__()
+    self.address = (settings.CACHE_SERVER_HOST, settings.CACHE_SERVER_PORT)
+    self.secret = get_secret(settings)
+
+  def _connection(self):
+    connection = getattr(self._local, "connection", None)
+    if connection is None:
+      connection = socket.create_connection(self.address)
+      self._local.connection = connection
+    return connection
+
+  def close(self):
+    """Close connection of the current thread."""
+    connection = getattr(self._local, "connection", None)
+    self._local.connection = None
+    if connection is not None:
+      connection.close()
+
+  def _call(self, method, *args):
+    """Call method of the served backend, raise socket.error on failures."""
+    try:
+      connection = self._connection()
+      send_message(connection, self.secret, (method, args))
+      status, result = recv_message(connection, self.secret)
+    except (socket.error, EOFError):
+      self.close()
+      raise
+    if status != "ok":
+      raise socket.error(result)
+    return result
+
+  def _call_or_default(self, default, method, *args):
+    try:
+      return self._call(method, *args)
+    except (socket.error, EOFError) as error:
+      logger.warning("Cache server %s:%s: %s", self.address[0],
+                     self.address[1], error)
+      return default
+
+  def get_entries(self, keys):
+    return self._call_or_default({}, "get_entries", list(keys))
+
+  def set_entries(self, mapping, time=0):
+    # pylint: disable=redefined-outer-name
+    return self._call_or_default(list(mapping), "set_entries", dict(mapping),
+                                 time)
+
+  def add_entries(self, mapping, time=0):
+    # pylint: disable=redefined-outer-name
+    return self._call_or_default(list(mapping), "add_entries", dict(mapping),
+                                 time)
+
+  def cas_entries(self, mapping, time=0):
+    # pylint: disable=redefined-outer-name
+    return self._call_or_default(list(mapping), "cas_entries", dict(mapping),
+                                 time)
+
+  def delete_entries(self, keys):
+    return self._call_or_default(False, "delete_entries", list(keys))
+
+  def flush_all(self):
+    return self._call_or_default(False, "flush_all")
+
+
+def get_secret(settings):
+  """Get key used to sign messages between cache servers and clients.
+
+  Raises:
+    ValueError: if SECRET_KEY is not configured.
+  """
+  secret = getattr(settings, "SECRET_KEY", None)
+  if not secret or secret == DEFAULT_SECRET_KEY:
+    raise ValueError("GGRC_SECRET_KEY must be set to use the cache server")
+  if isinstance(secret, unicode):
+    secret = secret.encode("utf-8")
+  return secret
+
+
+def _sign(secret, data):
+  return hmac.new(secret, data, hashlib.sha256).digest()
+
+
+def send_message(connection, secret, message):
+  """Send signed length prefixed message."""
+  data = cPickle.dumps(message, cPickle.HIGHEST_PROTOCOL)
+  data = _sign(secret, data) + data
+  connection.sendall(struct.pack("!I", len(data)) + data)
+
+
+def _recv_exactly(connection, size):
+  chunks = []
+  while size:
+    chunk = connection.recv(size)
+    if not chunk:
+      raise EOFError("Connection closed")
+    chunks.append(chunk)
+    size -= len(chunk)
+  return "".join(chunks)
+
+
+def recv_message(connection, secret):
+  """Receive signed length prefixed message.
+
+  The signature is checked before the message is unpickled.
+
+  Raises:
+    socket.error: if the message is too large or its signature does not
+      match.
+  """
+  size, = struct.unpack("!I", _recv_exactly(connection, 4))
+  if size > MAX_MESSAGE_SIZE:
+    raise socket.error("Message too large")
+  data = _recv_exactly(connection, size)
+  digest_size = hashlib.sha256().digest_size
+  signature, data = data[:digest_size], data[digest_size:]
+  if not hmac.compare_digest(signature, _sign(secret, data)):
+    raise socket.error("Invalid message signature")
+  return cPickle.loads(data)
@@ -0,0 +1,96 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Version of the stored data for cheap conditional GETs.
+
+The version is a random token kept in the shared cache. It is replaced after
+every commit that changed objects through the ORM, so an ETag derived from
+the version and the request can be checked before any object is loaded.
+
+Published resources include related objects of other types, that is why a
+single version covers all the data instead of a version per type.
+
+Code writing to the database with raw SQL must call mark_changed before the
+commit, otherwise clients may get 304 responses for stale collections.
+"""
+
+import hashlib
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.orm.session import Session
+
+from ggrc import settings
+from ggrc.cache import backends
+
+
+DATA_VERSION_KEY = "data_version"
+
+_CHANGED_FLAG = "data_version_changed"
+
+
+def _use_version():
+  return getattr(settings, "MEMCACHE_MECHANISM", False)
+
+
+def _new_version():
+  return uuid.uuid4().hex
+
+
+def get_version():
+  """Get current version of the data or None if it is not available."""
+  if not _use_version():
+    return None
+  client = backends.get_cache_client()
+  version = client.get(DATA_VERSION_KEY)
+  if version is None:
+    client.add(DATA_VERSION_KEY, _new_version())
+    version = client.get(DATA_VERSION_KEY)
+  return version
+
+
+def get_etag(*parts):
+  """Get ETag of a response for the current data version.
+
+  Args:
+    parts: strings that identify the response for the same data, e.g. the
+      current user id and the request url.
+
+  Returns:
+    quoted ETag string or None if the data version is not available.
+  """
+  version = get_version()
+  if version is None:
+    return None
+  key = u"\n".join([version, settings.VERSION] +
+                   [unicode(part) for part in parts])
+  return '"{0}"'.format(hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+
+def mark_changed(session):
+  """Replace the data version after the current transaction is committed."""
+  session.info[_CHANGED_FLAG] = True
+
+
+def _mark_flushed_changes(session, _):
+  if session.new or session.dirty or session.deleted:
+    mark_changed(session)
+
+
+def _mark_bulk_changes(update_context):
+  mark_changed(update_context.session)
+
+
+def _replace_version(session):
+  """Store a new version if the committed transaction changed data."""
+  if not session.info.pop(_CHANGED_FLAG, False) or not _use_version():
+    return
+  backends.get_cache_client().set(DATA_VERSION_KEY, _new_version())
+
+
+def init_listeners():
+  """Track changes of the data in all sessions."""
+  sa.event.listen(Session, "after_flush", _mark_flushed_changes)
+  sa.event.listen(Session, "after_bulk_update", _mark_bulk_changes)
+  sa.event.listen(Session, "after_bulk_delete", _mark_bulk_changes)
+  sa.event.listen(Session, "after_commit", _replace_version)
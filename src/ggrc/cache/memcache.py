@@ -5,8 +5,7 @@
 from collections import OrderedDict
 from copy import deepcopy
 
-from google.appengine.api import memcache
-
+from ggrc.cache import backends
 from ggrc.cache import cache
 from ggrc import settings
 
@@ -18,7 +17,7 @@ class MemCache(cache.Cache):
     super(MemCache, self).__init__()
     self.name = 'memcache'
     self.client = None
-    self.memcache_client = memcache.Client()
+    self.memcache_client = backends.get_cache_client()
     self.supported_resources.update({
         cache_entry.model_plural: cache_entry.class_name
         for cache_entry in cache.all_cache_entries()
@@ -263,9 +262,16 @@ class _Decorated(object):
   """Decorated class."""
 
   def __init__(self, function):
-    self.memcache_client = memcache.Client()
+    self._memcache_client = None
     self.function = function
 
+  @property
+  def memcache_client(self):
+    """Client of the cache backend, created on first use."""
+    if self._memcache_client is None:
+      self._memcache_client = backends.get_cache_client()
+    return self._memcache_client
+
   @property
   def active(self):
     return settings.MEMCACHE_MECHANISM
@@ -0,0 +1,145 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Batched cache of published REST resources.
+
+Resources of a collection GET are fetched from the cache with a single
+get_multi call, only the misses are loaded from the database and they are
+written back with a single add_multi call.
+
+Hits, misses and time spent in the cache are counted for every cache and
+for the whole process, see STATS.
+"""
+
+import json
+import threading
+import time
+
+from ggrc.cache import utils as cache_utils
+from ggrc.utils import as_json
+
+
+DELETE_OP_PREFIX = "DeleteOp:"
+
+# Expiration time in seconds of cached resources
+CACHE_EXPIRY = 600
+
+
+class CacheStats(object):
+  """Thread safe counters of cache usage."""
+
+  def __init__(self):
+    self._lock = threading.Lock()
+    self.hits = 0
+    self.misses = 0
+    self.get_seconds = 0.0
+    self.set_seconds = 0.0
+
+  def record_get(self, hits, misses, seconds):
+    with self._lock:
+      self.hits += hits
+      self.misses += misses
+      self.get_seconds += seconds
+
+  def record_set(self, seconds):
+    with self._lock:
+      self.set_seconds += seconds
+
+  def as_dict(self):
+    """Get counters and the hit ratio as a dict."""
+    with self._lock:
+      lookups = self.hits + self.misses
+      return {
+          "hits": self.hits,
+          "misses": self.misses,
+          "hit_ratio": float(self.hits) / lookups if lookups else 0.0,
+          "get_seconds": self.get_seconds,
+          "set_seconds": self.set_seconds,
+      }
+
+
+# Counters of all resource caches of the process
+STATS = CacheStats()
+
+
+class ResourceCache(object):
+  """Cache of published resources keyed by (id, type) matches.
+
+  Attributes:
+    client: memcache compatible client.
+    supported_types: names of models whose resources can be cached.
+    stats: counters of this cache, they are added to STATS as well.
+  """
+
+  def __init__(self, client, supported_types):
+    self.client = client
+    self.supported_types = supported_types
+    self.stats = CacheStats()
+    self._blocked_keys = set()
+
+  @staticmethod
+  def get_key(match):
+    return cache_utils.get_cache_key(None, id_=match[0], type_=match[1])
+
+  def get_multi(self, matches):
+    """Get cached resources for matches in a single call.
+
+    Resources that are being modified by other requests are reported as
+    misses and are not written back by set_multi.
+
+    Args:
+      matches: list of tuples starting with id and type of resources.
+
+    Returns:
+      dict {match: resource} of found resources.
+    """
+    keys = {self.get_key(match): match for match in matches}
+    if not keys:
+      return {}
+    start = time.time()
+    values = self.client.get_multi(
+        keys.keys() + [DELETE_OP_PREFIX + key for key in keys])
+    self._blocked_keys = {key for key in keys
+                          if DELETE_OP_PREFIX + key in values}
+    resources = {}
+    for key, match in keys.iteritems():
+      value = values.get(key)
+      if not value or key in self._blocked_keys:
+        continue
+      value = json.loads(value)
+      if "selfLink" in value:
+        resources[match] = value
+    seconds = time.time() - start
+    for stats in (self.stats, STATS):
+      stats.record_get(len(resources), len(keys) - len(resources), seconds)
+    return resources
+
+  def set_multi(self, resources):
+    """Add resources missing in the cache in a single call.
+
+    DeleteOp entries are checked again right before the write, so resources
+    that started being modified after they were loaded are not cached. The
+    resources are added rather than set, so entries written by other
+    requests in the meantime are not overwritten.
+
+    Args:
+      resources: dict {match: resource} of published resources.
+    """
+    entries = {}
+    for match, resource in resources.iteritems():
+      key = self.get_key(match)
+      if match[1] in self.supported_types and key not in self._blocked_keys:
+        entries[key] = resource
+    if not entries:
+      return
+    start = time.time()
+    blocked = self.client.get_multi(
+        [DELETE_OP_PREFIX + key for key in entries])
+    entries = {key: as_json(resource)
+               for key, resource in entries.iteritems()
+               if DELETE_OP_PREFIX + key not in blocked}
+    if entries:
+      self.client.add_multi(entries, CACHE_EXPIRY)
+    seconds = time.time() - start
+    for stats in (self.stats, STATS):
+      stats.record_set(seconds)
@@ -0,0 +1,86 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Stand-in cache server for SocketBackend clients.
+
+The server keeps a LocalBackend in memory and serves it to all connected
+clients. It is meant for local development with several app processes.
+Messages are signed with GGRC_SECRET_KEY, connections sending messages with
+invalid signatures are closed before the messages are decoded.
+
+Usage:
+  python -m ggrc.cache.server [--host HOST] [--port PORT]
+"""
+
+import argparse
+import logging
+import socket
+import SocketServer
+
+from ggrc import settings
+from ggrc.cache import backends
+
+
+logger = logging.getLogger(__name__)
+
+SERVED_METHODS = {"get_entries", "set_entries", "add_entries", "cas_entries",
+                  "delete_entries", "flush_all"}
+
+
+class CacheRequestHandler(SocketServer.BaseRequestHandler):
+  """Handle requests of a client connection until it is closed."""
+
+  def handle(self):
+    while True:
+      try:
+        method, args = backends.recv_message(self.request,
+                                             self.server.secret)
+      except (EOFError, socket.error) as error:
+        if not isinstance(error, EOFError):
+          logger.warning("Closing connection of %s: %s",
+                         self.client_address[0], error)
+        return
+      if method in SERVED_METHODS:
+        try:
+          response = ("ok", getattr(self.server.backend, method)(*args))
+        except Exception as error:  # pylint: disable=broad-except
+          logger.exception("Cache request %s failed", method)
+          response = ("error", str(error))
+      else:
+        response = ("error", "Unknown method {}".format(method))
+      backends.send_message(self.request, self.server.secret, response)
+
+
+class CacheServer(SocketServer.ThreadingTCPServer):
+  """Threaded server of a LocalBackend."""
+  daemon_threads = True
+  allow_reuse_address = True
+
+  def __init__(self, address, backend, secret):
+    SocketServer.ThreadingTCPServer.__init__(self, address,
+                                             CacheRequestHandler)
+    self.backend = backend
+    self.secret = secret
+
+
+def main():
+  """Serve LocalBackend configured in settings until interrupted."""
+  parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+  parser.add_argument("--host", default=settings.CACHE_SERVER_HOST)
+  parser.add_argument("--port", type=int, default=settings.CACHE_SERVER_PORT)
+  args = parser.parse_args()
+  logging.basicConfig(level=logging.INFO)
+  server = CacheServer((args.host, args.port),
+                       backends.LocalBackend(settings),
+                       backends.get_secret(settings))
+  logger.info("Serving cache on %s:%s", args.host, args.port)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+  finally:
+    server.server_close()
+
+
+if __name__ == "__main__":
+  main()
@@ -8,6 +8,7 @@ import logging
 import flask
 
 from ggrc import cache
+from ggrc.cache import backends
 import ggrc.models
 from ggrc import settings
 
@@ -212,7 +213,7 @@ def clear_permission_cache():
   """Drop cached permissions for all users."""
   if not getattr(settings, 'MEMCACHE_MECHANISM', False):
     return
-  client = get_cache_manager().cache_object.memcache_client
+  client = backends.get_cache_client()
   cached_keys_set = client.get('permissions:list') or set()
   cached_keys_set.add('permissions:list')
   # We delete all the cached user permissions as well as
@@ -224,7 +225,7 @@ def clear_users_permission_cache(user_ids):
   """ Drop cached permissions for a list of users. """
   if not getattr(settings, 'MEMCACHE_MECHANISM', False) or not user_ids:
     return
-  client = get_cache_manager().cache_object.memcache_client
+  client = backends.get_cache_client()
   cached_keys_set = client.get('permissions:list') or set()
   for user_id in user_ids:
     key = 'permissions:{}'.format(user_id)
@@ -3,6 +3,8 @@
 
 """Lists of ggrc contributions."""
 
+from ggrc.access_control import propagation_queue
+from ggrc.fulltext import queue as fulltext_queue
 from ggrc.integrations import synchronization_jobs
 from ggrc.models import import_export
 from ggrc.notifications import common
@@ -26,6 +28,11 @@ HALF_HOUR_CRON_JOBS = [
     fast_digest.send_notification,
 ]
 
+MINUTE_CRON_JOBS = [
+    fulltext_queue.process_queue,
+    propagation_queue.process_queue,
+]
+
 NOTIFICATION_LISTENERS = [
     notification_handlers.register_handlers
 ]
@@ -4,11 +4,17 @@
 """Base objects for csv file converters."""
 
 from collections import defaultdict
+from multiprocessing.pool import ThreadPool
 
+from flask import g
 from google.appengine.ext import deferred
 
+from ggrc import db
 from ggrc import login
 from ggrc import settings
+from ggrc.app import app
+from ggrc.models import all_models
+from ggrc.models import import_export
 from ggrc.utils import benchmark
 from ggrc.utils import structures
 from ggrc.cache.memcache import MemCache
@@ -52,47 +58,114 @@ class ImportConverter(BaseConverter):
       "title"
   ]
 
-  def __init__(self, dry_run=True, csv_data=None):
+  def __init__(self, dry_run=True, csv_data=None, progress=None):
     self.dry_run = dry_run
     self.csv_data = csv_data or []
     self.indexer = get_indexer()
+    self.progress = progress
     super(ImportConverter, self).__init__()
 
   def get_info(self):
     return self.response_data
 
+  def make_block_converter(self, offset, data, csv_lines):
+    """Initialize block converter for a block of csv data."""
+    class_name = data[1][0].strip().lower()
+    object_class = self.exportable.get(class_name)
+    raw_headers, rows = extract_relevant_data(data)
+    block_converter = base_block.ImportBlockConverter(
+        self,
+        object_class=object_class,
+        rows=rows,
+        raw_headers=raw_headers,
+        offset=offset,
+        class_name=class_name,
+        csv_lines=csv_lines[2:],  # Skip 2 header lines
+    )
+    block_converter.check_block_restrictions()
+    return block_converter
+
   def initialize_block_converters(self):
     """Initialize block converters."""
-    offsets_and_data_blocks = split_blocks(self.csv_data)
-    for offset, data, csv_lines in offsets_and_data_blocks:
-      class_name = data[1][0].strip().lower()
-      object_class = self.exportable.get(class_name)
-      raw_headers, rows = extract_relevant_data(data)
-      block_converter = base_block.ImportBlockConverter(
-          self,
-          object_class=object_class,
-          rows=rows,
-          raw_headers=raw_headers,
-          offset=offset,
-          class_name=class_name,
-          csv_lines=csv_lines[2:],  # Skip 2 header lines
-      )
-      block_converter.check_block_restrictions()
-      yield block_converter
+    for offset, data, csv_lines in split_blocks(self.csv_data):
+      yield self.make_block_converter(offset, data, csv_lines)
+
+  @staticmethod
+  def import_block(block_converter):
+    """Import block and return its info and ids of created revisions."""
+    if not block_converter.ignore:
+      block_converter.import_csv_data()
+    return block_converter.get_info(), block_converter.revision_ids
 
   def import_csv_data(self):
-    revision_ids = []
+    data_blocks = list(split_blocks(self.csv_data))
+    groups = None
+    if settings.IMPORT_BLOCK_WORKERS > 1 and len(data_blocks) > 1:
+      groups = import_helper.get_dependent_block_groups(data_blocks)
 
-    for converter in self.initialize_block_converters():
-      if not converter.ignore:
-        converter.import_csv_data()
-        revision_ids.extend(converter.revision_ids)
-      self.response_data.append(converter.get_info())
+    if groups and len(groups) > 1:
+      results = self._import_groups_concurrently(data_blocks, groups)
+    else:
+      results = [self.import_block(self.make_block_converter(*data_block))
+                 for data_block in data_blocks]
 
-    self._start_compute_attributes_job(revision_ids)
+    revision_ids = []
+    for info, block_revision_ids in results:
+      self.response_data.append(info)
+      revision_ids.extend(block_revision_ids)
+
+    self.start_compute_attributes_job(revision_ids)
     self.drop_cache()
 
-  def _start_compute_attributes_job(self, revision_ids):
+  def _import_groups_concurrently(self, data_blocks, groups):
+    """Import independent groups of blocks in worker threads.
+
+    Every worker uses its own app context, DB session, converter and import
+    progress, and the fulltext indexer keeps its lookups per thread, so
+    groups share no objects. Blocks of a group are imported in order of the
+    csv file.
+
+    Returns:
+      list of (info, revision_ids) tuples in order of the blocks.
+    """
+    user_id = login.get_current_user_id()
+    pool = ThreadPool(min(settings.IMPORT_BLOCK_WORKERS, len(groups)))
+    try:
+      group_results = pool.map(
+          lambda group: self._import_group_in_worker(
+              [(index, data_blocks[index]) for index in group], user_id,
+          ),
+          groups,
+      )
+    finally:
+      pool.close()
+      pool.join()
+    results = sorted(result for group_result in group_results
+                     for result in group_result)
+    return [result for _, result in results]
+
+  def _import_group_in_worker(self, indexed_blocks, user_id):
+    """Import blocks of a group inside the app context of a worker."""
+    with app.app_context():
+      setattr(g, "_current_user", all_models.Person.query.get(user_id))
+      progress = None
+      if self.progress is not None:
+        progress = import_export.ImportProgress(self.progress.ie_id,
+                                                dict(self.progress.blocks))
+      converter = ImportConverter(dry_run=self.dry_run, progress=progress)
+      try:
+        with benchmark("Import group of {} blocks".format(
+            len(indexed_blocks))):
+          return [
+              (index, converter.import_block(
+                  converter.make_block_converter(*data_block)
+              ))
+              for index, data_block in indexed_blocks
+          ]
+      finally:
+        db.session.remove()
+
+  def start_compute_attributes_job(self, revision_ids):
     if revision_ids:
       cur_user = login.get_current_user()
       deferred.defer(
@@ -116,6 +189,8 @@ class ExportConverter(BaseConverter):
   blocks and columns are handled in the correct order.
   """
 
+  CSV_CHUNK_ROWS = 100
+
   def __init__(self, ids_by_type, exportable_queries=None):
     super(ExportConverter, self).__init__()
     self.dry_run = True  # TODO: fix ColumnHandler to not use it for exports
@@ -160,16 +235,30 @@ class ExportConverter(BaseConverter):
 
   def export_csv_data(self):
     """Export csv data."""
-    with benchmark("Initialize block converters."):
-      self.initialize_block_converters()
     with benchmark("Build csv data."):
       try:
-        return self.build_csv_from_row_data()
+        return "".join(self.iter_csv_data())
       except ValueError:
         return ""
 
+  def iter_csv_data(self):
+    """Initialize block converters and return generator of csv chunks.
+
+    Block converters are initialized right away, so that errors in export
+    queries are raised before the first chunk is requested.
+    """
+    with benchmark("Initialize block converters."):
+      self.initialize_block_converters()
+    if not self.block_converters:
+      return iter([])
+    return self.build_csv_from_row_data()
+
   def build_csv_from_row_data(self):
-    """Export each block separated by empty lines."""
+    """Export each block separated by empty lines.
+
+    The csv is yielded in chunks of at most CSV_CHUNK_ROWS lines, so that
+    only one chunk of the csv is kept in memory at a time.
+    """
     table_width = max([converter.block_width
                        for converter in self.block_converters])
     table_width += 1  # One line for 'Object line' column
@@ -183,14 +272,17 @@ class ExportConverter(BaseConverter):
       csv_string_builder.append_line(csv_header[0])
       csv_string_builder.append_line(csv_header[1])
 
-      for line in block_converter.generate_row_data():
+      for row_number, line in enumerate(block_converter.generate_row_data(),
+                                        start=1):
         line.insert(0, "")
         csv_string_builder.append_line(line)
+        if row_number % self.CSV_CHUNK_ROWS == 0:
+          yield csv_string_builder.pop_csv_string()
 
       csv_string_builder.append_line([])
       csv_string_builder.append_line([])
 
-    return csv_string_builder.get_csv_string()
+    yield csv_string_builder.pop_csv_string()
 
   def _get_exportable_queries(self):
     """Get a list of filtered object queries regarding exportable items.
@@ -7,6 +7,7 @@ Each import block should contain data for one Object type. The blocks are
 separated in the csv file with empty lines.
 """
 
+import time
 from logging import getLogger
 from collections import defaultdict
 from collections import OrderedDict
@@ -19,7 +20,11 @@ from sqlalchemy import and_
 from flask import _app_ctx_stack
 
 from ggrc import db
+from ggrc import login
 from ggrc import models
+from ggrc import settings
+from ggrc.access_control import propagation_queue
+from ggrc.fulltext import queue as fulltext_queue
 from ggrc.models import reflection
 from ggrc.rbac import permissions
 from ggrc.utils import benchmark
@@ -83,6 +88,8 @@ class BlockConverter(object):
     self._ticket_tracker_cache = None
     self._owners_cache = None
     self._ca_definitions_cache = None
+    # Data loaded by handler prefetch for the current chunk of exported rows.
+    self.prefetched = {}
     self.converter = converter
     self.offset = offset
     self.object_class = object_class
@@ -401,11 +408,11 @@ class ImportBlockConverter(BlockConverter):
                       line=self.offset + 2,
                       s="")
 
-  def row_converters_from_csv(self):
-    """ Generate a row converter object for every csv row """
+  def row_converters_from_csv(self, start=0):
+    """ Generate a row converter object for every csv row from start """
     if self.ignore:
       return
-    for i, row in enumerate(self.rows):
+    for i, row in enumerate(self.rows[start:], start):
       line = self.csv_lines[i]
       yield base_row.ImportRowConverter(self, self.object_class, row=row,
                                         headers=self.headers, line=line)
@@ -423,10 +430,33 @@ class ImportBlockConverter(BlockConverter):
         k for k in self.headers if k not in self.converter.priority_columns
     ]
 
+  @property
+  def commit_chunk_rows(self):
+    """Number of rows committed with commit hooks and progress at once.
+
+    Returns:
+      the number of rows or 0 if the block is not imported in chunks.
+    """
+    if self.converter.dry_run or self.converter.progress is None:
+      return 0
+    return settings.IMPORT_COMMIT_CHUNK_ROWS
+
   def import_csv_data(self):
-    """Perform import sequence for the block."""
+    """Perform import sequence for the block.
+
+    In the chunked import mode commit hooks run and the import progress is
+    stored after every chunk of rows and with the final commit of the block.
+    Rows committed by a previous run of the import job are skipped and their
+    info is restored. Rows processed after the last stored chunk are imported
+    again, their reindex and ACL propagation are queued with the rows and
+    drained by the next chunk commit, see queue_commit_hooks.
+    """
+    chunk_rows = self.commit_chunk_rows
+    start = self._restore_progress() if chunk_rows else 0
+    processed = 0
+    start_time = time.time()
     try:
-      for row in self.row_converters_from_csv():
+      for row in self.row_converters_from_csv(start):
         try:
           row.process_row()
         except ReservedNameError:
@@ -437,13 +467,80 @@ class ImportBlockConverter(BlockConverter):
           logger.exception("Unexpected error on import")
         self._update_info(row)
         _app_ctx_stack.top.sqlalchemy_queries = []
+        processed += 1
+        if chunk_rows and processed % chunk_rows == 0:
+          self._commit_chunk(start + processed)
     except Exception:  # pylint: disable=broad-except
       logger.exception("Unexpected error on import")
     finally:
       db.session.commit_hooks_enable_flag.enable()
       is_final_commit_required = not (self.converter.dry_run or self.ignore)
       if is_final_commit_required:
+        if chunk_rows:
+          self.converter.progress.save(self.offset, start + processed,
+                                       self.get_info())
         db.session.commit()
+        if chunk_rows:
+          self._drain_queued_hooks()
+      elapsed = time.time() - start_time
+      self._import_info["rows_per_second"] = round(
+          processed / elapsed if elapsed else processed, 2)
+
+  def _commit_chunk(self, rows):
+    """Commit imported rows with commit hooks and store the progress."""
+    with benchmark("Commit chunk of imported rows"):
+      db.session.commit_hooks_enable_flag.enable()
+      self.converter.progress.save(self.offset, rows, self.get_info())
+      db.session.commit()
+      self._drain_queued_hooks()
+      self.converter.start_compute_attributes_job(self.revision_ids)
+      self.revision_ids = []
+
+  def queue_commit_hooks(self):
+    """Queue reindex and ACL propagation of a row in its transaction.
+
+    Rows are committed without commit hooks. In the chunked import mode the
+    work of the hooks is queued together with the row instead of being kept
+    in memory until the chunk is committed, so it is not lost if the import
+    is interrupted between the two commits.
+    """
+    if not self.commit_chunk_rows:
+      return
+    db.session.flush()
+    propagation_queue.enqueue_pending()
+    reindex_set = getattr(db.session, "reindex_set", None)
+    if reindex_set is not None:
+      reindex_set.warmup()
+      fulltext_queue.enqueue(reindex_set.model_ids_to_reindex)
+      reindex_set.model_ids_to_reindex.clear()
+
+  @staticmethod
+  def _drain_queued_hooks():
+    """Reindex and propagate entries queued by rows of the import user.
+
+    This includes entries left by an interrupted previous run of the job.
+    """
+    user_id = login.get_current_user_id()
+    with benchmark("Drain queued commit hooks of imported rows"):
+      fulltext_queue.drain(user_id=user_id)
+      propagation_queue.drain(user_id=user_id)
+
+  def _restore_progress(self):
+    """Restore info of rows committed by a previous run of the import.
+
+    Returns:
+      the number of rows to skip.
+    """
+    stored = self.converter.progress.get(self.offset)
+    if not stored or self.ignore:
+      return 0
+    info = stored["info"]
+    for key in ("rows", "created", "updated", "ignored", "deleted",
+                "deprecated"):
+      self._import_info[key] = info[key]
+    self.row_errors.extend(info["row_errors"])
+    self.row_warnings.extend(info["row_warnings"])
+    return stored["rows"]
 
   def get_unique_values_dict(self, object_class):
     """Get the varible to storing row numbers for unique values.
@@ -499,6 +596,7 @@ class ImportBlockConverter(BlockConverter):
         "ignored": 0,
         "deleted": 0,
         "deprecated": 0,
+        "rows_per_second": 0,
         "block_warnings": [],
         "block_errors": [],
         "row_warnings": [],
@@ -559,6 +657,23 @@ class ExportBlockConverter(BlockConverter):
       headers.append([description, display_name])
     return [list(header) for header in zip(*headers)]
 
+  def prefetch(self, objects):
+    """Load data of the exported columns for a chunk of objects.
+
+    Every handler class loads the data of all its columns for the whole chunk
+    at once, so the number of queries does not depend on the number of rows.
+    """
+    headers_by_handler = defaultdict(dict)
+    for key in self.fields:
+      header = self.headers.get(key)
+      if header:
+        headers_by_handler[header["handler"]][key] = header
+    with benchmark("Prefetch export data"):
+      self.prefetched = {
+          handler: handler.prefetch(self, headers, objects)
+          for handler, headers in headers_by_handler.iteritems()
+      }
+
   def row_converters_from_ids(self):
     """ Generate a row converter object for every csv row """
     if self.ignore or not self.object_ids:
@@ -572,7 +687,8 @@ class ExportBlockConverter(BlockConverter):
 
       objects = self.object_class.eager_query().filter(
           self.object_class.id.in_(ids_pool)
-      ).execution_options(stream_results=True)
+      ).execution_options(stream_results=True).all()
+      self.prefetch(objects)
 
       for obj in objects:
         yield base_row.ExportRowConverter(self, self.object_class, obj=obj,
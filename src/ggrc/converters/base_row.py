@@ -326,6 +326,7 @@ class ImportRowConverter(RowConverter):
         self.add_error(errors.VALIDATION_ERROR,
                        column_name=status_alias,
                        message=exp.message)
+      self.block_converter.queue_commit_hooks()
       db.session.commit_hooks_enable_flag.disable()
       db.session.commit()
       self.block_converter.store_revision_ids(import_event)
@@ -74,6 +74,26 @@ class CustomAttributeColumnHandler(handlers.TextColumnHandler):
     value_handler = self._type_handlers[type_]
     return value_handler(self)
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    """Load identifiers of objects referenced by mapping CA values."""
+    ids_by_type = {}
+    for obj in objects:
+      for value in obj.custom_attribute_values:
+        if value.attribute_object_id is not None and \
+           value.custom_attribute.attribute_type.startswith("Map:"):
+          ids_by_type.setdefault(value.attribute_value, set()).add(
+              value.attribute_object_id
+          )
+    identifiers = {}
+    for type_, ids in ids_by_type.iteritems():
+      model = models.get_model(type_)
+      if model is None:
+        continue
+      for id_, identifier in handlers.get_identifiers(model, ids).iteritems():
+        identifiers[(type_, id_)] = identifier
+    return identifiers
+
   def get_value(self):
     """Return the value of the custom attrbute field.
 
@@ -91,6 +111,10 @@ class CustomAttributeColumnHandler(handlers.TextColumnHandler):
           # pylint: disable=protected-access
           if value.attribute_object_id is not None and \
              value._attribute_object_attr is not None:
+            identifiers = self.get_prefetched()
+            if identifiers is not None:
+              return identifiers.get((value.attribute_value,
+                                      value.attribute_object_id))
             obj = value.attribute_object
             return getattr(obj, "email", getattr(obj, "slug", None))
         elif value.custom_attribute.attribute_type == _types.CHECKBOX:
@@ -97,6 +97,17 @@ class DefaultPersonColumnHandler(handlers.ColumnHandler):
     """
     setattr(self.row_converter.obj, self.key, self.value)
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    """Load emails of default people of the assessment templates."""
+    person_ids = set()
+    for obj in objects:
+      for key in headers:
+        value = obj.default_people.get(cls.KEY_MAP.get(key))
+        if isinstance(value, list):
+          person_ids.update(value)
+    return handlers.get_identifiers(all_models.Person, person_ids)
+
   def get_value(self):
     """Get value from default_people attribute."""
     value = self.row_converter.obj.default_people.get(
@@ -114,11 +125,11 @@ class DefaultPersonColumnHandler(handlers.ColumnHandler):
     else:
       value = default_people_labels.get(value, value)
 
-    if isinstance(value, list):
-      # This is not good and fast, because it executes query for each
-      # field from each row that contains people list.
-      # If the feature is used actively, it should be refactored
-      # and optimized.
+    emails = self.get_prefetched()
+    if isinstance(value, list) and emails is not None:
+      value = "\n".join(emails[person_id] for person_id in sorted(value)
+                         if person_id in emails)
+    elif isinstance(value, list):
       people = all_models.Person.query.filter(
           all_models.Person.id.in_(value),
       ).all()
@@ -3,6 +3,7 @@
 """Generic handlers for imports and exports."""
 
 import re
+from collections import defaultdict
 from logging import getLogger
 from datetime import date
 from datetime import datetime
@@ -29,6 +30,31 @@ MAPPING_PREFIX = "__mapping__:"
 CUSTOM_ATTR_PREFIX = "__custom__:"
 
 
+def get_identifiers(model, ids):
+  """Get dict {id: slug or email} of objects of the model with given ids."""
+  ids = {id_ for id_ in ids if id_ is not None}
+  if hasattr(model, "slug"):
+    id_column = model.slug
+  elif hasattr(model, "email"):
+    id_column = model.email
+  else:
+    return {}
+  if not ids:
+    return {}
+  return dict(db.session.query(model.id, id_column).filter(
+      model.id.in_(ids)
+  ))
+
+
+def prefetch_person_emails(headers, objects):
+  """Get emails of people referenced by person columns of the objects."""
+  return get_identifiers(all_models.Person, (
+      getattr(obj, key + "_id", None)
+      for obj in objects
+      for key in headers
+  ))
+
+
 class ColumnHandler(object):
   """Default column handler.
 
@@ -82,6 +108,27 @@ class ColumnHandler(object):
       )
       self.row_converter.set_ignore()
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    """Load data needed by export handlers of this class for a chunk of rows.
+
+    Handlers that read data not loaded by the eager query of the exported
+    objects override this method to load it for all the objects in the chunk
+    and all the columns of the handler at once. The returned value is
+    available to the handlers with get_prefetched().
+
+    Args:
+      block_converter: ExportBlockConverter of the exported objects.
+      headers: dict {key: header options} of the columns of this handler.
+      objects: list of exported objects in the current chunk.
+    """
+    # pylint: disable=unused-argument
+    return None
+
+  def get_prefetched(self):
+    """Get data loaded by prefetch for the current chunk or None."""
+    return self.row_converter.block_converter.prefetched.get(type(self))
+
   def set_value(self):
     "set value for current culumn after parsing"
     self.value = self.parse_item()
@@ -270,7 +317,15 @@ class UserColumnHandler(ColumnHandler):
         )
     return person
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    return prefetch_person_emails(headers, objects)
+
   def get_value(self):
+    emails = self.get_prefetched()
+    person_id = getattr(self.row_converter.obj, self.key + "_id", None)
+    if emails is not None and person_id in emails:
+      return emails[person_id]
     person = getattr(self.row_converter.obj, self.key)
     if person:
       return person.email
@@ -770,7 +825,33 @@ class ObjectPersonColumnHandler(UserColumnHandler):
   def set_obj_attr(self):
     pass
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    """Load emails of people mapped to the objects."""
+    emails = defaultdict(list)
+    if not objects:
+      return emails
+    query = db.session.query(
+        all_models.ObjectPerson.personable_id,
+        all_models.Person.email,
+    ).join(
+        all_models.Person,
+        all_models.Person.id == all_models.ObjectPerson.person_id,
+    ).filter(
+        all_models.ObjectPerson.personable_type ==
+        block_converter.object_class.__name__,
+        all_models.ObjectPerson.personable_id.in_(
+            [obj.id for obj in objects]
+        ),
+    ).order_by(all_models.Person.id)
+    for personable_id, email in query:
+      emails[personable_id].append(email)
+    return emails
+
   def get_value(self):
+    emails = self.get_prefetched()
+    if emails is not None:
+      return "\n".join(emails.get(self.row_converter.obj.id, []))
     object_person = db.session.query(
         all_models.ObjectPerson.person_id,
     ).filter_by(
@@ -964,7 +1045,29 @@ class LabelsHandler(ColumnHandler):
   def set_obj_attr(self):
     self.row_converter.obj.labels = self.value
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    """Load names of labels of the objects."""
+    # pylint: disable=protected-access
+    label_ids = {
+        object_label.label_id
+        for obj in objects
+        for object_label in obj._object_labels
+    }
+    if not label_ids:
+      return {}
+    return dict(db.session.query(
+        all_models.Label.id,
+        all_models.Label.name,
+    ).filter(all_models.Label.id.in_(label_ids)))
+
   def get_value(self):
+    # pylint: disable=protected-access
+    names = self.get_prefetched()
+    if names is not None:
+      return ','.join(names[object_label.label_id]
+                      for object_label in self.row_converter.obj._object_labels
+                      if object_label.label_id in names)
     return ','.join(label.name for label in self.row_converter.obj.labels)
 
 
@@ -991,7 +1094,15 @@ class ExportOnlyColumnHandler(ColumnHandler):
 
 class DirecPersonMappingColumnHandler(ExportOnlyColumnHandler):
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    return prefetch_person_emails(headers, objects)
+
   def get_value(self):
+    emails = self.get_prefetched()
+    person_id = getattr(self.row_converter.obj, self.key + "_id", None)
+    if emails is not None and person_id in emails:
+      return emails[person_id]
     person = getattr(self.row_converter.obj, self.key, self.value)
     return getattr(person, "email", "")
 
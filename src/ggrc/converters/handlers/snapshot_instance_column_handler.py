@@ -1,6 +1,8 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 """Handler for imports and exports snapshoted instances."""
+from collections import defaultdict
+
 import sqlalchemy
 from sqlalchemy.orm import load_only
 
@@ -9,7 +11,9 @@ from cached_property import cached_property
 from ggrc import db
 from ggrc import models
 from ggrc.converters import errors
+from ggrc.converters import get_exportables
 from ggrc.converters.handlers.handlers import MappingColumnHandler
+from ggrc.converters.handlers.handlers import get_identifiers
 from ggrc.snapshotter.rules import Types
 
 
@@ -90,6 +94,65 @@ class SnapshotInstanceColumnHandler(MappingColumnHandler):
         self.mapping_object.id == snapshot.c.child_id
     )
 
+  @classmethod
+  def prefetch(cls, block_converter, headers, objects):
+    """Load identifiers of snapshotted objects mapped to the objects.
+
+    Returns:
+      dict {object_id: {child_type: [identifiers]}} for all mapping types of
+      the columns.
+    """
+    exportables = get_exportables()
+    child_types = {
+        exportables[header["attr_name"]].__name__
+        for header in headers.itervalues()
+        if header.get("attr_name") in exportables
+    }
+    mapped = defaultdict(lambda: defaultdict(list))
+    if not objects or not child_types:
+      return mapped
+    rel = models.Relationship
+    object_type = block_converter.object_class.__name__
+    object_ids = [obj.id for obj in objects]
+    snapshot_rels = db.session.query(
+        rel.source_id.label("object_id"),
+        rel.destination_id.label("snapshot_id"),
+    ).filter(
+        rel.source_type == object_type,
+        rel.source_id.in_(object_ids),
+        rel.destination_type == models.Snapshot.__name__,
+    ).union_all(
+        db.session.query(
+            rel.destination_id.label("object_id"),
+            rel.source_id.label("snapshot_id"),
+        ).filter(
+            rel.destination_type == object_type,
+            rel.destination_id.in_(object_ids),
+            rel.source_type == models.Snapshot.__name__,
+        )
+    ).subquery("snapshot_rels")
+    query = db.session.query(
+        snapshot_rels.c.object_id,
+        models.Snapshot.child_type,
+        models.Snapshot.child_id,
+    ).filter(
+        models.Snapshot.id == snapshot_rels.c.snapshot_id,
+        models.Snapshot.child_type.in_(child_types),
+    ).order_by(models.Snapshot.child_id)
+    rows = query.all()
+    child_ids = defaultdict(set)
+    for _, child_type, child_id in rows:
+      child_ids[child_type].add(child_id)
+    identifiers = {
+        child_type: get_identifiers(models.get_model(child_type), ids)
+        for child_type, ids in child_ids.iteritems()
+    }
+    for object_id, child_type, child_id in rows:
+      identifier = identifiers[child_type].get(child_id)
+      if identifier is not None:
+        mapped[object_id][child_type].append(identifier)
+    return mapped
+
   def insert_object(self):
     "insert object handler"
     if self.dry_run or not self.value:
@@ -150,6 +213,10 @@ class SnapshotInstanceColumnHandler(MappingColumnHandler):
           self.mapping_object.__name__
       ]
       human_readable_ids = sorted(list(snapshot_slugs))
+    elif self.get_prefetched() is not None:
+      human_readable_ids = self.get_prefetched()[self.row_converter.obj.id][
+          self.mapping_object.__name__
+      ]
     else:
       objects = self.snapshoted_instances_query.all()
       human_readable_ids = [getattr(i, "slug", getattr(i, "email", None))
@@ -3,17 +3,21 @@
 
 import csv
 import logging
+import re
 from StringIO import StringIO
 import chardet
+import sqlalchemy as sa
 
 from flask import g
 
+from ggrc import settings
 from ggrc.app import app
 from ggrc.data_platform import computed_attributes
 from ggrc.models import person
 from ggrc.models.reflection import AttributeInfo
 from ggrc.converters import errors
 from ggrc.converters import get_exportables
+from ggrc.converters import get_shared_unique_rules
 from ggrc.converters.column_handlers import model_column_handlers
 from ggrc.converters.handlers import handlers
 
@@ -224,6 +228,120 @@ def count_objects(csv_data):
   return counts, blocks_info, failed
 
 
+def _get_block_references(data):
+  """Get codes defined in a csv block and values referenced by it.
+
+  Returns:
+    tuple of a set of codes (or emails for people) of the block objects and
+    a set of all other lowercased words in the block cells.
+  """
+  code_names = {"code", "email"}
+  headers = [header.strip().strip("*").lower() for header in data[1]]
+  codes = set()
+  references = set()
+  for row in data[2:]:
+    for header, value in zip(headers, row):
+      words = {word for word in re.split(r"[\s,]+", value.lower()) if word}
+      if header in code_names:
+        codes.update(words)
+      else:
+        references.update(words)
+  return codes, references
+
+
+def _get_related_models(object_class, headers, exportables):
+  """Get importable models the objects of a block can refer to or change.
+
+  These are the block model itself, the importable models it has ORM
+  relationships with, like Audit of an Assessment, and the models of mapping
+  columns of the block.
+  """
+  models = {object_class}
+  importable_models = set(exportables.values())
+  for relationship in sa.inspect(object_class).relationships:
+    if relationship.mapper.class_ in importable_models:
+      models.add(relationship.mapper.class_)
+  for header in headers:
+    match = re.match(r"^(?:un)?map\s*:\s*(.*?)(?:\s+versions)?$", header)
+    if match and exportables.get(match.group(1)):
+      models.add(exportables[match.group(1)])
+  return models
+
+
+def _blocks_depend(first, second):
+  """Check if two blocks from get_dependent_block_groups depend on each other.
+
+  Blocks related to the same model are imported in one group, except for
+  people: most models refer to people, so only blocks importing people depend
+  on all blocks related to them.
+  """
+  first_class, first_models = first[0], first[4]
+  second_class, second_models = second[0], second[4]
+  common_models = first_models & second_models
+  if person.Person not in (first_class, second_class):
+    common_models.discard(person.Person)
+  return (first[1] == second[1] or
+          bool(common_models) or
+          bool(first[2] & second[3]) or
+          bool(first[3] & second[2]) or
+          bool(first[5] & second[5]))
+
+
+def get_dependent_block_groups(data_blocks):
+  """Split csv blocks into groups that can be imported independently.
+
+  The grouping is conservative. Blocks depend on each other if their models
+  are related, if one of them refers to a code or an email defined in the
+  other one, or if they import objects that share unique values. If people
+  can be created by the import, blocks that refer to the same email depend on
+  each other as well, so that the person is created only once. Blocks of
+  unknown object types depend on all other blocks.
+
+  Args:
+    data_blocks: list of (offset, data, csv_lines) tuples from split_blocks.
+
+  Returns:
+    list of lists of indexes of data_blocks. Every group and the groups
+    themselves are ordered by position of the blocks in the csv file.
+  """
+  exportables = get_exportables()
+  sharing_rules = get_shared_unique_rules()
+  blocks = []
+  for _, data, _ in data_blocks:
+    class_name = data[1][0].strip().lower()
+    object_class = exportables.get(class_name)
+    if object_class is None:
+      return [range(len(data_blocks))]
+    unique_group = sharing_rules.get(object_class, object_class)
+    headers = [header.strip().strip("*").lower() for header in data[1]]
+    related_models = _get_related_models(object_class, headers, exportables)
+    codes, references = _get_block_references(data)
+    if settings.INTEGRATION_SERVICE_URL:
+      emails = {word for word in references if "@" in word}
+    else:
+      emails = set()
+    blocks.append((object_class, unique_group, codes, references,
+                   related_models, emails))
+
+  parents = range(len(blocks))
+
+  def find(index):
+    while parents[index] != index:
+      parents[index] = parents[parents[index]]
+      index = parents[index]
+    return index
+
+  for first, first_block in enumerate(blocks):
+    for second in range(first + 1, len(blocks)):
+      if _blocks_depend(first_block, blocks[second]):
+        parents[find(second)] = find(first)
+
+  groups = {}
+  for index in range(len(blocks)):
+    groups.setdefault(find(index), []).append(index)
+  return sorted(groups.values())
+
+
 def get_export_filename(objects, current_time, exportable_objects):
   """Generate export file name"""
   if exportable_objects:
@@ -278,3 +396,10 @@ class CsvStringBuilder(object):
   def get_csv_string(self):
     """Returns CSV string from buffer."""
     return self.output_buffer.getvalue()
+
+  def pop_csv_string(self):
+    """Returns CSV string from buffer and empties the buffer."""
+    csv_string = self.output_buffer.getvalue()
+    self.output_buffer.seek(0)
+    self.output_buffer.truncate()
+    return csv_string
@@ -25,6 +25,7 @@ import sqlalchemy as sa
 from ggrc import db
 from ggrc import login
 from ggrc import utils
+from ggrc.cache import data_version
 from ggrc.utils import revisions as revision_utils, helpers
 from ggrc.utils import benchmark
 from ggrc.models import all_models as models
@@ -562,6 +563,8 @@ def store_data(attributes_data, index_data):
     db.session.execute(ATTRIBUTE_REPLACE_STATEMENT, attributes_data)
   if index_data:
     db.session.execute(INDEX_REPLACE_STATEMENT, index_data)
+  if attributes_data or index_data:
+    data_version.mark_changed(db.session)
   db.session.commit()
 
 
@@ -619,9 +622,8 @@ def get_revisions(revision_ids):
       models.Revision.action,
       models.Revision.resource_type,
       models.Revision.resource_id,
-      # The following protected access is used to prevent calculation of all
-      # fields in revision content, because they are not needed.
-      models.Revision._content,  # pylint: disable=protected-access
+      # Only the child type of the snapshot is loaded from the content.
+      models.Revision.content_keys("child_type").label("_content"),
   ).filter(
       models.Revision.resource_type == "Snapshot",
       models.Revision.id.in_(revision_ids)
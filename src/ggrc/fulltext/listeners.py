@@ -3,7 +3,8 @@
 
 """Fulltext event listeners"""
 
-from collections import Iterable, defaultdict
+from collections import Counter, Iterable, defaultdict
+import logging
 import threading
 
 import sqlalchemy as sa
@@ -14,10 +15,13 @@ from ggrc import fulltext
 from ggrc import utils
 from ggrc.models import all_models, get_model
 from ggrc.fulltext import mixin
+from ggrc.fulltext import queue
 from ggrc.utils import benchmark, helpers
 
 ACTIONS = ['after_insert', 'after_delete', 'after_update']
 
+logger = logging.getLogger(__name__)
+
 
 class ReindexSet(threading.local):
   """Special thread safety object.
@@ -30,6 +34,7 @@ class ReindexSet(threading.local):
     super(ReindexSet, self).__init__(*args, **kwargs)
     self._pool = set()
     self.model_ids_to_reindex = defaultdict(set)
+    self.stats = Counter()
 
   def add(self, item):
     self._pool.add(item)
@@ -51,9 +56,19 @@ class ReindexSet(threading.local):
 
   @helpers.without_sqlalchemy_cache
   def push_ft_records(self):
-    """Function that clear and push new full text records in DB."""
+    """Function that updates stale full text records in DB.
+
+    Numbers of inserted, updated and deleted records are stored in stats.
+    With deferred indexing enabled the objects are only added to the index
+    queue.
+    """
+    self.stats = Counter()
     with benchmark("push ft records into DB"):
       self.warmup()
+      if queue.is_enabled():
+        queue.enqueue(self.model_ids_to_reindex)
+        self.model_ids_to_reindex.clear()
+        return
       for obj in db.session:
         if not isinstance(obj, mixin.Indexed):
           continue
@@ -63,7 +78,13 @@ class ReindexSet(threading.local):
         ids = self.model_ids_to_reindex.pop(model_name)
         chunk_list = utils.list_chunks(list(ids), chunk_size=self.CHUNK_SIZE)
         for ids_chunk in chunk_list:
-          get_model(model_name).bulk_record_update_for(ids_chunk)
+          self.stats.update(
+              get_model(model_name).bulk_record_diff_update_for(ids_chunk)
+          )
+    logger.debug(
+        "Fulltext records inserted: %s, updated: %s, deleted: %s",
+        self.stats["inserted"], self.stats["updated"], self.stats["deleted"],
+    )
 
 
 def _runner(mapper, content, target):  # pylint:disable=unused-argument
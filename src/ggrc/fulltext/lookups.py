@@ -0,0 +1,227 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Typed lookups of shared data used by the fulltext record builder.
+
+Indexed objects refer to people, access control roles, labels and custom
+attribute definitions that are shared by many objects. Instead of loading
+them per object through the ORM, the record builder reads them from these
+lookups that are filled in bulk: for the whole chunk of indexed objects
+before the records of the chunk are built, or for all objects at once by
+IndexerLookups.warm_up() before a full reindex. Warm lookups are reused
+across chunks until the indexer cache is invalidated. The indexer keeps
+separate lookups for every thread.
+"""
+
+from collections import namedtuple
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc.models import all_models
+from ggrc.models.mixins.customattributable import CustomAttributable
+from ggrc.models.mixins.labeled import Labeled
+
+
+PersonValue = namedtuple("PersonValue", ["id", "name", "email"])
+
+RoleValue = namedtuple("RoleValue", ["id", "name", "internal"])
+
+LabelValue = namedtuple("LabelValue", ["id", "name"])
+
+
+class CadValue(namedtuple("CadValue", ["id", "title", "attribute_type",
+                                       "definition_id"])):
+  """Custom attribute definition data needed for indexing."""
+  # pylint: disable=too-few-public-methods
+
+  @property
+  def default_value(self):
+    return all_models.CustomAttributeDefinition.get_default_value_for(
+        self.attribute_type
+    )
+
+  def get_indexed_value(self, value):
+    value_mapping = all_models.CustomAttributeDefinition.ValidTypes.\
+        DEFAULT_VALUE_MAPPING.get(self.attribute_type) or {}
+    return value_mapping.get(value, value)
+
+
+class Lookup(object):
+  """Map of values by id that loads missing values in bulk.
+
+  Ids that do not exist in the DB are remembered with None value so that
+  they are not queried again.
+  """
+
+  def __init__(self):
+    self._values = {}
+
+  def _query(self, ids=None):
+    """Return query for values with given ids or all values if ids is None."""
+    raise NotImplementedError()
+
+  def preload(self, ids=None):
+    """Load values for ids that are not loaded yet, or all values."""
+    if ids is not None:
+      ids = {id_ for id_ in ids if id_ is not None} - set(self._values)
+      if not ids:
+        return
+      self._values.update(dict.fromkeys(ids))
+    for value in self._query(ids):
+      self._values[value.id] = value
+
+  def get(self, id_):
+    """Get value by id, load it if it was not preloaded."""
+    if id_ not in self._values:
+      self.preload([id_])
+    return self._values.get(id_)
+
+  def set(self, value):
+    self._values[value.id] = value
+
+
+class PeopleLookup(Lookup):
+  """Lookup of person names and emails."""
+
+  def _query(self, ids=None):
+    query = db.session.query(
+        all_models.Person.id,
+        all_models.Person.name,
+        all_models.Person.email,
+    )
+    if ids is not None:
+      query = query.filter(all_models.Person.id.in_(ids))
+    return (PersonValue(*row) for row in query)
+
+
+class RoleLookup(Lookup):
+  """Lookup of access control role names."""
+
+  def _query(self, ids=None):
+    query = db.session.query(
+        all_models.AccessControlRole.id,
+        all_models.AccessControlRole.name,
+        all_models.AccessControlRole.internal,
+    )
+    if ids is not None:
+      query = query.filter(all_models.AccessControlRole.id.in_(ids))
+    return (RoleValue(*row) for row in query)
+
+
+class LabelLookup(Lookup):
+  """Lookup of label names."""
+
+  def _query(self, ids=None):
+    query = db.session.query(all_models.Label.id, all_models.Label.name)
+    if ids is not None:
+      query = query.filter(all_models.Label.id.in_(ids))
+    return (LabelValue(*row) for row in query)
+
+
+class CadLookup(object):
+  """Lookup of custom attribute definitions of indexed objects.
+
+  Global definitions are loaded once per definition type. Local definitions
+  are loaded for a chunk of objects and dropped before the next chunk.
+  """
+
+  def __init__(self):
+    self._global = {}
+    self._local = {}
+
+  def preload(self, definition_type, ids=None):
+    """Load global definitions and local definitions for the given ids.
+
+    Both are loaded with a single query.
+    """
+    cad = all_models.CustomAttributeDefinition
+    conditions = []
+    if definition_type not in self._global:
+      self._global[definition_type] = []
+      conditions.append(cad.definition_id.is_(None))
+    if ids:
+      self._local.update(((definition_type, id_), []) for id_ in ids)
+      conditions.append(cad.definition_id.in_(ids))
+    if not conditions:
+      return
+    query = db.session.query(
+        cad.id, cad.title, cad.attribute_type, cad.definition_id,
+    ).filter(
+        cad.definition_type == definition_type,
+        sa.or_(*conditions),
+    ).order_by(cad.id)
+    for value in (CadValue(*row) for row in query):
+      if value.definition_id is None:
+        self._global[definition_type].append(value)
+      else:
+        self._local[(definition_type, value.definition_id)].append(value)
+
+  def drop_local(self):
+    self._local = {}
+
+  def get_for(self, obj):
+    """Get definitions of the object in the order of its relationship.
+
+    Local definitions go first, so the global ones take precedence in case of
+    the same title, as with obj.custom_attribute_definitions.
+    """
+    # pylint: disable=protected-access
+    definition_type = obj._inflector.table_singular
+    key = (definition_type, obj.id)
+    if key not in self._local:
+      self.preload(definition_type, [obj.id])
+    return self._local[key] + self._global[definition_type]
+
+
+class IndexerLookups(object):
+  """Container of the lookups used by the record builder."""
+
+  def __init__(self):
+    self.people = None
+    self.roles = None
+    self.labels = None
+    self.cads = None
+    self.is_warm = False
+    self.reset()
+
+  def reset(self):
+    """Drop all loaded values."""
+    self.people = PeopleLookup()
+    self.roles = RoleLookup()
+    self.labels = LabelLookup()
+    self.cads = CadLookup()
+    self.is_warm = False
+
+  def warm_up(self):
+    """Preload people, roles and labels for the whole reindex."""
+    self.people.preload()
+    self.roles.preload()
+    self.labels.preload()
+    self.is_warm = True
+
+  def preload_for(self, model, instances):
+    """Preload the data referenced by a chunk of indexed objects.
+
+    Without warm up the previously loaded values are dropped first, so that
+    regular indexing on commit never uses outdated values.
+    """
+    # pylint: disable=protected-access
+    if not self.is_warm:
+      self.reset()
+    if issubclass(model, CustomAttributable):
+      self.cads.drop_local()
+      self.cads.preload(model._inflector.table_singular,
+                        [obj.id for obj in instances])
+      self.people.preload(
+          cav.attribute_object_id
+          for obj in instances
+          for cav in obj.custom_attribute_values
+          if cav.custom_attribute.attribute_type == "Map:Person"
+      )
+    if issubclass(model, Labeled):
+      self.labels.preload(
+          object_label.label_id
+          for obj in instances
+          for object_label in obj._object_labels
+      )
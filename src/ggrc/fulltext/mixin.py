@@ -2,6 +2,7 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 """Module contains Indexed mixin class"""
 import itertools
+from collections import Counter
 from collections import namedtuple
 
 from sqlalchemy import orm
@@ -10,6 +11,14 @@ from ggrc import db
 
 from ggrc import fulltext
 from ggrc import utils
+from ggrc.cache import data_version
+
+
+def _record_key(row):
+  """Get primary key of fulltext record row as a tuple."""
+  if isinstance(row, dict):
+    return (row["key"], row["type"], row["property"], row["subproperty"])
+  return (row.key, row.type, row.property, row.subproperty)
 
 
 class ReindexRule(namedtuple("ReindexRule", ["model", "rule", "fields"])):
@@ -40,8 +49,9 @@ class Indexed(object):
   @classmethod
   def insert_records(cls, ids):
     """Calculate and insert records into fulltext_record_properties table."""
-    instances = cls.indexed_query().filter(cls.id.in_(ids))
+    instances = cls.indexed_query().filter(cls.id.in_(ids)).all()
     indexer = fulltext.get_indexer()
+    indexer.cache.preload_for(cls, instances)
     rows = itertools.chain(*[indexer.records_generator(i) for i in instances])
     for vals_chunk in utils.iter_chunks(rows, chunk_size=10000):
       query = """
@@ -53,6 +63,7 @@ class Indexed(object):
       if not values:
         return
       db.session.execute(query, values)
+      data_version.mark_changed(db.session)
 
   @classmethod
   def get_delete_query_for(cls, ids):
@@ -75,6 +86,7 @@ class Indexed(object):
               fulltext_record_properties.key IN :obj_ids
     """
     db.session.execute(query, {"obj_type": cls.__name__, "obj_ids": ids})
+    data_version.mark_changed(db.session)
 
   @classmethod
   def bulk_record_update_for(cls, ids):
@@ -85,6 +97,83 @@ class Indexed(object):
     cls.delete_records(ids)
     cls.insert_records(ids)
 
+  @classmethod
+  def bulk_record_diff_update_for(cls, ids):
+    """Bulky update index records for current class changing only stale rows.
+
+    New records are compared with the records stored in the index and only
+    the missing rows are inserted, the changed rows are updated and the
+    obsolete rows are deleted. Stored rows are read without locks, so missing
+    and changed rows are written with INSERT ... ON DUPLICATE KEY UPDATE and
+    rows inserted by a concurrent transaction in the meantime are updated
+    instead of failing on the primary key.
+
+    Returns:
+      Counter with the numbers of "inserted", "updated" and "deleted" rows.
+    """
+    stats = Counter(inserted=0, updated=0, deleted=0)
+    if not ids:
+      return stats
+
+    indexer = fulltext.get_indexer()
+    record = indexer.record_type
+    instances = cls.indexed_query().filter(cls.id.in_(ids)).all()
+    indexer.cache.preload_for(cls, instances)
+    new_rows = {}
+    for instance in instances:
+      for row in indexer.records_generator(instance):
+        new_rows[_record_key(row)] = row
+
+    old_rows = {
+        _record_key(row): (row.tags, row.content)
+        for row in db.session.query(
+            record.key, record.type, record.property, record.subproperty,
+            record.tags, record.content,
+        ).filter(
+            record.type == cls.__name__,
+            record.key.in_(ids),
+        )
+    }
+
+    to_delete = [
+        dict(zip(("key", "type", "property", "subproperty"), key))
+        for key in old_rows if key not in new_rows
+    ]
+    to_update = [
+        row for key, row in new_rows.iteritems()
+        if key in old_rows and old_rows[key] != (row["tags"], row["content"])
+    ]
+    to_insert = [
+        row for key, row in new_rows.iteritems() if key not in old_rows
+    ]
+
+    # Deletes go first, a renamed property may differ from the stale one only
+    # in letter case, which is the same primary key for MySQL.
+    if to_delete:
+      db.session.execute("""
+          DELETE FROM fulltext_record_properties
+          WHERE `key` = :key AND type = :type AND
+                property = :property AND subproperty = :subproperty
+      """, to_delete)
+    for vals_chunk in utils.list_chunks(to_insert + to_update,
+                                        chunk_size=10000):
+      db.session.execute("""
+          INSERT INTO fulltext_record_properties (
+            `key`, type, tags, property, subproperty, content
+          ) VALUES (:key, :type, :tags, :property, :subproperty, :content)
+          ON DUPLICATE KEY UPDATE
+            tags = VALUES(tags), content = VALUES(content)
+      """, vals_chunk)
+
+    if to_delete or to_update or to_insert:
+      data_version.mark_changed(db.session)
+    stats.update(
+        inserted=len(to_insert),
+        updated=len(to_update),
+        deleted=len(to_delete),
+    )
+    return stats
+
   @classmethod
   def indexed_query(cls):
     return cls.query.options(orm.Load(cls).load_only("id"),)
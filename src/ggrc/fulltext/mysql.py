@@ -12,6 +12,7 @@ from ggrc import db
 from ggrc.fulltext.sql import SqlIndexer
 from ggrc.models import all_models
 from ggrc.query import my_objects
+from ggrc.query import utils as query_utils
 from ggrc.rbac import permissions
 from ggrc.utils import benchmark
 
@@ -78,7 +79,8 @@ class MysqlIndexer(SqlIndexer):
       elif resources:
         type_queries.append(sa.and_(
             MysqlRecordProperty.type == model_name,
-            MysqlRecordProperty.key.in_(resources),
+            query_utils.in_ids(MysqlRecordProperty.key, resources,
+                               model_name, permission_type),
         ))
 
     if not type_queries:
@@ -0,0 +1,220 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Deferred fulltext indexing queue.
+
+If FULLTEXT_DEFERRED_INDEXING setting is enabled, the objects that have to be
+reindexed are not indexed inside the committing request. Their (type, id)
+pairs are committed into fulltext_index_queue table together with the object
+changes and the queue is drained later by a worker in coalesced chunks.
+
+Reads that depend on the index drain the entries queued by the current user
+and the entries older than FULLTEXT_INDEX_MAX_STALENESS seconds before
+running, so users always see their own edits and no edit stays unindexed
+longer than the configured staleness. The rest of the queue is drained by a
+worker that runs every minute.
+
+Workers and readers claim the rows they reindex, so concurrent drains do not
+process the same entries. The only exception are the entries of the current
+user that another worker has claimed when a read starts. The read reindexes
+them again without waiting for the worker, which is safe as reindexing
+writes the same records.
+"""
+
+import datetime
+import logging
+from collections import Counter, defaultdict
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import login
+from ggrc import settings
+from ggrc.cache import data_version
+from ggrc.models import get_model
+from ggrc.models.mixins.claimable import Claimable
+from ggrc.utils import benchmark
+
+
+logger = logging.getLogger(__name__)
+
+DRAIN_CHUNK_SIZE = 500
+
+
+class FulltextIndexQueue(Claimable, db.Model):
+  """Db model for objects waiting to be reindexed."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "fulltext_index_queue"
+
+  id = db.Column(db.Integer, primary_key=True)  # noqa
+  object_type = db.Column(db.String(64), nullable=False)
+  object_id = db.Column(db.Integer, nullable=False)
+  modified_by_id = db.Column(db.Integer, nullable=True)
+  created_at = db.Column(db.DateTime, nullable=False)
+
+  __table_args__ = (
+      db.Index("ix_fulltext_index_queue_created_at", "created_at"),
+      db.Index("ix_fulltext_index_queue_modified_by_id", "modified_by_id"),
+  )
+
+
+def is_enabled():
+  return bool(getattr(settings, "FULLTEXT_DEFERRED_INDEXING", False))
+
+
+def enqueue(model_ids):
+  """Add objects to the index queue.
+
+  Args:
+    model_ids: dict of sets of object ids keyed by model name.
+  """
+  user_id = login.get_current_user_id()
+  now = datetime.datetime.utcnow()
+  values = [
+      {
+          "object_type": model_name,
+          "object_id": object_id,
+          "modified_by_id": user_id,
+          "created_at": now,
+      }
+      for model_name, ids in model_ids.iteritems()
+      for object_id in ids
+  ]
+  if values:
+    db.session.execute(FulltextIndexQueue.__table__.insert(), values)
+
+
+def _query_entries(*criteria):
+  """Get queued entries matching the criteria."""
+  return db.session.query(
+      FulltextIndexQueue.object_type,
+      FulltextIndexQueue.object_id,
+  ).filter(*criteria).all()
+
+
+def _reindex_rows(rows):
+  """Reindex queued objects.
+
+  Every object is reindexed once even if it is queued several times.
+
+  Returns:
+    Counter with the numbers of "inserted", "updated" and "deleted" fulltext
+    records.
+  """
+  model_ids = defaultdict(set)
+  for row in rows:
+    model_ids[row.object_type].add(row.object_id)
+  stats = Counter()
+  for model_name, ids in model_ids.iteritems():
+    model = get_model(model_name)
+    if model is None:
+      continue
+    stats.update(model.bulk_record_diff_update_for(list(ids)))
+  return stats
+
+
+def _reindex_chunk(token):
+  """Reindex queued objects claimed with the token and remove them."""
+  rows = _query_entries(FulltextIndexQueue.claimed_by == token)
+  try:
+    stats = _reindex_rows(rows)
+  except Exception:
+    db.session.rollback()
+    FulltextIndexQueue.release(token)
+    raise
+  FulltextIndexQueue.delete_claimed(token)
+  # Results of /query depend on the index
+  data_version.mark_changed(db.session)
+  db.session.plain_commit()
+  stats["queued"] += len(rows)
+  return stats
+
+
+def _reindex_claimed(user_id):
+  """Reindex entries of the user that are claimed by other workers.
+
+  The entries are left in the queue, they are removed by the workers that
+  claimed them.
+  """
+  rows = _query_entries(
+      FulltextIndexQueue.modified_by_id == user_id,
+      FulltextIndexQueue.claimed_by.isnot(None),
+  )
+  if not rows:
+    return
+  try:
+    _reindex_rows(rows)
+  except Exception:
+    db.session.rollback()
+    raise
+  data_version.mark_changed(db.session)
+  db.session.plain_commit()
+
+
+def drain(user_id=None, max_staleness=None, chunk_size=DRAIN_CHUNK_SIZE):
+  """Reindex queued objects.
+
+  Args:
+    user_id: if set, the entries queued by this user are drained.
+    max_staleness: if set, the entries older than this number of seconds
+      are drained. If neither user_id nor max_staleness is set, the whole
+      queue is drained.
+    chunk_size: number of queue entries reindexed and committed at once.
+
+  Returns:
+    Counter with the numbers of "inserted", "updated" and "deleted" fulltext
+    records and the number of "queued" entries processed.
+  """
+  query = db.session.query(FulltextIndexQueue.id)
+  criteria = []
+  if user_id is not None:
+    criteria.append(FulltextIndexQueue.modified_by_id == user_id)
+  if max_staleness is not None:
+    criteria.append(
+        FulltextIndexQueue.created_at < datetime.datetime.utcnow() -
+        datetime.timedelta(seconds=max_staleness)
+    )
+  if criteria:
+    query = query.filter(sa.or_(*criteria))
+
+  stats = Counter()
+  with benchmark("Drain fulltext index queue"):
+    while True:
+      token = FulltextIndexQueue.claim(query, chunk_size)
+      if token is None:
+        break
+      stats.update(_reindex_chunk(token))
+  if stats["queued"]:
+    logger.info(
+        "Fulltext index queue drained: %s entries, records inserted: %s, "
+        "updated: %s, deleted: %s", stats["queued"], stats["inserted"],
+        stats["updated"], stats["deleted"],
+    )
+  return stats
+
+
+def drain_for_read():
+  """Drain the entries needed for a consistent fulltext read.
+
+  These are the entries queued by the current user (read-your-writes),
+  including the ones claimed by other workers, and the entries older than
+  FULLTEXT_INDEX_MAX_STALENESS seconds.
+  """
+  if not is_enabled():
+    return
+  user_id = login.get_current_user_id()
+  drain(
+      user_id=user_id,
+      max_staleness=settings.FULLTEXT_INDEX_MAX_STALENESS,
+  )
+  if user_id is not None:
+    _reindex_claimed(user_id)
+
+
+def process_queue():
+  """Worker job that drains the whole index queue.
+
+  Chunked imports queue their rows even if deferred indexing is disabled, so
+  the queue is drained regardless of the setting.
+  """
+  drain()
@@ -11,6 +11,7 @@ from ggrc.models.reflection import AttributeInfo
 from ggrc.models.person import Person
 from ggrc.models.mixins import CustomAttributable
 from ggrc.fulltext.attributes import FullTextAttr
+from ggrc.fulltext.lookups import PersonValue
 from ggrc.fulltext.mixin import Indexed
 
 
@@ -67,29 +68,26 @@ class RecordBuilder(object):
   def get_person_id_name_email(self, person):
     """Get id, name and email for person (either object or dict).
 
-    If there is a global people map, get the data from it instead of the DB.
+    The data is taken from the people lookup of the indexer instead of the DB.
     """
+    people = self.indexer.cache.people
     if isinstance(person, dict):
-      person_id = person["id"]
-    else:
-      person_id = person.id
-    if person_id in self.indexer.cache['people_map']:
-      person_name, person_email = self.indexer.cache['people_map'][person_id]
-    else:
-      if isinstance(person, dict):
+      value = people.get(person["id"])
+      if value is None:
         person = db.session.query(Person).filter_by(
             id=person["id"]
         ).one()
-      person_id = person.id
-      person_name = person.name
-      person_email = person.email
-      self.indexer.cache['people_map'][person_id] = (person_name, person_email)
-    return person_id, person_name, person_email
+    else:
+      value = None
+    if value is None:
+      value = PersonValue(person.id, person.name, person.email)
+      people.set(value)
+    return value.id, value.name, value.email
 
   def get_ac_role_person_id(self, ac_list):
     """Get ac_role name and person name for ac_role (either object or dict).
 
-    If there is a global ac_role map, get the data from it instead of the DB.
+    The role is taken from the roles lookup of the indexer instead of the DB.
     """
     if isinstance(ac_list, dict):
       ac_role_id = ac_list["ac_role_id"]
@@ -97,24 +95,18 @@ class RecordBuilder(object):
     else:
       ac_role_id = ac_list.ac_role_id
       ac_person_id = ac_list.person_id
-    if ac_role_id not in self.indexer.cache['ac_role_map']:
-      ac_role = db.session.query(all_models.AccessControlRole).get(ac_role_id)
-      # Internal roles should not be indexed
-      if ac_role and ac_role.internal:
-        self.indexer.cache['ac_role_map'][ac_role_id] = None
-      else:
-        ac_role_name = ac_role.name if ac_role else None
-        self.indexer.cache['ac_role_map'][ac_role_id] = ac_role_name
-        if ac_role_name is None:
-          # index only existed role, if it have already been
-          # removed than nothing to index.
-          LOGGER.error(
-              "Trying to index not existing ACR with id %s", ac_role_id
-          )
-    ac_role_name = self.indexer.cache['ac_role_map'][ac_role_id]
-    if ac_role_name:
-      ac_role_name = ac_role_name.lower()
-    return ac_role_name, ac_person_id
+    ac_role = self.indexer.cache.roles.get(ac_role_id)
+    if ac_role is None:
+      # index only existed role, if it have already been
+      # removed than nothing to index.
+      LOGGER.error(
+          "Trying to index not existing ACR with id %s", ac_role_id
+      )
+      return None, ac_person_id
+    # Internal roles should not be indexed
+    if ac_role.internal or not ac_role.name:
+      return None, ac_person_id
+    return ac_role.name.lower(), ac_person_id
 
   def build_person_subprops(self, person):
     """Get dict of Person properties for fulltext indexing
@@ -147,19 +139,17 @@ class RecordBuilder(object):
       return {}
     properties = {}
     cavs = {v.custom_attribute_id: v for v in obj.custom_attribute_values}
-    for cad in obj.custom_attribute_definitions:
+    for cad in self.indexer.cache.cads.get_for(obj):
       attribute_name = cad.title
       cav = cavs.get(cad.id)
       if cad.attribute_type == "Map:Person":
-        # pylint: disable=protected-access
-        if cav and cav.attribute_object_id is not None and \
-                cav._attribute_object_attr is not None and \
-                cav.attribute_object is not None:
-          properties[attribute_name] = self.build_person_subprops(
-              cav.attribute_object
-          )
+        person = None
+        if cav and cav.attribute_object_id is not None:
+          person = self.indexer.cache.people.get(cav.attribute_object_id)
+        if person is not None:
+          properties[attribute_name] = self.build_person_subprops(person)
           properties[attribute_name].update(
-              self.build_list_sort_subprop([cav.attribute_object])
+              self.build_list_sort_subprop([person])
           )
       else:
         value = cav.attribute_value if cav is not None else cad.default_value
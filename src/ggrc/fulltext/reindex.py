@@ -0,0 +1,238 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Sharded and resumable full reindex engine.
+
+The id space of every indexed model is split into shards. Every shard is
+reindexed in chunks and the last reindexed id of the shard is checkpointed
+into fulltext_reindex_checkpoints table after each chunk. If the reindex is
+interrupted, the next run of the same models continues every shard from its
+checkpoint instead of starting from scratch. Concurrent runs are prevented
+with a named MySQL lock.
+
+Shards are processed on a pool of REINDEX_PROCESSES worker processes, every
+worker uses its own DB connections. With a single process the shards are
+processed in the current process, which is the only option on App Engine.
+"""
+
+import contextlib
+import datetime
+import logging
+import multiprocessing
+import time
+from collections import defaultdict
+
+import sqlalchemy as sa
+
+from ggrc import db
+from ggrc import fulltext
+from ggrc import settings
+from ggrc.models import get_model
+from ggrc.utils import benchmark
+from ggrc.utils import iter_id_chunks
+
+
+logger = logging.getLogger(__name__)
+
+REINDEX_CHUNK_SIZE = 100
+
+SHARDS_PER_PROCESS = 4
+
+# Name of the MySQL lock held by the active reindex run
+RUN_LOCK_NAME = "ggrc_fulltext_reindex"
+
+
+class ReindexCheckpoint(db.Model):
+  """Db model for progress of a shard of the full reindex."""
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "fulltext_reindex_checkpoints"
+
+  id = db.Column(db.Integer, primary_key=True)  # noqa
+  model_name = db.Column(db.String(64), nullable=False)
+  start_id = db.Column(db.Integer, nullable=False)
+  end_id = db.Column(db.Integer, nullable=False)
+  last_id = db.Column(db.Integer, nullable=False)
+  done = db.Column(db.Boolean, nullable=False, default=False)
+  updated_at = db.Column(db.DateTime, nullable=False)
+
+
+def warm_up_cache():
+  """Preload data shared by all indexed objects into the indexer lookups."""
+  fulltext.get_indexer().cache.warm_up()
+
+
+def _plan_shards(model_names, shard_count):
+  """Split id space of every model into shards and store their checkpoints."""
+  now = datetime.datetime.utcnow()
+  values = []
+  for model_name in model_names:
+    model = get_model(model_name)
+    min_id, max_id = db.session.query(
+        sa.func.min(model.id), sa.func.max(model.id),
+    ).one()
+    if min_id is None:
+      continue
+    shard_size = (max_id - min_id) // shard_count + 1
+    for start_id in range(min_id, max_id + 1, shard_size):
+      values.append({
+          "model_name": model_name,
+          "start_id": start_id,
+          "end_id": min(start_id + shard_size - 1, max_id),
+          "last_id": start_id - 1,
+          "done": False,
+          "updated_at": now,
+      })
+  if values:
+    db.session.execute(ReindexCheckpoint.__table__.insert(), values)
+  db.session.plain_commit()
+
+
+def reindex_shard(checkpoint_id):
+  """Reindex objects of a shard starting after its checkpoint.
+
+  Returns:
+    a tuple of the model name, number of reindexed objects and the time
+    spent in seconds.
+  """
+  start = time.time()
+  checkpoint = ReindexCheckpoint.query.get(checkpoint_id)
+  model = get_model(checkpoint.model_name)
+  count = 0
+  for ids in iter_id_chunks(
+      db.session.query(model.id).filter(model.id <= checkpoint.end_id),
+      model.id,
+      REINDEX_CHUNK_SIZE,
+      after_id=checkpoint.last_id,
+  ):
+    model.bulk_record_update_for(ids)
+    checkpoint.last_id = ids[-1]
+    count += len(ids)
+    checkpoint.updated_at = datetime.datetime.utcnow()
+    db.session.plain_commit()
+    logger.info("%s: reindexed up to id %s of shard %s - %s",
+                checkpoint.model_name, checkpoint.last_id,
+                checkpoint.start_id, checkpoint.end_id)
+  checkpoint.done = True
+  checkpoint.updated_at = datetime.datetime.utcnow()
+  db.session.plain_commit()
+  return checkpoint.model_name, count, time.time() - start
+
+
+def _reindex_shard_in_worker(checkpoint_id):
+  """Run reindex_shard inside the app context of a worker process."""
+  # pylint: disable=cyclic-import
+  from ggrc.app import app
+  with app.app_context():
+    if not fulltext.get_indexer().cache.is_warm:
+      warm_up_cache()
+    try:
+      return reindex_shard(checkpoint_id)
+    finally:
+      db.session.remove()
+
+
+def _log_throughput(results, elapsed):
+  """Log reindexed objects of every model and the overall throughput.
+
+  Shards run in parallel, so the time spent by shards of a model is not the
+  wall-clock time of the run. The throughput is computed from the wall-clock
+  time of the whole run.
+  """
+  totals = defaultdict(lambda: [0, 0.0])
+  for model_name, count, duration in results:
+    totals[model_name][0] += count
+    totals[model_name][1] += duration
+  for model_name in sorted(totals):
+    count, duration = totals[model_name]
+    logger.info("%s: %s objects reindexed in %.2f s of shard time",
+                model_name, count, duration)
+  count = sum(count for count, _ in totals.itervalues())
+  logger.info("%s objects reindexed in %.2f s, %.2f records/sec",
+              count, elapsed, count / elapsed if elapsed else 0)
+
+
+@contextlib.contextmanager
+def _run_lock():
+  """Hold a named DB lock for the duration of a reindex run.
+
+  The lock is held by a separate connection, so it is kept while the
+  session is committed, removed or replaced in worker processes.
+
+  Yields:
+    True if the lock was acquired, False if another run holds it.
+  """
+  with db.engine.connect() as connection:
+    acquired = connection.execute(
+        sa.select([sa.func.get_lock(RUN_LOCK_NAME, 0)])
+    ).scalar()
+    try:
+      yield bool(acquired)
+    finally:
+      if acquired:
+        connection.execute(sa.select([sa.func.release_lock(RUN_LOCK_NAME)]))
+
+
+def run(model_names, processes=None):
+  """Reindex all objects of the given models.
+
+  If a previous run of the models was interrupted, only their unfinished
+  shards are reindexed, each from its checkpoint. Only one run can be
+  active at a time, a run started while another one is active does nothing.
+
+  Args:
+    model_names: names of indexed models to reindex.
+    processes: number of worker processes, REINDEX_PROCESSES by default.
+  """
+  with _run_lock() as acquired:
+    if not acquired:
+      logger.warning("Fulltext reindex is already running, skipping")
+      return
+    _run(sorted(model_names), processes)
+
+
+def _run(model_names, processes):
+  """Reindex all objects of the given models while holding the run lock."""
+  if processes is None:
+    processes = settings.REINDEX_PROCESSES
+  start = time.time()
+  checkpoints = ReindexCheckpoint.query.filter(
+      ReindexCheckpoint.model_name.in_(model_names)
+  )
+  resumed = {name for name, in checkpoints.with_entities(
+      ReindexCheckpoint.model_name
+  ).distinct()}
+  if resumed:
+    logger.info("Resuming interrupted reindex of %s",
+                ", ".join(sorted(resumed)))
+  _plan_shards([name for name in model_names if name not in resumed],
+               max(1, processes * SHARDS_PER_PROCESS))
+  checkpoint_ids = [id_ for id_, in checkpoints.with_entities(
+      ReindexCheckpoint.id
+  ).filter(
+      ReindexCheckpoint.done == sa.false()
+  ).order_by(
+      ReindexCheckpoint.model_name, ReindexCheckpoint.start_id
+  )]
+
+  with benchmark("Reindex %s shards" % len(checkpoint_ids)):
+    if processes > 1:
+      db.session.plain_commit()
+      # Workers must not share connections inherited from this process,
+      # they open their own ones after the fork.
+      db.session.remove()
+      db.engine.dispose()
+      pool = multiprocessing.Pool(processes)
+      try:
+        results = pool.map(_reindex_shard_in_worker, checkpoint_ids)
+      finally:
+        pool.close()
+        pool.join()
+    else:
+      warm_up_cache()
+      results = [reindex_shard(id_) for id_ in checkpoint_ids]
+
+  _log_throughput(results, time.time() - start)
+  db.session.execute(ReindexCheckpoint.__table__.delete().where(
+      ReindexCheckpoint.model_name.in_(model_names)
+  ))
+  db.session.plain_commit()
@@ -3,9 +3,11 @@
 
 """SQL routines for full-text indexing."""
 
+import threading
 from collections import defaultdict
 
 from ggrc import db
+from ggrc.fulltext import lookups
 
 
 class SqlIndexer(object):
@@ -14,9 +16,20 @@ class SqlIndexer(object):
   def __init__(self, settings):
     self.indexer_rules = defaultdict(list)
     self.indexer_fields = defaultdict(set)
-    self.cache = defaultdict(dict)
+    self._local = threading.local()
     self.builders = {}
 
+  @property
+  def cache(self):
+    """Lookups of the current thread.
+
+    The indexer is shared by the whole process, so every thread that indexes
+    objects, like a worker of a concurrent import, fills its own lookups.
+    """
+    if getattr(self._local, "cache", None) is None:
+      self._local.cache = lookups.IndexerLookups()
+    return self._local.cache
+
   def get_builder(self, obj_class):
     """return recordbuilder for sent class
 
@@ -31,7 +44,7 @@ class SqlIndexer(object):
     return builder
 
   def invalidate_cache(self):
-    self.cache = defaultdict(dict)
+    self._local.cache = None
 
   def search(self, terms):
     raise NotImplementedError()
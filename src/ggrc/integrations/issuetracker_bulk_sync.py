@@ -14,6 +14,7 @@ from sqlalchemy.sql import expression as expr
 
 from ggrc import models, db, login, settings
 from ggrc.app import app
+from ggrc.cache import data_version
 from ggrc.integrations import integrations_errors, issues
 from ggrc.integrations.synchronization_jobs import sync_utils
 from ggrc.models import all_models, inflector
@@ -275,6 +276,7 @@ class IssueTrackerBulkCreator(object):
     try:
       update_values = self.create_update_values(issues_info)
       db.session.execute(stmt, update_values)
+      data_version.mark_changed(db.session)
       self.log_issues(issues_info.keys())
       db.session.commit()
     except sa.exc.OperationalError as error:
@@ -16,10 +16,11 @@ from alembic.config import Config, CommandLine
 from alembic.environment import EnvironmentContext
 from alembic.script import ScriptDirectory
 from ggrc import app  # noqa: Used to initialize default url handler
+from ggrc.access_control import permissions_store
 from ggrc.extensions import get_extension_module, get_extension_modules
 from ggrc.models.maintenance import Maintenance
 from ggrc.models.maintenance import MigrationLog
-from google.appengine.api import memcache
+from ggrc.cache import backends as cache_backends
 
 # pylint: disable=invalid-name
 logger = getLogger(__name__)
@@ -161,8 +162,11 @@ def upgradeall(config=None, row_id=None):
 def migrate(row_id=None):
   '''Upgrade all modules and clear entire memcache.'''
   upgradeall(row_id=row_id)
+  # Migrations can change ACL data without maintaining materialized
+  # permissions
+  permissions_store.invalidate_all()
   # flushes out memcache entirely
-  memcache.flush_all()
+  cache_backends.get_cache_client().flush_all()
 
 
 def downgradeall(config=None, drop_versions_table=False):
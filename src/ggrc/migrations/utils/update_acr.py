@@ -6,13 +6,60 @@
 """Helper for updating access_control_roles table with the missing records
 
 """
-import json
 from datetime import datetime
 
 import sqlalchemy as sa
 from sqlalchemy.sql import table, text, column
 from alembic import op
 
+from ggrc.models.types import CompactJsonType
+
+
+def _has_compact_content(connection):
+  """Check if revisions can store content in the compact format.
+
+  The helper is used by migrations that run before the content_compact
+  column is added.
+  """
+  inspector = sa.engine.reflection.Inspector.from_engine(connection)
+  return any(col["name"] == "content_compact"
+             for col in inspector.get_columns("revisions"))
+
+
+def _find_deleted_acr_id(connection, role, model):
+  """Find id of the role among deleted revisions of roles."""
+  role_content = "%\"name\": \"{}\"%".format(role)
+  model_content = "%\"object_type\": \"{}\"%".format(model)
+  if not _has_compact_content(connection):
+    res = connection.execute(text(
+        """
+        SELECT content FROM revisions
+        WHERE resource_type='AccessControlRole'
+        AND action='deleted'
+        AND content LIKE :role_content
+        AND content LIKE :model_content
+        ORDER BY created_at DESC;
+        """
+    ), role_content=role_content, model_content=model_content)
+  else:
+    # Compact content can not be matched with LIKE, such revisions are
+    # checked after they are loaded.
+    res = connection.execute(text(
+        """
+        SELECT COALESCE(content_compact, content) FROM revisions
+        WHERE resource_type='AccessControlRole'
+        AND action='deleted'
+        AND (content_compact IS NOT NULL OR
+             content LIKE :role_content AND content LIKE :model_content)
+        ORDER BY created_at DESC;
+        """
+    ), role_content=role_content, model_content=model_content)
+  for (content,) in res:
+    acr = CompactJsonType.loads_keys(content, ("id", "name", "object_type"))
+    if acr.get("name") == role and acr.get("object_type") == model:
+      return acr.get("id")
+  return None
+
 
 def update_acr(role, model, **kwargs):
   """Update one row in acr"""
@@ -26,24 +73,8 @@ def update_acr(role, model, **kwargs):
   ), role=role, type=model)
   if res.rowcount > 0:
     return
-  role_content = "%\"name\": \"{}\"%".format(role)
-  model_content = "%\"object_type\": \"{}\"%".format(model)
   # check if the role could be found among deleted revisions
-  res = connection.execute(text(
-      """
-      SELECT content FROM revisions
-      WHERE resource_type='AccessControlRole'
-      AND action='deleted'
-      AND content LIKE :role_content
-      AND content LIKE :model_content
-      ORDER BY created_at DESC;
-      """
-  ), role_content=role_content, model_content=model_content)
-  acr = res.first()
-  acr_id = None
-  if acr:
-    acr = json.loads(acr[0])
-    acr_id = acr.get("id")
+  acr_id = _find_deleted_acr_id(connection, role, model)
   # otherwise just insert a new one
   acr_table = table(
       "access_control_roles",
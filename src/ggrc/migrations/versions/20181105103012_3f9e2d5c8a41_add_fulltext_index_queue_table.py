@@ -0,0 +1,40 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add fulltext_index_queue table
+
+Create Date: 2018-11-05 10:30:12.418236
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3f9e2d5c8a41'
+down_revision = '9beabcd92f34'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'fulltext_index_queue',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('object_type', sa.String(length=64), nullable=False),
+      sa.Column('object_id', sa.Integer(), nullable=False),
+      sa.Column('modified_by_id', sa.Integer(), nullable=True),
+      sa.Column('created_at', sa.DateTime(), nullable=False),
+      sa.PrimaryKeyConstraint('id'),
+  )
+  op.create_index('ix_fulltext_index_queue_created_at',
+                  'fulltext_index_queue', ['created_at'], unique=False)
+  op.create_index('ix_fulltext_index_queue_modified_by_id',
+                  'fulltext_index_queue', ['modified_by_id'], unique=False)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('fulltext_index_queue')
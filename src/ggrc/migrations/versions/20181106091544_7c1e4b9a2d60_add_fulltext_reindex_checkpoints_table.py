@@ -0,0 +1,38 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add fulltext_reindex_checkpoints table
+
+Create Date: 2018-11-06 09:15:44.208711
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7c1e4b9a2d60'
+down_revision = '3f9e2d5c8a41'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'fulltext_reindex_checkpoints',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('model_name', sa.String(length=64), nullable=False),
+      sa.Column('start_id', sa.Integer(), nullable=False),
+      sa.Column('end_id', sa.Integer(), nullable=False),
+      sa.Column('last_id', sa.Integer(), nullable=False),
+      sa.Column('done', sa.Boolean(), nullable=False),
+      sa.Column('updated_at', sa.DateTime(), nullable=False),
+      sa.PrimaryKeyConstraint('id'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('fulltext_reindex_checkpoints')
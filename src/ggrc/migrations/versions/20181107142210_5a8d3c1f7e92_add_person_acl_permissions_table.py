@@ -0,0 +1,36 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add person_acl_permissions table
+
+Create Date: 2018-11-07 14:22:10.573184
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5a8d3c1f7e92'
+down_revision = '7c1e4b9a2d60'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'person_acl_permissions',
+      sa.Column('person_id', sa.Integer(), autoincrement=False,
+                nullable=False),
+      sa.Column('version', sa.Integer(), nullable=False),
+      sa.Column('content', mysql.MEDIUMBLOB(), nullable=True),
+      sa.PrimaryKeyConstraint('person_id'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('person_acl_permissions')
@@ -0,0 +1,67 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add compact content column to revisions
+
+Existing revisions keep their Json text content and are converted to the
+compact format online by the compact_revisions background task.
+
+Create Date: 2018-11-13 16:27:48.536102
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import json
+
+import sqlalchemy as sa
+
+from alembic import op
+
+from ggrc.models.types import CompactJsonType
+
+# revision identifiers, used by Alembic.
+revision = '7d1e4b9a2c60'
+down_revision = '3c7f9a2e6b15'
+
+CHUNK_SIZE = 1000
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.execute("""
+      ALTER TABLE revisions
+          ADD COLUMN content_compact LONGBLOB NULL,
+          MODIFY content LONGTEXT NULL
+  """)
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  connection = op.get_bind()
+  revisions = sa.sql.table(
+      "revisions",
+      sa.sql.column("id", sa.Integer),
+      sa.sql.column("content", sa.Text),
+      sa.sql.column("content_compact", sa.LargeBinary),
+  )
+  while True:
+    rows = connection.execute(
+        sa.select([revisions.c.id, revisions.c.content_compact]).where(
+            revisions.c.content_compact.isnot(None)
+        ).limit(CHUNK_SIZE)
+    ).fetchall()
+    if not rows:
+      break
+    connection.execute(
+        revisions.update().where(
+            revisions.c.id == sa.bindparam("_id")
+        ).values(content=sa.bindparam("_content"), content_compact=None),
+        [{"_id": id_, "_content": json.dumps(CompactJsonType.loads(data))}
+         for id_, data in rows],
+    )
+  op.execute("""
+      ALTER TABLE revisions
+          DROP COLUMN content_compact,
+          MODIFY content LONGTEXT NOT NULL
+  """)
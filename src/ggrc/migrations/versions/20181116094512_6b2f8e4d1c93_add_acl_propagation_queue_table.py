@@ -0,0 +1,48 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add acl_propagation_queue table
+
+Create Date: 2018-11-16 09:45:12.306417
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '6b2f8e4d1c93'
+down_revision = '7d1e4b9a2c60'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'acl_propagation_queue',
+      sa.Column('id', sa.Integer(), nullable=False),
+      sa.Column('object_type', sa.String(length=64), nullable=False),
+      sa.Column('object_id', sa.Integer(), nullable=False),
+      sa.Column('modified_by_id', sa.Integer(), nullable=True),
+      sa.Column('created_at', sa.DateTime(), nullable=False),
+      sa.Column('claimed_by', sa.String(length=32), nullable=True),
+      sa.Column('claimed_at', sa.DateTime(), nullable=True),
+      sa.PrimaryKeyConstraint('id'),
+  )
+  op.create_index(
+      'ix_acl_propagation_queue_object',
+      'acl_propagation_queue',
+      ['object_type', 'object_id'],
+  )
+  op.create_index(
+      'ix_acl_propagation_queue_modified_by_id',
+      'acl_propagation_queue',
+      ['modified_by_id'],
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('acl_propagation_queue')
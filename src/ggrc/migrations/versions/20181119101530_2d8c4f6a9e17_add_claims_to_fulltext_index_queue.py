@@ -0,0 +1,32 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add claim columns to fulltext_index_queue
+
+Create Date: 2018-11-19 10:15:30.428511
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2d8c4f6a9e17'
+down_revision = '6b2f8e4d1c93'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.add_column('fulltext_index_queue',
+                sa.Column('claimed_by', sa.String(length=32), nullable=True))
+  op.add_column('fulltext_index_queue',
+                sa.Column('claimed_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_column('fulltext_index_queue', 'claimed_at')
+  op.drop_column('fulltext_index_queue', 'claimed_by')
@@ -0,0 +1,37 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""
+Add import_export_content_chunks table
+
+Create Date: 2018-11-19 14:30:12.518204
+"""
+# disable Invalid constant name pylint warning for mandatory Alembic variables.
+# pylint: disable=invalid-name
+
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5a1e7c3b9d24'
+down_revision = '2d8c4f6a9e17'
+
+
+def upgrade():
+  """Upgrade database schema and/or data, creating a new revision."""
+  op.create_table(
+      'import_export_content_chunks',
+      sa.Column('import_export_id', sa.Integer(), nullable=False),
+      sa.Column('seq', sa.Integer(), nullable=False),
+      sa.Column('chunk', mysql.LONGTEXT(), nullable=False),
+      sa.ForeignKeyConstraint(['import_export_id'], ['import_exports.id'],
+                              ondelete='CASCADE'),
+      sa.PrimaryKeyConstraint('import_export_id', 'seq'),
+  )
+
+
+def downgrade():
+  """Downgrade database schema and/or data back to the previous revision."""
+  op.drop_table('import_export_content_chunks')
@@ -66,6 +66,7 @@ def init_session_monitor_cache():
   from sqlalchemy.orm.session import Session
   from sqlalchemy import event
   from ggrc.models.cache import Cache
+  from ggrc.cache import data_version
 
   def update_cache_before_flush(session, flush_context, objects):
     with benchmark("update cache before flush"):
@@ -88,6 +89,7 @@ def init_session_monitor_cache():
   event.listen(Session, 'after_flush', update_cache_after_flush)
   event.listen(Session, 'after_commit', clear_cache)
   event.listen(Session, 'after_rollback', clear_cache)
+  data_version.init_listeners()
 
 
 def init_sanitization_hooks():
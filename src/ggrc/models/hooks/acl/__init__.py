@@ -8,11 +8,14 @@ This package should have the single hook that should handle all acl propagation
 and deletion.
 """
 import collections
+import itertools
 
 import flask
 import sqlalchemy as sa
 from sqlalchemy.orm.session import Session
 
+from ggrc import db
+from ggrc.access_control import propagation_queue
 from ggrc.models import all_models
 from ggrc.models.hooks.acl import propagation
 from ggrc.utils import benchmark
@@ -69,6 +72,29 @@ def _get_propagation_entries(session):
           deleted)
 
 
+def _get_permission_changes(session):
+  """Get ids of people and roles with changed ACL permissions.
+
+  Args:
+    session: db session with all objects
+
+  Returns:
+    set of ids of people added to or removed from ACL entries and set of ids
+    of changed or deleted access control roles.
+  """
+  person_ids = {
+      obj.person_id
+      for obj in itertools.chain(session.new, session.deleted)
+      if isinstance(obj, all_models.AccessControlPerson)
+  }
+  role_ids = {
+      obj.id
+      for obj in itertools.chain(session.dirty, session.deleted)
+      if isinstance(obj, all_models.AccessControlRole)
+  }
+  return person_ids, role_ids
+
+
 def after_flush(session, _):
   """Handle all ACL hooks after after flush."""
   with benchmark("handle ACL hooks after flush"):
@@ -81,10 +107,25 @@ def after_flush(session, _):
     _add_or_update("new_relationship_ids", relationship_ids)
     _add_or_update("deleted_objects", deleted)
 
+    person_ids, role_ids = _get_permission_changes(session)
+    _add_or_update("changed_acl_person_ids", person_ids)
+    _add_or_update("changed_acl_role_ids", role_ids)
+
+
+def before_commit():
+  """Queue entries for deferred propagation in the committed transaction."""
+  if propagation_queue.is_enabled():
+    with benchmark("Queue acl propagation"):
+      propagation_queue.enqueue_pending()
+
 
 def after_commit():
   """ACL propagation after commit action."""
   with benchmark("General acl propagation"):
+    if propagation_queue.is_enabled():
+      # Entries gathered by the final flush of the commit
+      propagation_queue.enqueue_pending()
+      db.session.plain_commit()
     propagation.propagate()
 
 
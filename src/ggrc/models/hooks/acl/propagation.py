@@ -9,6 +9,7 @@ and deletion.
 """
 
 import logging
+from collections import Counter
 
 import flask
 import sqlalchemy as sa
@@ -17,7 +18,10 @@ from ggrc import db
 from ggrc import login
 from ggrc import utils
 from ggrc.utils import helpers
+from ggrc.access_control import permissions_store
 from ggrc.access_control import utils as acl_utils
+from ggrc.cache import data_version
+from ggrc.cache import utils as cache_utils
 from ggrc.models import all_models
 from ggrc.models.hooks import access_control_role
 
@@ -28,6 +32,9 @@ logger = logging.getLogger(__name__)
 # contain cycles.
 PROPAGATION_DEPTH_LIMIT = 50
 
+# Max number of parent ACL ids propagated by a single statement.
+PROPAGATION_CHUNK_SIZE = 10000
+
 
 def _rel_parent(parent_acl_ids=None, relationship_ids=None, source=True,
                 user_id=None):
@@ -204,7 +211,7 @@ def _handle_propagation_parents(parent_acl_ids, user_id):
   src_select = _rel_parent(parent_acl_ids, source=True, user_id=user_id)
   dst_select = _rel_parent(parent_acl_ids, source=False, user_id=user_id)
   select_statement = sa.union(src_select, dst_select)
-  acl_utils.insert_select_acls(select_statement)
+  return acl_utils.insert_select_acls(select_statement)
 
 
 def _handle_propagation_children(new_parent_ids, user_id):
@@ -212,7 +219,7 @@ def _handle_propagation_children(new_parent_ids, user_id):
   src_select = _rel_child(new_parent_ids, source=True, user_id=user_id)
   dst_select = _rel_child(new_parent_ids, source=False, user_id=user_id)
   select_statement = sa.union(src_select, dst_select)
-  acl_utils.insert_select_acls(select_statement)
+  return acl_utils.insert_select_acls(select_statement)
 
 
 def _handle_propagation_rel(relationship_ids, new_acl_ids, user_id):
@@ -230,10 +237,10 @@ def _handle_propagation_rel(relationship_ids, new_acl_ids, user_id):
       user_id=user_id,
   )
   select_statement = sa.union(src_select, dst_select)
-  acl_utils.insert_select_acls(select_statement)
+  return acl_utils.insert_select_acls(select_statement)
 
 
-def _handle_acl_step(parent_acl_ids, user_id):
+def _handle_acl_step(parent_acl_ids, user_id, stats=None):
   """Handle role propagation through relationships.
 
   For handling relationships of type:
@@ -241,42 +248,71 @@ def _handle_acl_step(parent_acl_ids, user_id):
   The parent part of this function refers to propagation from Audit to
   Relationship. The child part refers to propagation from Relationship to
   Object (either Assessment, Issue, Document, Comment)
+
+  Args:
+    parent_acl_ids: list of parent acl ids or query with parent ids.
+    user_id: id of the user that caused the propagation.
+    stats: optional Counter, the number of inserted ACL entries is added to
+      its "propagated" item.
+  Returns:
+    query with ids of ACL entries that have to be propagated next.
   """
 
-  _handle_propagation_parents(parent_acl_ids, user_id)
+  propagated = _handle_propagation_parents(parent_acl_ids, user_id)
   new_parent_ids = _get_child_ids(parent_acl_ids)
-  _handle_propagation_children(new_parent_ids, user_id)
+  propagated += _handle_propagation_children(new_parent_ids, user_id)
+  if stats is not None:
+    stats["propagated"] += propagated
 
   return _get_child_ids(new_parent_ids)
 
 
-def _handle_relationship_step(relationship_ids, new_acl_ids, user_id):
+def _handle_relationship_step(relationship_ids, new_acl_ids, user_id,
+                              stats=None):
   """Propagate first level or ACLs caused by new relationships."""
 
-  _handle_propagation_rel(relationship_ids, new_acl_ids, user_id)
+  propagated = _handle_propagation_rel(relationship_ids, new_acl_ids, user_id)
   new_parent_ids = _get_relationship_acl_ids(relationship_ids)
-  _handle_propagation_children(new_parent_ids, user_id)
+  propagated += _handle_propagation_children(new_parent_ids, user_id)
+  if stats is not None:
+    stats["propagated"] += propagated
 
   return _get_child_ids(new_parent_ids)
 
 
+def _fetch_ids(ids):
+  """Get list of ids from a query with ids or from an iterable."""
+  if isinstance(ids, sa.sql.expression.Selectable):
+    return [row.id for row in db.session.execute(ids)]
+  return list(ids)
+
+
 def _propagate(parent_acl_ids, user_id):
-  """Propagate ACL entries through the entire propagation tree."""
+  """Propagate ACL entries through the entire propagation tree.
+
+  Every level of the tree is propagated with INSERT ... SELECT statements
+  and the ids of the next level are fetched once, so the queries of deeper
+  levels do not grow with the depth of the tree.
+
+  Returns:
+    number of inserted ACL entries.
+  """
+  stats = Counter()
+  parent_acl_ids = _fetch_ids(parent_acl_ids)
 
   # The following for statement is a replacement for `while True` statement
   # with a safety cutoff limit.
   for _ in range(PROPAGATION_DEPTH_LIMIT):
-
-    child_ids = _handle_acl_step(parent_acl_ids, user_id)
-
-    count_query = child_ids.alias("counts").count()
-    child_id_count = db.session.execute(count_query).scalar()
-
-    if child_id_count:
-      parent_acl_ids = child_ids
-    else:
+    if not parent_acl_ids:
       # Exit the loop when there are no more ACL entries to propagate
-      return
+      return stats["propagated"]
+
+    child_acl_ids = []
+    for chunk in utils.list_chunks(parent_acl_ids, PROPAGATION_CHUNK_SIZE):
+      child_acl_ids.extend(
+          _fetch_ids(_handle_acl_step(chunk, user_id, stats))
+      )
+    parent_acl_ids = child_acl_ids
 
   # We should only be able to get here if the propagation failed to finish in
   # PROPAGATION_DEPTH_LIMIT iterations.
@@ -289,11 +325,16 @@ def _propagate_relationships(relationship_ids, new_acl_ids, user_id):
 
   Note this function will only propagate old ACL entries. All newly created
   ones will be propagated after relationship propagation finishes.
+
+  Returns:
+    number of inserted ACL entries.
   """
   if not relationship_ids:
-    return
-  child_ids = _handle_relationship_step(relationship_ids, new_acl_ids, user_id)
-  _propagate(child_ids, user_id)
+    return 0
+  stats = Counter()
+  child_ids = _handle_relationship_step(relationship_ids, new_acl_ids, user_id,
+                                        stats)
+  return stats["propagated"] + _propagate(child_ids, user_id)
 
 
 def _delete_orphan_acl_entries(deleted_objects):
@@ -319,6 +360,7 @@ def _delete_orphan_acl_entries(deleted_objects):
 
       )
   )
+  data_version.mark_changed(db.session)
   db.session.plain_commit()
 
 
@@ -336,53 +378,102 @@ def _delete_propagated_acls(acl_ids):
           acl_table.c.parent_id.in_(acl_ids),
       )
   )
+  data_version.mark_changed(db.session)
   db.session.plain_commit()
 
 
 def _set_empty_base_ids():
   """Set base_id for new entries."""
-  db.session.execute(
+  updated = db.session.execute(
       "UPDATE access_control_list SET base_id = id WHERE base_id IS NULL"
-  )
+  ).rowcount
+  if updated:
+    data_version.mark_changed(db.session)
   db.session.plain_commit()
 
 
+def propagate_entries(acl_ids, relationship_ids, user_id):
+  """Propagate new ACL entries and existing ones through new relationships.
+
+  Args:
+    acl_ids: ids of new ACL entries.
+    relationship_ids: ids of new relationships.
+    user_id: id of the user that caused the propagation.
+
+  Returns:
+    tuple of the number of propagated ACL entries and the set of ids of people
+    whose materialized permissions were extended.
+  """
+  _set_empty_base_ids()
+
+  last_acl_id = permissions_store.get_last_acl_id()
+
+  # The order of propagation of relationships and other ACLs is important
+  # because relationship code excludes other ACLs from propagating.
+  propagated = 0
+  if relationship_ids:
+    with utils.benchmark("Propagate ACLs for new relationships"):
+      propagated += _propagate_relationships(
+          relationship_ids,
+          acl_ids,
+          user_id,
+      )
+  if acl_ids:
+    with utils.benchmark("Propagate new ACL entries"):
+      propagated += _propagate(acl_ids, user_id)
+  if propagated:
+    logger.info("Propagated %s ACL entries", propagated)
+
+  with utils.benchmark("Update materialized permissions"):
+    person_ids = permissions_store.merge_new_entries(last_acl_id)
+  return propagated, person_ids
+
+
 def propagate():
   """Propagate all ACLs caused by objects in new_objects list.
 
   Args:
     new_acl_ids: list of newly created ACL ids,
     new_relationship_ids: list of newly created relationship ids,
+
+  Returns:
+    number of propagated ACL entries.
   """
   if not (hasattr(flask.g, "new_acl_ids") and
           hasattr(flask.g, "new_relationship_ids") and
           hasattr(flask.g, "deleted_objects")):
-    return
+    return 0
 
+  # People whose permissions might have been revoked have their materialized
+  # permissions dropped, the ones that only get new entries are updated.
+  changed_person_ids = set(getattr(flask.g, "changed_acl_person_ids", set()))
   if flask.g.deleted_objects:
+    changed_person_ids.update(permissions_store.get_affected_people(
+        object_keys=flask.g.deleted_objects,
+    ))
     with utils.benchmark("Delete internal ACL entries for deleted objects"):
       _delete_orphan_acl_entries(flask.g.deleted_objects)
+  if getattr(flask.g, "changed_acl_role_ids", None):
+    permissions_store.invalidate_all()
+    cache_utils.clear_permission_cache()
+  else:
+    permissions_store.invalidate(changed_person_ids)
 
-  _set_empty_base_ids()
-
-  current_user_id = login.get_current_user_id()
-
-  # The order of propagation of relationships and other ACLs is important
-  # because relationship code excludes other ACLs from propagating.
-  if flask.g.new_relationship_ids:
-    with utils.benchmark("Propagate ACLs for new relationships"):
-      _propagate_relationships(
-          flask.g.new_relationship_ids,
-          flask.g.new_acl_ids,
-          current_user_id,
-      )
-  if flask.g.new_acl_ids:
-    with utils.benchmark("Propagate new ACL entries"):
-      _propagate(flask.g.new_acl_ids, current_user_id)
+  propagated, extended_person_ids = propagate_entries(
+      flask.g.new_acl_ids,
+      flask.g.new_relationship_ids,
+      login.get_current_user_id(),
+  )
+  changed_person_ids.update(extended_person_ids)
+  cache_utils.clear_users_permission_cache(changed_person_ids)
 
   del flask.g.new_acl_ids
   del flask.g.new_relationship_ids
   del flask.g.deleted_objects
+  for name in ("changed_acl_person_ids", "changed_acl_role_ids"):
+    if hasattr(flask.g, name):
+      delattr(flask.g, name)
+  return propagated
 
 
 def _add_missing_acl_entries():
@@ -418,6 +509,7 @@ def propagate_all():
     with utils.benchmark("Propagate normal acl entries"):
       count = len(all_acl_ids)
       propagated_count = 0
+      inserted_count = 0
       for acl_ids in utils.list_chunks(all_acl_ids, chunk_size=50):
         propagated_count += len(acl_ids)
         logger.info("Propagating ACL entries: %s/%s", propagated_count, count)
@@ -426,4 +518,9 @@ def propagate_all():
         flask.g.new_acl_ids = acl_ids
         flask.g.new_relationship_ids = set()
         flask.g.deleted_objects = set()
-        propagate()
+        inserted_count += propagate()
+      logger.info("Propagated %s ACL entries in total", inserted_count)
+
+    with utils.benchmark("Drop materialized permissions"):
+      permissions_store.invalidate_all()
+      cache_utils.clear_permission_cache()
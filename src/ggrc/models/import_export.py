@@ -7,6 +7,7 @@ import json
 from datetime import datetime, timedelta
 from logging import getLogger
 
+import sqlalchemy as sa
 from sqlalchemy.dialects import mysql
 
 from ggrc import db
@@ -17,6 +18,9 @@ from werkzeug.exceptions import BadRequest, Forbidden, NotFound
 
 logger = getLogger(__name__)
 
+# Number of characters of content written or read with a single query.
+CONTENT_CHUNK_SIZE = 1024 * 1024
+
 
 class ImportExport(Identifiable, db.Model):
   """ImportExport Model."""
@@ -59,7 +63,8 @@ class ImportExport(Identifiable, db.Model):
                                uselist=False)
   results = db.Column(mysql.LONGTEXT)
   title = db.Column(db.Text)
-  content = db.Column(mysql.LONGTEXT)
+  content = db.deferred(db.Column(mysql.LONGTEXT))
+  progress = db.deferred(db.Column(mysql.LONGTEXT))
   gdrive_metadata = db.Column('gdrive_metadata', db.Text)
 
   def log_json(self, is_default=False):
@@ -68,7 +73,8 @@ class ImportExport(Identifiable, db.Model):
       columns = self.DEFAULT_COLUMNS
     else:
       columns = (column.name for column in self.__table__.columns
-                 if column.name not in ('content', 'gdrive_metadata'))
+                 if column.name not in ('content', 'gdrive_metadata',
+                                        'progress'))
 
     res = {}
     for column in columns:
@@ -83,6 +89,180 @@ class ImportExport(Identifiable, db.Model):
     return res
 
 
+class ImportExportContentChunk(db.Model):
+  """Db model for a chunk of exported content of an ImportExport job.
+
+  Exported content is stored as a sequence of rows, so appending a chunk
+  does not rewrite the content written before it and no single value grows
+  beyond max_allowed_packet.
+  """
+  # pylint: disable=too-few-public-methods
+  __tablename__ = "import_export_content_chunks"
+
+  import_export_id = db.Column(
+      db.Integer,
+      db.ForeignKey("import_exports.id", ondelete="CASCADE"),
+      primary_key=True,
+      autoincrement=False,
+  )
+  seq = db.Column(db.Integer, primary_key=True, autoincrement=False)
+  chunk = db.Column(mysql.LONGTEXT, nullable=False)
+
+
+class ContentSink(object):
+  """File-like object that appends written data to ImportExport content.
+
+  Written data is buffered up to chunk_size characters and then stored as
+  the next content chunk of the job, so the whole content is never kept in
+  memory. A separate autocommit connection is used, so the session
+  transaction is neither committed nor expired by the writes.
+
+  Chunks written by a previous run of the job are removed first. If writing
+  fails, the chunks written so far are removed and the error is raised, so
+  the job fails instead of finishing with partial content.
+  """
+
+  def __init__(self, ie_id, chunk_size=CONTENT_CHUNK_SIZE):
+    self.ie_id = ie_id
+    self.chunk_size = chunk_size
+    self._buffer = []
+    self._buffer_size = 0
+    self._seq = 0
+    self._table = ImportExportContentChunk.__table__
+    self._connection = db.engine.connect()
+    self._delete_chunks()
+
+  def _delete_chunks(self):
+    self._connection.execute(self._table.delete().where(
+        self._table.c.import_export_id == self.ie_id
+    ))
+
+  def write(self, data):
+    """Buffer data and store the buffer as a chunk if it is full."""
+    if isinstance(data, str):
+      data = data.decode("utf-8")
+    self._buffer.append(data)
+    self._buffer_size += len(data)
+    if self._buffer_size >= self.chunk_size:
+      self.flush()
+
+  def flush(self):
+    """Store buffered data as the next content chunk."""
+    if not self._buffer:
+      return
+    self._connection.execute(self._table.insert(), {
+        "import_export_id": self.ie_id,
+        "seq": self._seq,
+        "chunk": u"".join(self._buffer),
+    })
+    self._seq += 1
+    self._buffer = []
+    self._buffer_size = 0
+
+  def get_status(self):
+    """Get committed status of the job."""
+    table = ImportExport.__table__
+    return self._connection.execute(
+        sa.select([table.c.status]).where(table.c.id == self.ie_id)
+    ).scalar()
+
+  def close(self):
+    self.flush()
+    self._connection.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, exc_type, exc_value, traceback):
+    if exc_type is None:
+      self.close()
+      return
+    try:
+      self._delete_chunks()
+    finally:
+      self._connection.close()
+
+
+class ImportProgress(object):
+  """Progress of the commit phase of an import job.
+
+  Progress is stored as JSON {block offset: {"rows": number of committed rows,
+  "info": block info}} and lets a retried import continue after the committed
+  rows of every block.
+  """
+
+  def __init__(self, ie_id, blocks=None):
+    self.ie_id = ie_id
+    self.blocks = blocks if blocks is not None else {}
+
+  @classmethod
+  def load(cls, ie_id):
+    """Load stored progress of the job."""
+    progress = db.session.query(
+        ImportExport.progress
+    ).filter(ImportExport.id == ie_id).scalar()
+    return cls(ie_id, json.loads(progress) if progress else None)
+
+  def get(self, offset):
+    """Get stored progress of the block at the offset or None."""
+    return self.blocks.get(str(offset))
+
+  def save(self, offset, rows, info):
+    """Store progress of the block in the current session transaction.
+
+    The stored value is locked and merged, so blocks imported concurrently in
+    separate sessions do not overwrite progress of each other.
+    """
+    table = ImportExport.__table__
+    stored = db.session.execute(
+        sa.select([table.c.progress]).where(
+            table.c.id == self.ie_id
+        ).with_for_update()
+    ).scalar()
+    blocks = json.loads(stored) if stored else {}
+    blocks[str(offset)] = {"rows": rows, "info": info}
+    db.session.execute(
+        table.update().where(
+            table.c.id == self.ie_id
+        ).values(progress=json.dumps(blocks))
+    )
+    self.blocks[str(offset)] = blocks[str(offset)]
+
+
+def iter_content(ie_id, chunk_size=CONTENT_CHUNK_SIZE):
+  """Generate content of ImportExport entry in chunks.
+
+  Exported content is read from the content chunks of the job one chunk at a
+  time. Content stored in the job itself, such as uploaded import files, is
+  read in chunks of chunk_size characters.
+  """
+  seq = -1
+  while True:
+    row = db.session.query(
+        ImportExportContentChunk.seq,
+        ImportExportContentChunk.chunk,
+    ).filter(
+        ImportExportContentChunk.import_export_id == ie_id,
+        ImportExportContentChunk.seq > seq,
+    ).order_by(ImportExportContentChunk.seq).first()
+    if row is None:
+      break
+    seq = row.seq
+    yield row.chunk
+  if seq >= 0:
+    return
+
+  position = 1
+  while True:
+    chunk = db.session.query(
+        sa.func.substring(ImportExport.content, position, chunk_size)
+    ).filter(ImportExport.id == ie_id).scalar()
+    if not chunk:
+      return
+    yield chunk
+    position += chunk_size
+
+
 def create_import_export_entry(**kwargs):
   """Create ImportExport entry"""
   meta = json.dumps(kwargs['gdrive_metadata']) if 'gdrive_metadata' in kwargs \
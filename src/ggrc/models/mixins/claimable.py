@@ -0,0 +1,100 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Mixin for queue tables whose rows are processed by concurrent workers.
+
+MySQL 5.6 has no SELECT ... FOR UPDATE SKIP LOCKED, so workers claim rows by
+writing a random token into claimed_by with a conditional UPDATE and only
+process the rows that carry their token. Claims of workers that died are
+taken over after CLAIM_TIMEOUT seconds.
+"""
+
+# pylint: disable=no-self-argument
+
+import datetime
+import uuid
+
+import sqlalchemy as sa
+from sqlalchemy.ext.declarative import declared_attr
+
+from ggrc import db
+
+
+class Claimable(object):
+  """Queue rows that are claimed by a worker before they are processed."""
+
+  # Claims older than this number of seconds are considered abandoned.
+  CLAIM_TIMEOUT = 600
+
+  @declared_attr
+  def claimed_by(cls):
+    return db.Column(db.String(32), nullable=True)
+
+  @declared_attr
+  def claimed_at(cls):
+    return db.Column(db.DateTime, nullable=True)
+
+  @classmethod
+  def _is_claimable(cls, now):
+    """Get filter of rows that are not claimed or whose claim expired."""
+    expired = now - datetime.timedelta(seconds=cls.CLAIM_TIMEOUT)
+    return sa.or_(
+        cls.claimed_by.is_(None),
+        cls.claimed_at < expired,
+    )
+
+  @classmethod
+  def claim(cls, query, chunk_size):
+    """Claim a chunk of rows for the current worker.
+
+    The claim is committed at once, so other workers skip the claimed rows
+    while they are processed.
+
+    Args:
+      query: query of ids of the rows that should be claimed.
+      chunk_size: maximum number of claimed rows.
+
+    Returns:
+      claim token the claimed rows are marked with, None if there were no
+      rows to claim. Rows may be claimed by other workers in the meantime,
+      so no rows may carry the returned token.
+    """
+    now = datetime.datetime.utcnow()
+    ids = [row.id for row in query.filter(
+        cls._is_claimable(now)
+    ).order_by(cls.id).limit(chunk_size)]
+    if not ids:
+      return None
+    token = uuid.uuid4().hex
+    table = cls.__table__
+    # The condition is checked again on the locked rows, so only one of the
+    # workers that selected the same rows claims them.
+    db.session.execute(
+        table.update().where(sa.and_(
+            table.c.id.in_(ids),
+            cls._is_claimable(now),
+        )).values(claimed_by=token, claimed_at=now)
+    )
+    db.session.plain_commit()
+    return token
+
+  @classmethod
+  def release(cls, token):
+    """Release rows claimed with the token so other workers can take them."""
+    table = cls.__table__
+    db.session.execute(
+        table.update().where(
+            table.c.claimed_by == token
+        ).values(claimed_by=None, claimed_at=None)
+    )
+    db.session.plain_commit()
+
+  @classmethod
+  def delete_claimed(cls, token):
+    """Delete processed rows claimed with the token.
+
+    The deletion is not committed, so it is committed together with the
+    results of the processing.
+    """
+    table = cls.__table__
+    db.session.execute(table.delete().where(table.c.claimed_by == token))
@@ -126,13 +126,6 @@ class CustomAttributable(object):
             "title",
             "attribute_type",
         ),
-        orm.Load(cls).subqueryload(
-            "custom_attribute_definitions"
-        ).load_only(
-            "id",
-            "title",
-            "attribute_type",
-        ),
         orm.Load(cls).subqueryload("custom_attribute_values").load_only(
             "id",
             "attribute_value",
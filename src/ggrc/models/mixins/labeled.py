@@ -11,12 +11,24 @@ from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.ext.associationproxy import association_proxy
 
 from ggrc import db
+from ggrc import fulltext
 from ggrc.models import reflection
 from ggrc.models.object_label import ObjectLabel
 from ggrc.models.label import Label
 from ggrc.fulltext.attributes import MultipleSubpropertyFullTextAttr
 
 
+class LabelsFullTextAttr(MultipleSubpropertyFullTextAttr):
+  """Full text attribute for labels that takes names from indexer lookups."""
+
+  def get_value_for(self, instance):
+    # pylint: disable=protected-access
+    labels = fulltext.get_indexer().cache.labels
+    values = [labels.get(object_label.label_id)
+              for object_label in instance._object_labels]
+    return [value for value in values if value is not None]
+
+
 class Labeled(object):
   """Mixin to add label in required model."""
 
@@ -27,7 +39,7 @@ class Labeled(object):
   }
 
   _fulltext_attrs = [
-      MultipleSubpropertyFullTextAttr("label", "labels", ["name"]),
+      LabelsFullTextAttr("label", "labels", ["name"]),
   ]
 
   @declared_attr
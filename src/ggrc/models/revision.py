@@ -3,12 +3,22 @@
 
 """Defines a Revision model for storing snapshots."""
 
+import weakref
+from collections import defaultdict
+
+import flask
+import sqlalchemy as sa
+from sqlalchemy.orm import Session
+
 from ggrc import builder
 from ggrc import db
+from ggrc import settings
 from ggrc.models.mixins import base
 from ggrc.models.mixins import Base
 from ggrc.models import reflection
 from ggrc.access_control import role
+from ggrc.models.types import CompactJsonType
+from ggrc.models.types import JsonKeysType
 from ggrc.models.types import LongJsonType
 from ggrc.utils.revisions_diff import builder as revisions_diff
 from ggrc.utils import referenced_objects
@@ -25,7 +35,11 @@ class Revision(base.ContextRBAC, Base, db.Model):
   event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
   action = db.Column(db.Enum(u'created', u'modified', u'deleted'),
                      nullable=False)
-  _content = db.Column('content', LongJsonType, nullable=False)
+  # Content is stored either as Json text or, if compact storage is enabled
+  # or the revision was compacted, in the compact binary format.
+  _content_text = db.Column('content', LongJsonType, nullable=True)
+  _content_compact = db.Column('content_compact', CompactJsonType,
+                               nullable=True)
 
   resource_slug = db.Column(db.String, nullable=True)
   source_type = db.Column(db.String, nullable=True)
@@ -93,6 +107,31 @@ class Revision(base.ContextRBAC, Base, db.Model):
                  "destination_id"]:
       setattr(self, attr, getattr(obj, attr, None))
 
+  @property
+  def _content(self):
+    """Stored content dict of the revision."""
+    if self._content_compact is not None:
+      return self._content_compact
+    return self._content_text
+
+  @_content.setter
+  def _content(self, value):
+    self._populated_content = None
+    if settings.REVISION_CONTENT_COMPACT:
+      self._content_compact = value
+      self._content_text = None
+    else:
+      self._content_text = value
+      self._content_compact = None
+
+  @classmethod
+  def content_keys(cls, *keys):
+    """Query expression loading only the given top-level keys of content."""
+    return sa.type_coerce(
+        sa.func.coalesce(cls._content_compact, cls._content_text),
+        JsonKeysType(keys),
+    )
+
   @builder.callable_property
   def diff_with_current(self):
     """Callable lazy property for revision."""
@@ -412,9 +451,7 @@ class Revision(base.ContextRBAC, Base, db.Model):
     """Setup cads in cav list if they are not presented in content
 
     but now they are associated to instance."""
-    from ggrc.models import custom_attribute_definition
-    cads = custom_attribute_definition.get_custom_attributes_for(
-        self.resource_type, self.resource_id)
+    cads = _get_cads(self.resource_type, self.resource_id)
     cavs = {int(i["custom_attribute_id"]): i for i in self._get_cavs()}
     for cad in cads:
       custom_attribute_id = int(cad["id"])
@@ -528,11 +565,35 @@ class Revision(base.ContextRBAC, Base, db.Model):
             cav["attributable_type"] = "Requirement"
         populated_content["custom_attribute_values"] = cavs
 
+  @classmethod
+  def populate_contents(cls, revisions):
+    """Populate content of revisions with data prefetched for all of them.
+
+    Custom attribute definitions of all revisions are loaded at once and the
+    populated content is kept on every revision until it is expired.
+    """
+    # pylint: disable=protected-access
+    revisions = [revision for revision in revisions
+                 if getattr(revision, "_populated_content", None) is None]
+    _prefetch_cads(revisions)
+    for revision in revisions:
+      revision._populated_content = revision._populate_content()
+
   @builder.simple_property
   def content(self):
     """Property. Contains the revision content dict.
 
-    Updated by required values, generated from saved content dict."""
+    Updated by required values, generated from saved content dict. Content of
+    all revisions loaded in the request is populated together on the first
+    access."""
+    if self.id is None or not flask.has_app_context():
+      return self._populate_content()
+    if getattr(self, "_populated_content", None) is None:
+      self.populate_contents(_pop_loaded_revisions() + [self])
+    return self._populated_content.copy()
+
+  def _populate_content(self):
+    """Build content dict updated by required values."""
     # pylint: disable=too-many-locals
     populated_content = self._content.copy()
     populated_content.update(self.populate_acl())
@@ -558,3 +619,103 @@ class Revision(base.ContextRBAC, Base, db.Model):
   def content(self, value):
     """ Setter for content property."""
     self._content = value
+
+
+def _get_cads(resource_type, resource_id):
+  """Get CAD jsons of the resource, prefetched ones if present."""
+  from ggrc.models import custom_attribute_definition
+  if flask.has_app_context():
+    prefetched = getattr(flask.g, "revision_cads", {})
+    if (resource_type, resource_id) in prefetched:
+      return [dict(cad) for cad in prefetched[resource_type, resource_id]]
+  return custom_attribute_definition.get_custom_attributes_for(
+      resource_type, resource_id)
+
+
+def _prefetch_cads(revisions):
+  """Load CAD jsons of resources of all revisions with one query per kind.
+
+  Global and local CADs are stored in flask.g.revision_cads by resource type
+  and id until the session is committed.
+  """
+  from ggrc.models import all_models
+  from ggrc.models import custom_attribute_definition
+  from ggrc.models import get_model
+  from ggrc.models.mixins.customattributable import CustomAttributable
+  if not flask.has_app_context():
+    return
+  if getattr(flask.g, "revision_cads", None) is None:
+    flask.g.revision_cads = {}
+  prefetched = flask.g.revision_cads
+  definition_types = custom_attribute_definition.\
+      get_model_name_inflector_dict()
+  keys = {}
+  for revision in revisions:
+    key = (revision.resource_type, revision.resource_id)
+    if key in prefetched or key in keys:
+      continue
+    model = get_model(revision.resource_type)
+    definition_type = definition_types.get(revision.resource_type)
+    if not model or not issubclass(model, CustomAttributable) or \
+       not definition_type:
+      prefetched[key] = []
+      continue
+    keys[key] = definition_type
+  if not keys:
+    return
+
+  cad = all_models.CustomAttributeDefinition
+  global_cads = defaultdict(list)
+  for item in cad.query.filter(
+      cad.definition_type.in_(set(keys.values())),
+      cad.definition_id.is_(None),
+  ):
+    global_cads[item.definition_type].append(item.log_json())
+  local_cads = defaultdict(list)
+  for item in cad.query.filter(sa.tuple_(
+      cad.definition_type, cad.definition_id,
+  ).in_({(definition_type, resource_id)
+         for (_, resource_id), definition_type in keys.iteritems()})):
+    local_cads[item.definition_type, item.definition_id].append(
+        item.log_json())
+  for (resource_type, resource_id), definition_type in keys.iteritems():
+    prefetched[resource_type, resource_id] = (
+        global_cads[definition_type] +
+        local_cads[definition_type, resource_id]
+    )
+
+
+def _pop_loaded_revisions():
+  """Get revisions loaded with content since the last population."""
+  loaded = getattr(flask.g, "loaded_revisions", None)
+  if not loaded:
+    return []
+  flask.g.loaded_revisions = weakref.WeakSet()
+  needed = {"resource_type", "resource_id", "_content_text",
+            "_content_compact"}
+  return [revision for revision in loaded
+          if not needed & sa.inspect(revision).unloaded]
+
+
+def _mark_loaded(target, *_):
+  """Remember loaded revision for the batch population of contents."""
+  if not flask.has_app_context():
+    return
+  if getattr(flask.g, "loaded_revisions", None) is None:
+    flask.g.loaded_revisions = weakref.WeakSet()
+  flask.g.loaded_revisions.add(target)
+
+
+def _drop_populated_content(target, *_):
+  target._populated_content = None  # pylint: disable=protected-access
+
+
+def _drop_prefetched_cads(*_):
+  if flask.has_app_context() and hasattr(flask.g, "revision_cads"):
+    del flask.g.revision_cads
+
+
+sa.event.listen(Revision, "load", _mark_loaded)
+sa.event.listen(Revision, "refresh", _drop_populated_content)
+sa.event.listen(Revision, "expire", _drop_populated_content)
+sa.event.listen(Session, "after_commit", _drop_prefetched_cads)
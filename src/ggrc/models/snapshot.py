@@ -18,6 +18,7 @@ from sqlalchemy.sql.expression import tuple_
 from ggrc import builder
 from ggrc import db
 from ggrc.access_control.roleable import Roleable
+from ggrc.cache import data_version
 from ggrc.utils import benchmark
 from ggrc.login import get_current_user_id
 from ggrc.models import mixins
@@ -310,6 +311,7 @@ def _insert_program_relationships(relationship_stubs):
           for relationship_stub in relationship_stubs
       ])
   )
+  data_version.mark_changed(db.session)
 
 
 def _set_latest_revisions(objects):
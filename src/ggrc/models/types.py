@@ -3,11 +3,14 @@
 
 """Declaration of custom ORM data types.
 
-Add Json and Compressed type declaration for use in ORM models.
+Add Json, Compressed and CompactJson type declaration for use in ORM models.
 """
 
+import cPickle
 import json
 import pickle
+import zlib
+
 import sqlalchemy.types as types
 from ggrc import utils
 from ggrc.models import exceptions
@@ -84,3 +87,85 @@ class CompressedType(types.TypeDecorator):
     if len(value) > self.MAX_BINARY_LENGTH:
       raise exceptions.ValidationError("Log record content too long")
     return value
+
+
+class CompactJsonType(types.TypeDecorator):
+  # pylint: disable=W0223
+  """Custom compact data type for Json objects.
+
+  Json objects are stored compressed in a binary column. Every top-level value
+  is serialized separately, so that selected keys can be loaded without
+  deserializing the whole object.
+  """
+  MAX_BINARY_LENGTH = 4294967295
+  MAGIC = b"\x00cj1"
+  impl = types.LargeBinary(length=MAX_BINARY_LENGTH)
+
+  @classmethod
+  def dumps(cls, value):
+    """Serialize Json object into compact binary data."""
+    if not isinstance(value, basestring):
+      value = utils.as_json(value)
+    items = {
+        key: cPickle.dumps(item, cPickle.HIGHEST_PROTOCOL)
+        for key, item in json.loads(value).iteritems()
+    }
+    return cls.MAGIC + zlib.compress(
+        cPickle.dumps(items, cPickle.HIGHEST_PROTOCOL))
+
+  @classmethod
+  def is_compact(cls, data):
+    return data is not None and data.startswith(cls.MAGIC)
+
+  @classmethod
+  def _load_items(cls, data):
+    return cPickle.loads(zlib.decompress(data[len(cls.MAGIC):]))
+
+  @classmethod
+  def loads(cls, data):
+    """Deserialize the whole Json object from compact binary data."""
+    return {key: cPickle.loads(item)
+            for key, item in cls._load_items(data).iteritems()}
+
+  @classmethod
+  def loads_keys(cls, data, keys):
+    """Deserialize only the given top-level keys of the Json object.
+
+    Data in the Json text format is parsed as a whole.
+    """
+    if not cls.is_compact(data):
+      value = json.loads(data)
+      return {key: value[key] for key in keys if key in value}
+    items = cls._load_items(data)
+    return {key: cPickle.loads(items[key]) for key in keys if key in items}
+
+  def process_result_value(self, value, dialect):
+    if value is not None:
+      value = self.loads(value)
+    return value
+
+  def process_bind_param(self, value, dialect):
+    if value is not None:
+      value = self.dumps(value)
+      if len(value) > self.MAX_BINARY_LENGTH:
+        raise exceptions.ValidationError("Log record content too long")
+    return value
+
+
+class JsonKeysType(types.TypeDecorator):
+  # pylint: disable=W0223
+  """Read-only type loading selected top-level keys of a Json object.
+
+  The type is used for query expressions of columns that contain Json
+  objects either in the Json text or in the compact binary format.
+  """
+  impl = types.LargeBinary
+
+  def __init__(self, keys, *args, **kwargs):
+    super(JsonKeysType, self).__init__(*args, **kwargs)
+    self.keys = keys
+
+  def process_result_value(self, value, dialect):
+    if value is not None:
+      value = CompactJsonType.loads_keys(value, self.keys)
+    return value
@@ -12,6 +12,7 @@ from collections import defaultdict
 from datetime import date
 from datetime import datetime
 from logging import getLogger
+from multiprocessing.pool import ThreadPool
 from operator import itemgetter
 from dateutil import relativedelta
 
@@ -27,7 +28,8 @@ from ggrc import settings
 from ggrc.models import Person
 from ggrc.models import Notification, NotificationHistory
 from ggrc.rbac import permissions
-from ggrc.utils import DATE_FORMAT_US, merge_dict, benchmark
+from ggrc.utils import DATE_FORMAT_US, merge_dict, benchmark, list_chunks
+from ggrc.notifications import data_handlers
 from ggrc.notifications.notification_handlers import SEND_TIME
 
 from ggrc_workflows.models import CycleTaskGroupObjectTask
@@ -98,6 +100,24 @@ class Services(object):
     return service(notif)
 
 
+NOTIFICATIONS_CHUNK_SIZE = 1000
+
+
+def filter_data(notification, data, people_cache):
+  """Filter notification data by users who should receive it.
+
+  Args:
+    notification (Notification): Notification object the data belongs to.
+    data (dict): notification data returned by the data handler service.
+    people_cache (dict): prefetched Person instances accessible by their ID.
+
+  Returns:
+    dict: data of users who should receive the notification.
+  """
+  return {user: user_data for user, user_data in data.iteritems()
+          if should_receive(notification, user_data, people_cache)}
+
+
 def get_filter_data(
     notification, people_cache, tasks_cache=None, del_rels_cache=None
 ):
@@ -120,14 +140,80 @@ def get_filter_data(
     dict: dictionary containing notification data for all users who should
       receive it, according to their notification settings.
   """
-  result = {}
   data = Services.call_service(
       notification, tasks_cache=tasks_cache, del_rels_cache=del_rels_cache)
+  return filter_data(notification, data, people_cache)
+
+
+def get_services_data(notifications):
+  """Get unfiltered data of notifications from data handler services.
+
+  Data used by the services is preloaded for all notifications in bulk
+  queries.
+
+  Args:
+    notifications (list of Notification): notifications to get data for.
+
+  Returns:
+    list of (Notification, dict) tuples of notifications and their data.
+  """
+  tasks_cache = cycle_tasks_cache(notifications)
+  deleted_rels_cache = deleted_task_rels_cache(tasks_cache.keys())
+  with data_handlers.preloaded_data(notifications):
+    return [
+        (notification, Services.call_service(
+            notification,
+            tasks_cache=tasks_cache,
+            del_rels_cache=deleted_rels_cache,
+        ))
+        for notification in notifications
+    ]
+
+
+def load_people(person_ids, people_cache):
+  """Load people with their roles and notification configs into the cache.
+
+  Args:
+    person_ids (iterable of int): ids of people to load. People that are
+      already in the cache and the invalid id -1 are skipped.
+    people_cache (dict): Person instances accessible by their ID.
+  """
+  person_ids = set(person_ids) - set(people_cache) - {-1}
+  if not person_ids:
+    return
+  people = db.session.query(Person).options(
+      joinedload('user_roles').joinedload('role'),
+      joinedload('notification_configs')
+  ).filter(Person.id.in_(person_ids))
+  for person in people:
+    people_cache[person.id] = person
+
+
+def iter_filtered_data(notifications, people_cache):
+  """Get filtered data of notifications in chunks.
 
-  for user, user_data in data.iteritems():
-    if should_receive(notification, user_data, people_cache):
-      result[user] = user_data
-  return result
+  Data of each chunk and recipients of that data are loaded in bulk queries.
+
+  Args:
+    notifications (list of Notification): notifications to get data for.
+    people_cache (dict): Person instances accessible by their ID, people
+      that are not in the cache are loaded into it.
+
+  Yields:
+    (Notification, dict) tuples of notifications and data for the users who
+      should receive them.
+  """
+  for chunk in list_chunks(notifications, NOTIFICATIONS_CHUNK_SIZE):
+    with benchmark("Get notification data of chunk"):
+      services_data = get_services_data(chunk)
+    load_people(
+        (user_data["user"]["id"]
+         for _, data in services_data
+         for user_data in data.itervalues()),
+        people_cache,
+    )
+    for notification, data in services_data:
+      yield notification, filter_data(notification, data, people_cache)
 
 
 def get_notification_data(notifications):
@@ -147,16 +233,9 @@ def get_notification_data(notifications):
   if not notifications:
     return {}
   aggregate_data = {}
-  people_cache = {}
 
-  tasks_cache = cycle_tasks_cache(notifications)
-  deleted_rels_cache = deleted_task_rels_cache(tasks_cache.keys())
-
-  for notification in notifications:
-    filtered_data = get_filter_data(
-        notification, people_cache, tasks_cache=tasks_cache,
-        del_rels_cache=deleted_rels_cache)
-    aggregate_data = merge_dict(aggregate_data, filtered_data)
+  for _, filtered_data in iter_filtered_data(notifications, {}):
+    merge_dict(aggregate_data, filtered_data)
 
   # Remove notifications for objects without a contact (such as task groups)
   aggregate_data.pop("", None)
@@ -220,13 +299,18 @@ def get_daily_notifications():
     list of Notifications, data: a tuple of notifications that were handled
       and corresponding data for those notifications.
   """
-  notifications = db.session.query(Notification).filter(
+  notifications = get_daily_notifications_query().all()
+
+  return notifications, get_notification_data(notifications)
+
+
+def get_daily_notifications_query():
+  """Get query of notifications that should be sent in the daily digest."""
+  return db.session.query(Notification).filter(
       (Notification.runner == Notification.RUNNER_DAILY) &
       (Notification.send_on <= datetime.today()) &
       ((Notification.sent_at.is_(None)) | (Notification.repeating == true()))
-  ).all()
-
-  return notifications, get_notification_data(notifications)
+  )
 
 
 def should_receive(notif, user_data, people_cache):
@@ -282,27 +366,141 @@ def should_receive(notif, user_data, people_cache):
   return has_digest
 
 
+def get_digest_recipients():
+  """Find recipients of notifications of the daily digest.
+
+  Due notifications are loaded in chunks, only their ids are kept.
+  Notifications that nobody should receive are marked as sent.
+
+  Returns:
+    dict: {user email: set of ids of notifications for the user}.
+  """
+  recipients = defaultdict(set)
+  people_cache = {}
+  last_id = 0
+  while True:
+    chunk = get_daily_notifications_query().filter(
+        Notification.id > last_id
+    ).order_by(Notification.id).limit(NOTIFICATIONS_CHUNK_SIZE).all()
+    if not chunk:
+      break
+    last_id = chunk[-1].id
+    unaddressed = []
+    for notification, data in iter_filtered_data(chunk, people_cache):
+      emails = set(data) - {""}
+      for email in emails:
+        recipients[email].add(notification.id)
+      if not emails:
+        unaddressed.append(notification)
+    process_sent_notifications(unaddressed)
+  return recipients
+
+
+def get_digest_data(emails, notif_ids):
+  """Get daily digest data of a batch of recipients.
+
+  Notifications are loaded in chunks and only data for the given recipients
+  is kept, so memory is bounded by the batch and not by the total number of
+  notifications.
+
+  Args:
+    emails (list of str): emails of recipients in the batch.
+    notif_ids (set of int): ids of notifications for the recipients.
+
+  Returns:
+    dict: {user email: notification data for the user}.
+  """
+  emails = set(emails)
+  digest_data = {}
+  people_cache = {}
+  for ids in list_chunks(sorted(notif_ids), NOTIFICATIONS_CHUNK_SIZE):
+    chunk = Notification.query.filter(
+        Notification.id.in_(ids)
+    ).order_by(Notification.id).all()
+    for _, data in iter_filtered_data(chunk, people_cache):
+      merge_dict(digest_data, {email: user_data
+                               for email, user_data in data.iteritems()
+                               if email in emails})
+  return digest_data
+
+
+def render_digests(digests, subject):
+  """Render daily digest emails.
+
+  Args:
+    digests (list): (user email, notification data) tuples.
+    subject (str): subject of the emails.
+
+  Returns:
+    list of (user email, subject, email body) tuples.
+  """
+  def render(digest):
+    user_email, data = digest
+    return (user_email, subject,
+            settings.EMAIL_DIGEST.render(digest=modify_data(data)))
+
+  workers = min(settings.DIGEST_RENDER_WORKERS, len(digests))
+  if workers <= 1:
+    return [render(digest) for digest in digests]
+  pool = ThreadPool(workers)
+  try:
+    return pool.map(render, digests)
+  finally:
+    pool.close()
+    pool.join()
+
+
+def get_transport():
+  return extensions.get_extension_instance(
+      "NOTIFICATION_TRANSPORT",
+      "ggrc.notifications.transports.AppEngineTransport")
+
+
 def send_daily_digest_notifications():
   """Send emails for today's or overdue notifications.
 
+  Recipients are handled in batches of DIGEST_BATCH_SIZE. Data of a batch is
+  built from notifications of its recipients in chunks, the digests are
+  rendered and sent together and notifications that were sent to all their
+  recipients are marked as sent after every batch.
+
   Returns:
     str: String containing a simple list of who received the notification.
   """
   # pylint: disable=invalid-name
   with benchmark("contributed cron job send_daily_digest_notifications"):
-    notif_list, notif_data = get_daily_notifications()
+    with benchmark("finding daily digest recipients"):
+      recipients = get_digest_recipients()
+    pending = defaultdict(int)
+    for notif_ids in recipients.itervalues():
+      for notif_id in notif_ids:
+        pending[notif_id] += 1
+
     sent_emails = []
     subject = "GGRC daily digest for {}".format(date.today().strftime("%b %d"))
-
-    with benchmark("sending daily emails"):
-      for user_email, data in notif_data.iteritems():
-        data = modify_data(data)
-        email_body = settings.EMAIL_DIGEST.render(digest=data)
-        send_email(user_email, subject, email_body)
-        sent_emails.append(user_email)
-
-    with benchmark("processing sent notifications"):
-      process_sent_notifications(notif_list)
+    transport = get_transport()
+
+    for emails in list_chunks(sorted(recipients), settings.DIGEST_BATCH_SIZE):
+      with benchmark("sending daily emails to {} users".format(len(emails))):
+        notif_ids = set().union(*(recipients.pop(email) for email in emails))
+        digest_data = get_digest_data(emails, notif_ids)
+        messages = render_digests(
+            [(email, digest_data[email]) for email in emails
+             if email in digest_data],
+            subject,
+        )
+        del digest_data
+        transport.send(messages)
+        sent_emails.extend(email for email, _, _ in messages)
+
+        for notif_id in notif_ids:
+          pending[notif_id] -= 1
+        sent_ids = [notif_id for notif_id in notif_ids
+                    if not pending[notif_id]]
+        if sent_ids:
+          process_sent_notifications(Notification.query.filter(
+              Notification.id.in_(sent_ids)
+          ).order_by(Notification.id).all())
 
     return "emails sent to: <br> {}".format("<br>".join(sent_emails))
 
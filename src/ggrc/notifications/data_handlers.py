@@ -7,6 +7,7 @@ Main contributed functions are:
   get_assignable_data,
 """
 
+import contextlib
 import datetime
 import urlparse
 
@@ -14,14 +15,17 @@ from collections import defaultdict
 from collections import namedtuple
 from logging import getLogger
 
+import flask
 import pytz
 from pytz import timezone
 import sqlalchemy as sa
+from sqlalchemy import orm
 
 from ggrc import db
 from ggrc import models
 from ggrc import notifications
 from ggrc import utils
+from ggrc.access_control.roleable import Roleable
 from ggrc.models.comment import Commentable
 from ggrc.utils import DATE_FORMAT_US
 from ggrc.models.reflection import AttributeInfo
@@ -93,8 +97,149 @@ def _get_updated_roles(new_list, old_list, roles):
   return role_set
 
 
+def _get_preloaded(key):
+  """Get data preloaded for notifications or None if it is not preloaded."""
+  if not flask.has_app_context():
+    return None
+  return getattr(flask.g, "notification_preload", {}).get(key)
+
+
+def _preload_objects(notifs):
+  """Load objects of notifications with their ACLs into the session.
+
+  Returns:
+    list of loaded objects. The session keeps only weak references to them,
+    so they must be referenced while they are used.
+  """
+  ids_by_type = defaultdict(set)
+  for notif in notifs:
+    ids_by_type[notif.object_type].add(notif.object_id)
+  objects = []
+  for object_type, ids in ids_by_type.iteritems():
+    model = getattr(models, object_type, None)
+    if model is None:
+      continue
+    query = model.query.filter(model.id.in_(ids))
+    if issubclass(model, Roleable):
+      query = query.options(
+          orm.subqueryload("_access_control_list").joinedload("ac_role"),
+          orm.subqueryload("_access_control_list").joinedload(
+              "access_control_people"
+          ).joinedload("person"),
+      )
+    objects.extend(query)
+  return objects
+
+
+def _pick_revision_ids(revisions, created_at):
+  """Pick ids of revisions that _get_revisions would query.
+
+  Args:
+    revisions: list of (id, created_at) tuples of revisions of an object
+      ordered by id.
+    created_at: creation time of the notification.
+
+  Returns:
+    tuple of ids of the current revision and the revision before the
+    notification, the latter can be None.
+  """
+  new_id = revisions[-1][0]
+  older_ids = [id_ for id_, rev_created_at in revisions
+               if rev_created_at < created_at and id_ < new_id]
+  if older_ids:
+    return new_id, older_ids[-1]
+  same_time_ids = [id_ for id_, rev_created_at in revisions
+                   if rev_created_at == created_at and id_ < new_id]
+  return new_id, same_time_ids[0] if same_time_ids else None
+
+
+def _preload_revisions(notifs):
+  """Load revisions of objects of updated assignable notifications.
+
+  Returns:
+    dict {(object_type, object_id, created_at): (new_rev, old_rev)}.
+  """
+  keys = {(notif.object_type, notif.object_id, notif.created_at)
+          for notif in notifs
+          if notif.notification_type.name == "assessment_updated"}
+  if not keys:
+    return {}
+  revision = models.Revision
+  revisions_by_object = defaultdict(list)
+  query = db.session.query(
+      revision.id,
+      revision.resource_type,
+      revision.resource_id,
+      revision.created_at,
+  ).filter(
+      sa.tuple_(revision.resource_type, revision.resource_id).in_(
+          {(object_type, object_id) for object_type, object_id, _ in keys}
+      )
+  ).order_by(revision.id)
+  for id_, resource_type, resource_id, created_at in query:
+    revisions_by_object[resource_type, resource_id].append((id_, created_at))
+
+  picked = {}
+  for object_type, object_id, created_at in keys:
+    revisions = revisions_by_object.get((object_type, object_id))
+    if revisions:
+      picked[object_type, object_id, created_at] = _pick_revision_ids(
+          revisions, created_at)
+  ids = {id_ for pair in picked.itervalues() for id_ in pair if id_}
+  if not ids:
+    return {}
+  loaded = {rev.id: rev for rev in revision.query.filter(revision.id.in_(ids))}
+  return {key: (loaded[new_id], loaded.get(old_id))
+          for key, (new_id, old_id) in picked.iteritems()}
+
+
+def _preload_roles(notifs):
+  """Load non internal roles of objects of notifications.
+
+  Returns:
+    dict {object_type: {role_id: role_name}}.
+  """
+  roles = {notif.object_type: {} for notif in notifs}
+  query = db.session.query(
+      models.AccessControlRole.object_type,
+      models.AccessControlRole.id,
+      models.AccessControlRole.name,
+  ).filter(
+      models.AccessControlRole.object_type.in_(roles.keys()),
+      models.AccessControlRole.internal == sa.sql.expression.false(),
+  )
+  for object_type, role_id, name in query:
+    roles[object_type][role_id] = name
+  return roles
+
+
+@contextlib.contextmanager
+def preloaded_data(notifs):
+  """Preload data used by data handlers for notifications in bulk queries.
+
+  Objects of the notifications are loaded into the session with their ACLs.
+  Revisions of updated objects and assignable roles are kept in
+  flask.g.notification_preload while the context is active.
+  """
+  if not flask.has_app_context():
+    yield
+    return
+  flask.g.notification_preload = {
+      "objects": _preload_objects(notifs),
+      "revisions": _preload_revisions(notifs),
+      "roles": _preload_roles(notifs),
+  }
+  try:
+    yield
+  finally:
+    del flask.g.notification_preload
+
+
 def _get_revisions(obj, created_at):
   """Get current revision and revision before notification is created"""
+  preloaded = _get_preloaded("revisions") or {}
+  if (obj.type, obj.id, created_at) in preloaded:
+    return preloaded[obj.type, obj.id, created_at]
   new_rev = db.session.query(models.Revision) \
       .filter_by(resource_id=obj.id, resource_type=obj.type) \
       .order_by(models.Revision.id.desc()) \
@@ -153,6 +298,9 @@ def _get_updated_fields(obj, created_at, definitions, roles):
 
 def _get_assignable_roles(obj):
   """Get access control roles for assignable"""
+  preloaded = _get_preloaded("roles") or {}
+  if obj.__class__.__name__ in preloaded:
+    return preloaded[obj.__class__.__name__]
   query = db.session.query(
       models.AccessControlRole.id,
       models.AccessControlRole.name
@@ -0,0 +1,87 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Transports used to send batches of notification emails.
+
+The transport is selected with the NOTIFICATION_TRANSPORT setting. Every
+transport has a send method that takes a list of (recipient, subject, body)
+tuples, where body is the html body of the email.
+
+The file and smtp transports are stand-ins for local development, they are
+not available on App Engine.
+"""
+
+import os
+import smtplib
+import tempfile
+import uuid
+from email.mime.text import MIMEText
+from logging import getLogger
+
+from ggrc.notifications import common
+
+
+# pylint: disable=invalid-name
+logger = getLogger(__name__)
+
+
+def make_message(sender, recipient, subject, body):
+  """Make mime message of a html email."""
+  message = MIMEText(body.encode("utf-8"), "html", "utf-8")
+  message["From"] = sender
+  message["To"] = recipient
+  message["Subject"] = subject
+  return message
+
+
+class AppEngineTransport(object):
+  """Send emails with the App Engine mail api."""
+
+  def __init__(self, settings):
+    pass
+
+  def send(self, messages):  # pylint: disable=no-self-use
+    for recipient, subject, body in messages:
+      common.send_email(recipient, subject, body)
+
+
+class FileTransport(object):
+  """Write emails into files of the NOTIFICATION_FILE_DIR directory."""
+
+  def __init__(self, settings):
+    self.sender = settings.APPENGINE_EMAIL
+    self.directory = settings.NOTIFICATION_FILE_DIR or tempfile.gettempdir()
+
+  def send(self, messages):
+    for recipient, subject, body in messages:
+      path = os.path.join(self.directory, "{}.eml".format(uuid.uuid4().hex))
+      with open(path, "w") as email_file:
+        email_file.write(
+            make_message(self.sender, recipient, subject, body).as_string())
+      logger.info("Email to %s written into %s", recipient, path)
+
+
+class SmtpTransport(object):
+  """Send emails through the NOTIFICATION_SMTP_HOST server.
+
+  All emails of a batch are sent over a single connection.
+  """
+
+  def __init__(self, settings):
+    self.sender = settings.APPENGINE_EMAIL
+    self.host = settings.NOTIFICATION_SMTP_HOST
+    self.port = settings.NOTIFICATION_SMTP_PORT
+
+  def send(self, messages):
+    if not messages:
+      return
+    connection = smtplib.SMTP(self.host, self.port)
+    try:
+      for recipient, subject, body in messages:
+        connection.sendmail(
+            self.sender,
+            [recipient],
+            make_message(self.sender, recipient, subject, body).as_string(),
+        )
+    finally:
+      connection.quit()
@@ -14,14 +14,20 @@ import sqlalchemy as sa
 
 from ggrc import db
 from ggrc import models
+from ggrc.builder import json
 from ggrc.models import inflector
 from ggrc.utils import benchmark
 from ggrc.rbac import permissions
 from ggrc.query import custom_operators
 from ggrc.query import pagination
+from ggrc.query import planner
+from ggrc.query import utils as query_utils
 from ggrc.query.exceptions import BadQueryException
 
 
+PAGING_MODES = {None, "found_rows"}
+
+
 # pylint: disable=too-few-public-methods
 
 class QueryHelper(object):
@@ -43,6 +49,12 @@ class QueryHelper(object):
         }
       ]
       limit: [from, to] - limit the result list to a slice result[from, to]
+      paging: optional; "found_rows" to get the page and the total count
+              with a single evaluation of the filters
+      cursor: optional; {"page_size": size of the page,
+                         "after": "next_cursor" of the previous page or null
+                                  for the first page}
+              keyset pagination, used instead of "limit"
       filters: {
         relevant_filters:
           these filters will return all ids of the "search class name" object
@@ -82,6 +94,7 @@ class QueryHelper(object):
 
   def __init__(self, query):
     self.query = self._clean_query(query)
+    self.planner = planner.QueryPlanner(self.query)
 
   def _get_snapshot_child_type(self, object_query):
     """Return child_type for snapshot from a query"""
@@ -108,6 +121,9 @@ class QueryHelper(object):
     for object_query in query:
       if "object_name" not in object_query:
         raise BadQueryException("`object_name` required for each object block")
+      if object_query.get("paging") not in PAGING_MODES:
+        raise BadQueryException(u"Unknown paging mode {}".format(
+            object_query["paging"]))
       filters = object_query.get("filters", {}).get("expression")
       self._clean_filters(filters)
       self._macro_expand_object_query(object_query)
@@ -206,6 +222,7 @@ class QueryHelper(object):
     for object_query in self.query:
       ids = self._get_ids(object_query)
       object_query["ids"] = ids
+    self.planner.log_stats()
     return self.query
 
   @staticmethod
@@ -227,7 +244,10 @@ class QueryHelper(object):
     if contexts is None:
       return None
 
-    return model.id.in_(resources) if resources else sa.sql.false()
+    if not resources:
+      return sa.sql.false()
+    return query_utils.in_ids(model.id, resources, model.__name__,
+                              permission_type)
 
   def _get_objects(self, object_query):
     """Get a set of objects described in the filters."""
@@ -239,7 +259,7 @@ class QueryHelper(object):
 
     object_name = object_query["object_name"]
     object_class = inflector.get_model(object_name)
-    query = object_class.eager_query()
+    query = json.projection_query(object_class, object_query.get("fields"))
     query = query.filter(object_class.id.in_(ids))
 
     with benchmark("Get objects by ids: _get_objects -> obj in query"):
@@ -251,7 +271,11 @@ class QueryHelper(object):
     return objects
 
   def _get_ids(self, object_query):
-    """Get a set of ids of objects described in the filters."""
+    """Get a set of ids of objects described in the filters.
+
+    Object queries that are repeated in the same payload are evaluated only
+    once, see QueryPlanner.object_ids.
+    """
 
     object_name = object_query["object_name"]
     expression = object_query.get("filters", {}).get("expression")
@@ -261,6 +285,26 @@ class QueryHelper(object):
     object_class = inflector.get_model(object_name)
     if object_class is None:
       return set()
+
+    index = next((i for i, item in enumerate(self.query)
+                  if item is object_query), None)
+    ids, paging = self.planner.object_ids(
+        index,
+        object_query,
+        lambda: self._evaluate_ids(object_query, object_class, expression),
+    )
+    object_query.update(paging)
+    return ids
+
+  def _evaluate_ids(self, object_query, object_class, expression):
+    """Run the object query and get the ids and paging results.
+
+    Returns:
+      a tuple of a list of ids and a dict with "total" count of objects and
+      "next_cursor" if keyset pagination is requested. With keyset pagination
+      the total is counted only for the first page.
+    """
+    object_name = object_query["object_name"]
     query = db.session.query(object_class.id)
 
     tgt_class = object_class
@@ -270,7 +314,11 @@ class QueryHelper(object):
 
     requested_permissions = object_query.get("permissions", "read")
     with benchmark("Get permissions: _get_ids > _get_type_query"):
-      type_query = self._get_type_query(object_class, requested_permissions)
+      type_query = self.planner.type_query(
+          object_class,
+          requested_permissions,
+          lambda: self._get_type_query(object_class, requested_permissions),
+      )
       if type_query is not None:
         query = query.filter(type_query)
     with benchmark("Parse filter query: _get_ids > _build_expression"):
@@ -278,10 +326,25 @@ class QueryHelper(object):
           expression,
           object_class,
           tgt_class,
-          self.query
+          self.query,
+          self.planner,
       )
       if filter_expression is not None:
         query = query.filter(filter_expression)
+    if object_query.get("cursor") is not None:
+      with benchmark("Apply keyset pagination"):
+        ids, next_cursor = pagination.apply_keyset(
+            object_class,
+            query,
+            object_query.get("order_by"),
+            tgt_class,
+            object_query["cursor"],
+        )
+      paging = {"next_cursor": next_cursor}
+      if object_query["cursor"].get("after") is None:
+        # Following pages would repeat the count over the whole result
+        paging["total"] = pagination.get_total_count(query)
+      return ids, paging
     if object_query.get("order_by"):
       with benchmark("Sorting: _get_ids > order_by"):
         query = pagination.apply_order_by(
@@ -292,16 +355,19 @@ class QueryHelper(object):
         )
     with benchmark("Apply limit"):
       limit = object_query.get("limit")
-      if limit:
+      paging = object_query.get("paging")
+      if limit and paging == "found_rows":
+        rows, total = pagination.apply_limit_with_total(query, limit)
+        ids = [obj.id for obj in rows]
+      elif limit:
         limit_query = pagination.apply_limit(query, limit)
         total = pagination.get_total_count(query)
         ids = [obj.id for obj in limit_query]
       else:
         ids = [obj.id for obj in query]
         total = len(ids)
-      object_query["total"] = total
 
-    return ids
+    return ids, {"total": total}
 
   @staticmethod
   def _slugs_to_ids(object_name, slugs):
@@ -334,8 +334,12 @@ def related_evidence(exp, object_class, target_class, query):
   return object_class.id.in_(result)
 
 
-def build_expression(exp, object_class, target_class, query):
-  """Make an SQLAlchemy filtering expression from exp expression tree."""
+def build_expression(exp, object_class, target_class, query, planner=None):
+  """Make an SQLAlchemy filtering expression from exp expression tree.
+
+  If a query planner is given, expensive sub-expressions are shared with the
+  other object queries evaluated by the same planner.
+  """
   if not exp:
     # empty expression doesn't required filter
     return None
@@ -345,23 +349,34 @@ def build_expression(exp, object_class, target_class, query):
     # empty expression after autocast is invalid and should raise an exception
     raise BadQueryException("Invalid filter data")
   operation = OPS.get(exp.get("op", {}).get("name")) or unknown
-  return operation(exp, object_class, target_class, query)
+  if operation in (and_operation, or_operation):
+    return operation(exp, object_class, target_class, query, planner=planner)
+  if planner is None:
+    return operation(exp, object_class, target_class, query)
+  return planner.expression(
+      exp, object_class, target_class,
+      lambda: operation(exp, object_class, target_class, query),
+  )
 
 
 @validate("left", "right")
-def and_operation(exp, object_class, target_class, query):
+def and_operation(exp, object_class, target_class, query, planner=None):
   """Operator generate sqlalchemy for and operation"""
   return sqlalchemy.and_(
-      build_expression(exp["left"], object_class, target_class, query),
-      build_expression(exp["right"], object_class, target_class, query))
+      build_expression(exp["left"], object_class, target_class, query,
+                       planner),
+      build_expression(exp["right"], object_class, target_class, query,
+                       planner))
 
 
 @validate("left", "right")
-def or_operation(exp, object_class, target_class, query):
+def or_operation(exp, object_class, target_class, query, planner=None):
   """Operator generate sqlalchemy for or operation"""
   return sqlalchemy.or_(
-      build_expression(exp["left"], object_class, target_class, query),
-      build_expression(exp["right"], object_class, target_class, query))
+      build_expression(exp["left"], object_class, target_class, query,
+                       planner),
+      build_expression(exp["right"], object_class, target_class, query,
+                       planner))
 
 
 @validate("left", "right")
@@ -69,17 +69,19 @@ class DefaultHandler(QueryHelper):
         object_query["last_modified"] = None  # synonymous to now()
         if query_type == "ids":
           object_query["ids"] = ids
+    self.planner.log_stats()
     return self.query
 
   @staticmethod
   def _transform_to_json(objects, fields=None):
-    """Make a JSON representation of objects from the list."""
-    objects_json = [json.publish(obj) for obj in objects]
-    objects_json = json.publish_representation(objects_json)
+    """Make a JSON representation of objects from the list.
+
+    If fields are given, only those attributes are published.
+    """
     if fields:
-      objects_json = [{f: o.get(f) for f in fields}
-                      for o in objects_json]
-    return objects_json
+      return json.publish_projection(objects, fields)
+    objects_json = [json.publish(obj) for obj in objects]
+    return json.publish_representation(objects_json)
 
   @staticmethod
   def _get_last_modified(model, objects):
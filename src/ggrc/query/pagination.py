@@ -3,6 +3,9 @@
 
 """Pagination helpers module for query generation."""
 
+import base64
+import json
+
 import sqlalchemy as sa
 
 from ggrc import models
@@ -50,6 +53,27 @@ def apply_limit(query, limit):
   return limit_query
 
 
+def apply_limit_with_total(query, limit):
+  """Get a page of objects and the total count with one filter evaluation.
+
+  The page query is run with SQL_CALC_FOUND_ROWS so MySQL counts all rows
+  that match the filter while the page is fetched. FOUND_ROWS() only reads
+  that number and does not run the filter again, unlike get_total_count.
+
+  Args:
+    query: filter query;
+    limit: a tuple of indexes in format (from, to).
+
+  Returns:
+    a tuple of a list of matched rows on the page and total count.
+  """
+  limit_query = apply_limit(query, limit).prefix_with("SQL_CALC_FOUND_ROWS")
+  with benchmark("Apply limit: apply_limit_with_total > query_found_rows"):
+    rows = limit_query.all()
+    total = db.session.execute(sa.text("SELECT FOUND_ROWS()")).scalar()
+  return rows, total
+
+
 def get_total_count(query):
   """Get count of all objects in the query."""
   with benchmark("Apply limit: apply_limit > query_count"):
@@ -156,3 +180,124 @@ def apply_order_by(model, query, order_by, tgt_class):
     query = query.outerjoin(*join_list)
 
   return query.order_by(*orders)
+
+
+def _get_cursor(cursor):
+  """Get page size and the position after which the page starts."""
+  if not isinstance(cursor, dict):
+    raise BadQueryException("Invalid cursor. Object expected.")
+  try:
+    page_size = int(cursor.get("page_size"))
+  except (ValueError, TypeError):
+    raise BadQueryException("Invalid cursor page_size. Integer expected.")
+  if page_size <= 0:
+    raise BadQueryException("Cursor page_size should be positive.")
+  return page_size, cursor.get("after")
+
+
+def encode_cursor(values):
+  """Encode sort key values of the last row on a page into a cursor."""
+  return base64.urlsafe_b64encode(json.dumps(values, default=unicode))
+
+
+def decode_cursor(cursor):
+  """Decode sort key values from a cursor made by encode_cursor."""
+  try:
+    values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+  except (AttributeError, TypeError, ValueError, UnicodeError):
+    raise BadQueryException("Invalid cursor.")
+  if not isinstance(values, list):
+    raise BadQueryException("Invalid cursor.")
+  return values
+
+
+def _equal(key, value):
+  """Null safe equality of a sort key and a value."""
+  return key.is_(None) if value is None else key == value
+
+
+def _after(key, desc, value):
+  """Condition for key values that are sorted after the value.
+
+  MySQL sorts NULL values before all other values in ascending order.
+  """
+  if desc:
+    if value is None:
+      return sa.sql.false()
+    return sa.or_(key < value, key.is_(None))
+  if value is None:
+    return key.isnot(None)
+  return key > value
+
+
+def _seek_condition(keys, values):
+  """Get a filter for rows that are sorted after the given key values.
+
+  Args:
+    keys: a list of (sort expression, desc) tuples;
+    values: a list of sort key values of the last seen row.
+
+  Returns:
+    (k1 after v1) OR (k1 = v1 AND k2 after v2) OR ... expression.
+  """
+  clauses = []
+  for index, (key, desc) in enumerate(keys):
+    conditions = [_equal(prev_key, values[prev_index])
+                  for prev_index, (prev_key, _) in enumerate(keys[:index])]
+    conditions.append(_after(key, desc, values[index]))
+    clauses.append(sa.and_(*conditions))
+  return sa.or_(*clauses)
+
+
+def apply_keyset(model, query, order_by, tgt_class, cursor):
+  """Get a page of ids with keyset (seek) pagination.
+
+  Instead of skipping the rows of the previous pages with OFFSET, the page
+  starts right after the sort key values and id of the last row of the
+  previous page, so every page costs the same as the first one.
+
+  Args:
+    model: the model instances of which are requested in query;
+    query: filter query for ids;
+    order_by: a list of dicts with keys "name" and "desc", see
+              apply_order_by;
+    tgt_class: the snapshotted model if `model` is Snapshot else `model`;
+    cursor: {"page_size": size of the page,
+             "after": cursor returned for the previous page or None}.
+
+  Returns:
+    a tuple of a list of ids on the page and the cursor for the next page or
+    None if this is the last page.
+  """
+  page_size, after = _get_cursor(cursor)
+
+  keys = []
+  for counter, clause in enumerate(order_by or []):
+    joins, order = _joins_and_order(counter, dict(clause, desc=False),
+                                    model, tgt_class)
+    if joins is not None:
+      query = query.outerjoin(*joins)
+    keys.append((order, clause.get("desc", False)))
+  # id makes the order total, so no row is skipped or repeated
+  keys.append((model.id, False))
+
+  if after is not None:
+    values = decode_cursor(after)
+    if len(values) != len(keys):
+      raise BadQueryException("Cursor does not match order_by.")
+    query = query.filter(_seek_condition(keys, values))
+
+  query = query.add_columns(*[
+      key.label(u"cursor_key_{}".format(index))
+      for index, (key, _) in enumerate(keys)
+  ]).order_by(*[
+      key.desc() if desc else key for key, desc in keys
+  ]).limit(page_size)
+
+  with benchmark("Apply keyset pagination: apply_keyset > query_page"):
+    rows = query.all()
+  ids = [row[0] for row in rows]
+  next_cursor = None
+  if len(rows) == page_size:
+    next_cursor = encode_cursor(list(rows[-1][1:]))
+  return ids, next_cursor
@@ -0,0 +1,137 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Query planner for multi-object /query payloads.
+
+A single /query request usually contains a list of object queries that share
+a lot of work: the same permission filters, the same relevance filters and
+sometimes even the same object queries requested with a different result
+type. The planner memoizes these parts so that every distinct sub-expression
+is built and evaluated only once per payload.
+"""
+
+import json
+import logging
+
+from ggrc.utils import benchmark
+
+
+logger = logging.getLogger(__name__)
+
+
+# Operators that run their own queries while the filter expression is built
+# and inline the resulting ids into the expression.
+MEMOIZED_OPERATORS = {
+    "relevant",
+    "similar",
+    "owned",
+    "related_people",
+    "cascade_unmappable",
+}
+
+# Memoized operators that use "ids" as a set rather than a list.
+ID_SET_OPERATORS = {
+    "relevant",
+    "related_people",
+}
+
+# Object query keys that define which ids are returned by the object query.
+OBJECT_QUERY_KEYS = (
+    "object_name",
+    "filters",
+    "order_by",
+    "limit",
+    "cursor",
+    "permissions",
+)
+
+
+def normalize(value):
+  """Get a hashable canonical representation of a JSON-like value."""
+  return json.dumps(value, sort_keys=True, default=unicode)
+
+
+class QueryPlanner(object):
+  """Memoization of shared parts of a multi-object query.
+
+  Every memoized part is stored under a normalized key and all object queries
+  in the same payload reuse the stored value instead of building and running
+  it again.
+  """
+
+  def __init__(self, query):
+    self.query = query
+    self._results = {}
+    self.hits = 0
+    self.misses = 0
+
+  def memoize(self, key, func):
+    """Get the value stored under key or compute and store it with func."""
+    if key in self._results:
+      self.hits += 1
+      return self._results[key]
+    self.misses += 1
+    result = self._results[key] = func()
+    return result
+
+  def type_query(self, model, permission_type, func):
+    """Memoize permission filter for the given model and permission type."""
+    return self.memoize(("type_query", model.__name__, permission_type), func)
+
+  def _resolve_previous(self, exp):
+    """Get canonical form of an expression with object name and ids.
+
+    "__previous__" reference is replaced with the referenced object query and
+    ids of ID_SET_OPERATORS are sorted, so that the same filter given with a
+    reference and with explicit ids shares one memoized value.
+    """
+    if exp["op"]["name"] not in ID_SET_OPERATORS:
+      return exp
+    resolved = dict(exp)
+    if exp.get("object_name") == "__previous__":
+      previous = self.query[exp["ids"][0]]
+      resolved["object_name"] = previous["object_name"]
+      resolved["ids"] = previous.get("ids") or []
+    resolved["ids"] = sorted(set(resolved["ids"]))
+    return resolved
+
+  def expression(self, exp, object_class, target_class, func):
+    """Memoize a filter expression built with func.
+
+    Only operators listed in MEMOIZED_OPERATORS are memoized, all other
+    operators are cheap to build and are built with func directly.
+    """
+    operator_name = exp.get("op", {}).get("name")
+    if operator_name not in MEMOIZED_OPERATORS:
+      return func()
+    key = (
+        "expression",
+        object_class.__name__,
+        target_class.__name__,
+        normalize(self._resolve_previous(exp)),
+    )
+    return self.memoize(key, func)
+
+  def object_ids(self, index, object_query, func):
+    """Memoize ids and paging results of the object query.
+
+    Args:
+      index: position of the object query in the payload.
+      object_query: the object query dict.
+      func: function that returns a tuple of ids and a dict with paging
+        results, such as total count.
+
+    Returns:
+      tuple of ids and paging results for the object query.
+    """
+    key = ("object_ids", normalize({
+        name: object_query.get(name) for name in OBJECT_QUERY_KEYS
+    }))
+    with benchmark(u"Query planner: sub-query #{} ({})".format(
+        index, object_query.get("object_name"))):
+      return self.memoize(key, func)
+
+  def log_stats(self):
+    """Log how much work has been shared between object queries."""
+    logger.debug("Query planner: %s memoized parts reused, %s evaluated",
+                 self.hits, self.misses)
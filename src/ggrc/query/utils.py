@@ -5,6 +5,17 @@
 
 import sqlalchemy as sa
 
+from ggrc.access_control import permissions_store
+from ggrc.rbac import permissions
+from ggrc.utils import structures
+
+
+# Id sets larger than this are filtered with ACL subquery, ranges and IN list.
+IN_LIST_LIMIT = 1000
+
+# Shorter runs of consecutive ids are inlined into the IN list.
+MIN_RANGE_LENGTH = 3
+
 
 def get_type_select_column(model):
   """Get column name,taking into account polymorphic types."""
@@ -20,3 +31,63 @@ def get_type_select_column(model):
             for val, m in mapper.polymorphic_map.items()
         })
   return type_column
+
+
+def _acl_ids_filter(column, object_type, action):
+  """Get subquery filter of ids granted to the current user through ACL.
+
+  Returns:
+    (filter, IdSet of ids covered by the filter) or (None, None) if the user
+    has no ACL permissions for the objects.
+  """
+  if action not in permissions_store.ACTIONS:
+    return None, None
+  person_id = getattr(permissions.get_user(), "id", None)
+  if person_id is None:
+    return None, None
+  acl_ids = permissions_store.get_acl_permissions(person_id)\
+      .get(action, {}).get(object_type)
+  if not acl_ids:
+    return None, None
+  query = permissions_store.get_object_ids_query(
+      person_id, object_type, action)
+  return column.in_(query.subquery()), acl_ids
+
+
+def in_ids(column, ids, object_type=None, action="read"):
+  """Get filter of column values by a set of ids.
+
+  Small sets are inlined as IN list. Ids of large permission resource sets
+  that are granted through ACL are filtered with a subquery on the ACL
+  tables, the rest are filtered with BETWEEN for runs of consecutive ids and
+  an IN list, so the statement size does not grow with the number of ACL
+  entries of the user.
+
+  Args:
+    column: column to filter.
+    ids: iterable of ids.
+    object_type: type of the objects if ids are permission resources of the
+      current user.
+    action: action of the permission resources.
+  """
+  if len(ids) <= IN_LIST_LIMIT:
+    return column.in_(ids)
+  conditions = []
+  if object_type is not None:
+    acl_filter, acl_ids = _acl_ids_filter(column, object_type, action)
+    if acl_filter is not None:
+      conditions.append(acl_filter)
+      ids = structures.IdSet(id_ for id_ in ids if id_ not in acl_ids)
+  if not isinstance(ids, structures.IdSet):
+    ids = structures.IdSet(ids)
+  single_ids = []
+  for first, last in ids.ranges():
+    if last - first + 1 < MIN_RANGE_LENGTH:
+      single_ids.extend(xrange(first, last + 1))
+    else:
+      conditions.append(column.between(first, last))
+  if single_ids:
+    conditions.append(column.in_(single_ids))
+  if not conditions:
+    return sa.false()
+  return sa.or_(*conditions)
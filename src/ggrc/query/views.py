@@ -3,6 +3,7 @@
 
 """This module contains logic to handle '/query' endpoint."""
 
+import json
 import time
 import logging
 from wsgiref.handlers import format_date_time
@@ -11,9 +12,13 @@ from flask import request
 from flask import current_app
 from werkzeug.exceptions import BadRequest
 
+from ggrc import db
+from ggrc.cache import data_version
+from ggrc.fulltext import queue as fulltext_queue
 from ggrc.models import all_models
 from ggrc.query.exceptions import BadQueryException
 from ggrc.query.default_handler import DefaultHandler
+from ggrc.login import get_current_user_id
 from ggrc.login import login_required
 from ggrc.models.inflector import get_model
 from ggrc.services.common import etag
@@ -33,10 +38,11 @@ def build_collection_representation(model, description):
   return collection
 
 
-def json_success_response(response_object, last_modified=None, status=200):
+def json_success_response(response_object, last_modified=None, status=200,
+                          obj_etag=None):
   """Build a 200-response with metadata headers."""
   headers = [
-      ('Etag', etag(response_object)),
+      ('Etag', obj_etag or etag(response_object)),
       ('Content-Type', 'application/json'),
   ]
   if last_modified is not None:
@@ -70,13 +76,28 @@ def get_objects_by_query():
   """Return objects corresponding to a POST'ed query list."""
   query = request.json
 
+  with benchmark("Check query etag"):
+    # The etag is checked before the queue is drained, the results computed
+    # after draining are at least as new as the data version of the etag.
+    query_etag = data_version.get_etag(get_current_user_id(),
+                                       json.dumps(query, sort_keys=True))
+    if query_etag and request.headers.get("If-None-Match") == query_etag:
+      return current_app.make_response(("", 304, [("Etag", query_etag)]))
+    if query_etag:
+      # The snapshot of the running transaction may be older than the
+      # version, the results are read in a new transaction.
+      db.session.rollback()
+
+  with benchmark("Index queued objects for consistent read"):
+    fulltext_queue.drain_for_read()
   results = get_handler_results(query)
 
   last_modified_list = [result["last_modified"] for result in results
                         if result["last_modified"]]
   last_modified = max(last_modified_list) if last_modified_list else None
   collections = []
-  collection_fields = ["ids", "values", "count", "total", "object_name"]
+  collection_fields = ["ids", "values", "count", "total", "next_cursor",
+                       "object_name"]
 
   for result in results:
     model = get_model(result["object_name"])
@@ -91,7 +112,8 @@ def get_objects_by_query():
       )
       collections.append(collection)
 
-  return json_success_response(collections, last_modified)
+  return json_success_response(collections, last_modified,
+                               obj_etag=query_etag)
 
 
 def init_query_views(app):
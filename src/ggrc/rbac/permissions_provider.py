@@ -11,6 +11,7 @@ from ggrc.rbac.permissions import permissions_for as find_permissions
 from ggrc.rbac.permissions import is_allowed_create
 from ggrc.models import get_model, all_models
 from ggrc.models import Person
+from ggrc.utils import structures
 
 Permission = namedtuple(
     'Permission',
@@ -382,13 +383,13 @@ class DefaultUserPermissions(object):
     #   superclasses
     resource_types = get_contributing_resource_types(resource_type)
 
-    ret = []
+    ret = structures.IdSet()
     for resource_type in resource_types:
-      ret.extend(
+      ret.update(
           permissions
           .get(action, {})
           .get(resource_type, {})
-          .get('resources', set()))
+          .get('resources', ()))
     return ret
 
   def _get_contexts_for(self, action, resource_type):
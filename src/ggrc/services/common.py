@@ -43,6 +43,8 @@ from ggrc.services import signals
 from ggrc.models.background_task import BackgroundTask, create_task
 from ggrc.query import utils as query_utils
 from ggrc import settings
+from ggrc.cache import data_version
+from ggrc.cache import resource_cache as resource_cache_module
 from ggrc.cache import utils as cache_utils
 from ggrc.utils import errors as ggrc_errors
 
@@ -246,7 +248,8 @@ class ModelView(View):
       resources = permissions.read_resources_for(self.model.__name__)
       if contexts is not None:
         if resources:
-          query = query.filter(self.model.id.in_(resources))
+          query = query.filter(query_utils.in_ids(
+              self.model.id, resources, self.model.__name__))
         else:
           query = query.filter(sa.false())
 
@@ -735,22 +738,47 @@ class Resource(ModelView):
     }
     return matches, collection_extras
 
+  def use_resource_cache(self):
+    """Check if published resources of this request can be cached.
+
+    Resources published with extra included properties differ from the
+    cached ones. Status of background tasks circumvents our memcache
+    invalidation logic, so they are not cached.
+    """
+    return (self.has_cache() and
+            self.model.__name__ != 'BackgroundTask' and
+            '__include' not in request.args)
+
   def get_matched_resources(self, matches):
+    """Get published resources for matches.
+
+    Resources are fetched from the cache in one call, only the misses are
+    loaded from the database and written back to the cache in one call.
+
+    Returns:
+      tuple of dicts {match: resource} of resources found in the cache and
+      resources loaded from the database.
+    """
     cache_objs = {}
-    if self.has_cache():
+    database_matches = matches
+    resource_cache = None
+    if self.use_resource_cache():
       self.request.cache_manager = cache_utils.get_cache_manager()
+      resource_cache = resource_cache_module.ResourceCache(
+          self.request.cache_manager.cache_object.memcache_client,
+          self.request.cache_manager.supported_classes,
+      )
       with benchmark("Query cache for resources"):
-        cache_objs = self.get_resources_from_cache(matches)
+        cache_objs = resource_cache.get_multi(matches)
       database_matches = [m for m in matches if m not in cache_objs]
-    else:
-      database_matches = matches
+      self.request.resource_cache_stats = resource_cache.stats
 
     database_objs = {}
     if database_matches:
-      database_objs = self.get_resources_from_database(matches)
-      if self.has_cache():
+      database_objs = self.get_resources_from_database(database_matches)
+      if resource_cache is not None:
         with benchmark("Add resources to cache"):
-          self.add_resources_to_cache(database_objs)
+          resource_cache.set_multi(database_objs)
     return cache_objs, database_objs
 
   def collection_get(self):
@@ -764,6 +792,21 @@ class Resource(ModelView):
         return current_app.make_response((
             'application/json', 406, [('Content-Type', 'text/plain')]))
 
+    with benchmark("dispatch_request > collection_get > Check etag"):
+      # The etag depends only on the data version and the request, so an
+      # unchanged collection is confirmed without loading any objects.
+      collection_etag = data_version.get_etag(
+          get_current_user_id(), request.full_path)
+      if (collection_etag and
+              self.request.headers.get('If-None-Match') == collection_etag):
+        return current_app.make_response((
+            '', 304, [('Etag', collection_etag)]))
+      if collection_etag:
+        # The transaction started before the version was read, e.g. by
+        # loading the current user, and its snapshot may be older than the
+        # version. The collection is read in a new transaction.
+        db.session.rollback()
+
     with benchmark("dispatch_request > collection_get > Collection matches"):
       # We skip querying by contexts for Creator role and relationship objects,
       # because it will filter out objects that the Creator can access.
@@ -814,46 +857,16 @@ class Resource(ModelView):
         collection = self.build_collection_representation(
             objs, extras=extras)
 
-      if 'If-None-Match' in self.request.headers and \
-         self.request.headers['If-None-Match'] == etag(collection):
-        return current_app.make_response((
-            '', 304, [('Etag', etag(collection))]))
+      if collection_etag is None:
+        collection_etag = etag(collection)
+        if self.request.headers.get('If-None-Match') == collection_etag:
+          return current_app.make_response((
+              '', 304, [('Etag', collection_etag)]))
 
       with benchmark("Make response"):
         return self.json_success_response(
-            collection, self.collection_last_modified(), cache_op=cache_op)
-
-  def get_resources_from_cache(self, matches):
-    """Get resources from cache for specified matches"""
-    resources = {}
-    # Disable caching for background tasks
-    # Setting background task status circumvents our memcache
-    # invalidation logic so we have to disabling memcache.
-    if self.model.__name__ == 'BackgroundTask':
-      return resources
-    # Skip right to memcache
-    memcache_client = self.request.cache_manager.cache_object.memcache_client
-    for match in matches:
-      key = cache_utils.get_cache_key(None, id_=match[0], type_=match[1])
-      val = memcache_client.get(key)
-      if val:
-        val = json.loads(val)
-      else:
-        val = {}
-      if "selfLink" in val:
-        resources[match] = val
-    return resources
-
-  def add_resources_to_cache(self, match_obj_pairs):
-    """Add resources to cache if they are not blocked by DeleteOp entries"""
-    # Skip right to memcache
-    cache_manager = self.request.cache_manager
-    memcache_client = cache_manager.cache_object.memcache_client
-    for match, obj in match_obj_pairs.items():
-      if obj.__class__.__name__ in cache_manager.supported_classes:
-        memcache_client.add(
-            cache_utils.get_cache_key(None, id_=match[0], type_=match[1]),
-            as_json(obj))
+            collection, self.collection_last_modified(), cache_op=cache_op,
+            obj_etag=collection_etag)
 
   def invalidate_cache_to(self, obj):
     """Invalidate api cache for sent object."""
@@ -1327,6 +1340,10 @@ class Resource(ModelView):
       headers.append(('Location', self.url_for(id=id)))
     if cache_op:
       headers.append(('X-GGRC-Cache', cache_op))
+      stats = getattr(self.request, 'resource_cache_stats', None)
+      if stats is not None:
+        headers.append(('X-GGRC-Cache-Hits', str(stats.hits)))
+        headers.append(('X-GGRC-Cache-Misses', str(stats.misses)))
     return current_app.make_response(
         (self.as_json(response_object), status, headers))
 
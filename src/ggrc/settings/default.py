@@ -19,6 +19,31 @@ AUTOBUILD_ASSETS = False
 ENABLE_JASMINE = False
 DEBUG_ASSETS = False
 FULLTEXT_INDEXER = None
+# Queue objects for reindex on commit and index them out of the request
+FULLTEXT_DEFERRED_INDEXING = bool(
+    os.environ.get("GGRC_FULLTEXT_DEFERRED_INDEXING"))
+# Max age in seconds of queued reindex entries visible to fulltext reads
+FULLTEXT_INDEX_MAX_STALENESS = int(
+    os.environ.get("GGRC_FULLTEXT_INDEX_MAX_STALENESS", "60"))
+# Queue new ACL entries on commit and propagate them out of the request
+ACL_DEFERRED_PROPAGATION = bool(
+    os.environ.get("GGRC_ACL_DEFERRED_PROPAGATION"))
+# Number of worker processes used by the full reindex
+REINDEX_PROCESSES = int(os.environ.get("GGRC_REINDEX_PROCESSES", "1"))
+# Number of worker threads reindexing ranges of snapshots
+REINDEX_SNAPSHOT_WORKERS = int(
+    os.environ.get("GGRC_REINDEX_SNAPSHOT_WORKERS", "1"))
+# Number of worker threads importing independent csv blocks concurrently
+IMPORT_BLOCK_WORKERS = int(os.environ.get("GGRC_IMPORT_BLOCK_WORKERS", "1"))
+# Number of imported rows committed together with the import progress, 0
+# disables the chunked import
+IMPORT_COMMIT_CHUNK_ROWS = int(
+    os.environ.get("GGRC_IMPORT_COMMIT_CHUNK_ROWS", "0"))
+# Number of retries of a chunked import that failed after committing rows
+IMPORT_COMMIT_RETRIES = int(os.environ.get("GGRC_IMPORT_COMMIT_RETRIES", "3"))
+# Store content of new revisions in the compact binary format
+REVISION_CONTENT_COMPACT = bool(
+    os.environ.get("GGRC_REVISION_CONTENT_COMPACT"))
 USER_PERMISSIONS_PROVIDER = \
     'ggrc_basic_permissions.CompletePermissionsProvider'
 EXTENSIONS = [
@@ -89,9 +114,36 @@ SECRET_KEY = os.environ.get('GGRC_SECRET_KEY', 'Replace-with-something-secret')
 
 MEMCACHE_MECHANISM = True
 
+# Backend of the shared cache, see ggrc.cache.backends
+CACHE_BACKEND = os.environ.get(
+    "GGRC_CACHE_BACKEND", "ggrc.cache.backends.AppEngineBackend")
+# Max number of entries and default expiration in seconds of the local cache
+CACHE_LOCAL_MAX_ENTRIES = int(
+    os.environ.get("GGRC_CACHE_LOCAL_MAX_ENTRIES", "10000"))
+CACHE_LOCAL_TTL = int(os.environ.get("GGRC_CACHE_LOCAL_TTL", "3600"))
+# Address of the stand-in cache server used by the socket backend
+CACHE_SERVER_HOST = os.environ.get("GGRC_CACHE_SERVER_HOST", "127.0.0.1")
+CACHE_SERVER_PORT = int(os.environ.get("GGRC_CACHE_SERVER_PORT", "11311"))
+
 # AppEngine Email
 APPENGINE_EMAIL = os.environ.get('APPENGINE_EMAIL', '')
 
+# Transport of daily digest emails, see ggrc.notifications.transports
+NOTIFICATION_TRANSPORT = os.environ.get(
+    "GGRC_NOTIFICATION_TRANSPORT",
+    "ggrc.notifications.transports.AppEngineTransport")
+# Directory of emails written by the file transport
+NOTIFICATION_FILE_DIR = os.environ.get("GGRC_NOTIFICATION_FILE_DIR", "")
+# Server used by the smtp transport
+NOTIFICATION_SMTP_HOST = os.environ.get(
+    "GGRC_NOTIFICATION_SMTP_HOST", "localhost")
+NOTIFICATION_SMTP_PORT = int(
+    os.environ.get("GGRC_NOTIFICATION_SMTP_PORT", "25"))
+# Number of recipients whose daily digests are rendered and sent together
+DIGEST_BATCH_SIZE = int(os.environ.get("GGRC_DIGEST_BATCH_SIZE", "100"))
+# Number of worker threads rendering daily digests of a batch
+DIGEST_RENDER_WORKERS = int(os.environ.get("GGRC_DIGEST_RENDER_WORKERS", "1"))
+
 CALENDAR_MECHANISM = False
 
 MAX_INSTANCES = os.environ.get('MAX_INSTANCES', '3')
@@ -16,6 +16,7 @@ from sqlalchemy.sql.expression import bindparam
 
 from ggrc import db
 from ggrc import models
+from ggrc.cache import data_version
 from ggrc.models.hooks import acl
 from ggrc.login import get_current_user_id
 from ggrc.models import all_models
@@ -328,6 +329,7 @@ class SnapshotGenerator(object):
     """
     if data and not self.dry_run:
       db.session.execute(operation, data)
+      data_version.mark_changed(db.session)
 
   def create(self, event, revisions, _filter=None):
     """Create snapshots of parent object's neighborhood per provided rules
@@ -458,6 +460,7 @@ class SnapshotGenerator(object):
           "user_id": get_current_user_id(),
           "parent_id": parent.id
       })
+      data_version.mark_changed(db.session)
 
   @classmethod
   def _get_audit_relationships(cls, audit_ids):
@@ -538,6 +541,8 @@ class SnapshotGenerator(object):
 
     new_ids = self._get_audit_relationships(audit_ids)
     created_ids = new_ids.difference(old_ids)
+    if created_ids:
+      data_version.mark_changed(db.session)
     acl.add_relationships(created_ids)
 
   def _remove_lost_snapshot_mappings(self):
@@ -13,11 +13,13 @@ from sqlalchemy import orm
 
 from ggrc import db
 from ggrc import models
+from ggrc import settings
+from ggrc.cache import data_version
 from ggrc.models import all_models
 from ggrc.fulltext.mysql import MysqlRecordProperty as Record
 from ggrc.fulltext import get_indexer
 from ggrc.models.reflection import AttributeInfo
-from ggrc.utils import generate_query_chunks, helpers
+from ggrc.utils import generate_query_chunks, helpers, process_query_chunks
 
 from ggrc.snapshotter.rules import Types
 from ggrc.snapshotter.datastructures import Pair
@@ -128,22 +130,33 @@ def get_options():
 
 
 @helpers.without_sqlalchemy_cache
-def reindex():
-  """Reindex all snapshots."""
+def _reindex_chunk(query_chunk):
+  """Reindex snapshots of a chunk query and commit them."""
+  rows = query_chunk.all()
+  reindex_pairs({Pair.from_4tuple(p) for p in rows})
+  db.session.commit()
+  logger.info("Snapshot: reindexed %s snapshots", len(rows))
+
+
+@helpers.without_sqlalchemy_cache
+def reindex(workers=None):
+  """Reindex all snapshots.
+
+  Args:
+    workers: number of worker threads reindexing ranges of snapshots,
+      REINDEX_SNAPSHOT_WORKERS by default.
+  """
+  if workers is None:
+    workers = settings.REINDEX_SNAPSHOT_WORKERS
   columns = db.session.query(
       models.Snapshot.parent_type,
       models.Snapshot.parent_id,
       models.Snapshot.child_type,
       models.Snapshot.child_id,
   )
-  all_count = columns.count()
-  handled = 0
-  for query_chunk in generate_query_chunks(columns):
-    handled += query_chunk.count()
-    logger.info("Snapshot: %s/%s", handled, all_count)
-    pairs = {Pair.from_4tuple(p) for p in query_chunk}
-    reindex_pairs(pairs)
-    db.session.commit()
+  logger.info("Snapshot: reindexing %s snapshots", columns.count())
+  process_query_chunks(columns, _reindex_chunk,
+                       id_column=models.Snapshot.id, workers=workers)
 
 
 def reindex_snapshots(snapshot_ids):
@@ -156,7 +169,8 @@ def reindex_snapshots(snapshot_ids):
       models.Snapshot.child_type,
       models.Snapshot.child_id,
   ).filter(models.Snapshot.id.in_(snapshot_ids))
-  for query_chunk in generate_query_chunks(columns):
+  for query_chunk in generate_query_chunks(columns,
+                                           id_column=models.Snapshot.id):
     pairs = {Pair.from_4tuple(p) for p in query_chunk}
     reindex_pairs(pairs)
     db.session.commit()
@@ -183,6 +197,9 @@ def insert_records(payload):
   """
   engine = db.engine
   engine.execute(Record.__table__.insert(), payload)
+  # The records are written outside of the session, the commit below only
+  # replaces the data version.
+  data_version.mark_changed(db.session)
   db.session.commit()
 
 
@@ -372,7 +389,8 @@ def reindex_pairs(pairs):
           "id",
           "resource_type",
           "resource_id",
-          "_content",
+          "_content_text",
+          "_content_compact",
       ),
       orm.load_only(
           "id",
@@ -288,12 +288,128 @@ def iso_to_us_date(date_string):
   return convert_date_format(date_string, DATE_FORMAT_ISO, DATE_FORMAT_US)
 
 
-def generate_query_chunks(query, chunk_size=CHUNK_SIZE):
-  """Make a generator splitting `query` into chunks of size `chunk_size`."""
-  count = query.count()
-  query = query.order_by("id")
-  for offset in range(0, count, chunk_size):
-    yield query.limit(chunk_size).offset(offset)
+def _get_id_column(query):
+  """Get id column of the first entity of the query."""
+  expr = query.column_descriptions[0]["expr"]
+  return getattr(expr, "class_", expr).id
+
+
+def iter_id_chunks(query, id_column, chunk_size=CHUNK_SIZE, after_id=None):
+  """Yield successive sorted lists of ids of rows of `query`.
+
+  The ids are paged with keyset pagination (`id > last_id ... LIMIT n`) so
+  every chunk is an index range scan, regardless of how many rows were
+  already handled.
+
+  Args:
+    query: query with rows to iterate over, its own ordering is ignored.
+    id_column: unique column of the query rows.
+    chunk_size: max number of ids in a chunk.
+    after_id: only ids greater than this one are returned.
+  """
+  ids_query = query.with_entities(id_column).order_by(None).order_by(
+      id_column)
+  while True:
+    chunk_query = ids_query
+    if after_id is not None:
+      chunk_query = chunk_query.filter(id_column > after_id)
+    ids = [id_ for id_, in chunk_query.limit(chunk_size)]
+    if not ids:
+      return
+    yield ids
+    after_id = ids[-1]
+
+
+def generate_query_chunks(query, chunk_size=CHUNK_SIZE, id_column=None):
+  """Make a generator splitting `query` into chunks of size `chunk_size`.
+
+  Every chunk is a query for a consecutive range of ids ordered by id. The
+  ranges are found with iter_id_chunks instead of counting the query and
+  paging with offsets.
+
+  Args:
+    query: query to split.
+    chunk_size: max number of rows in a chunk.
+    id_column: unique column the chunks are ordered by, id of the first
+      entity of the query by default.
+  """
+  if id_column is None:
+    id_column = _get_id_column(query)
+  query = query.order_by(None).order_by(id_column)
+  after_id = None
+  for ids in iter_id_chunks(query, id_column, chunk_size):
+    range_filter = id_column <= ids[-1]
+    if after_id is not None:
+      range_filter = sqlalchemy.and_(id_column > after_id, range_filter)
+    yield query.filter(range_filter)
+    after_id = ids[-1]
+
+
+def get_id_partitions(query, id_column, partitions):
+  """Split id range of rows of `query` into equal partitions.
+
+  Returns:
+    list of (after_id, last_id) tuples, rows of a partition have ids
+    after_id < id <= last_id.
+  """
+  min_id, max_id = query.with_entities(
+      sqlalchemy.func.min(id_column), sqlalchemy.func.max(id_column),
+  ).order_by(None).one()
+  if min_id is None:
+    return []
+  size = (max_id - min_id) // partitions + 1
+  return [(start - 1, min(start + size - 1, max_id))
+          for start in range(min_id, max_id + 1, size)]
+
+
+def process_query_chunks(query, handler, chunk_size=CHUNK_SIZE,
+                         id_column=None, workers=1):
+  """Call `handler` for every chunk of `query`.
+
+  With more than one worker the id range of the query is partitioned between
+  worker threads. Every worker uses its own app context and DB session and
+  goes through the chunks of its partition in order.
+
+  Args:
+    query: query to split into chunks.
+    handler: function called with every chunk query.
+    chunk_size: max number of rows in a chunk.
+    id_column: unique column of the query rows, id of the first entity of
+      the query by default.
+    workers: number of worker threads.
+  """
+  if id_column is None:
+    id_column = _get_id_column(query)
+  if workers <= 1:
+    for query_chunk in generate_query_chunks(query, chunk_size, id_column):
+      handler(query_chunk)
+    return
+
+  # pylint: disable=cyclic-import
+  from multiprocessing.pool import ThreadPool
+  from ggrc import db
+  app = flask.current_app._get_current_object()  # noqa pylint: disable=protected-access
+
+  def process_partition(partition):
+    """Handle chunks of a partition inside the app context of a worker."""
+    after_id, last_id = partition
+    with app.app_context():
+      try:
+        partition_query = query.with_session(db.session()).filter(
+            id_column > after_id, id_column <= last_id)
+        for query_chunk in generate_query_chunks(partition_query,
+                                                 chunk_size, id_column):
+          handler(query_chunk)
+      finally:
+        db.session.remove()
+
+  partitions = get_id_partitions(query, id_column, workers)
+  pool = ThreadPool(min(workers, len(partitions)) or 1)
+  try:
+    pool.map(process_partition, partitions)
+  finally:
+    pool.close()
+    pool.join()
 
 
 def list_chunks(list_, chunk_size=CHUNK_SIZE):
@@ -5,19 +5,31 @@
 
 from logging import getLogger
 
+import sqlalchemy as sa
+
 from ggrc import db
+from ggrc.cache import data_version
 from ggrc.login import get_current_user_id
 from ggrc.models import all_models
+from ggrc.models.types import CompactJsonType
+from ggrc.utils import benchmark
+from ggrc.utils import generate_query_chunks
+from ggrc.utils import iter_id_chunks
 
 logger = getLogger(__name__)
 
+# Number of revisions converted to the compact format in one transaction.
+COMPACT_CHUNK_SIZE = 500
+# Number of objects whose latest revisions are found in one query.
+LATEST_CHUNK_SIZE = 1000
 
-def _get_new_objects():
-  """Returns list of new objects"""
-  result = db.session.execute("""
-      SELECT obj_id, obj_type, action FROM objects_without_revisions
-  """).fetchall()
-  return result
+
+OBJECTS_WITHOUT_REVISIONS = sa.sql.table(
+    "objects_without_revisions",
+    sa.sql.column("obj_id", sa.Integer),
+    sa.sql.column("obj_type", sa.String),
+    sa.sql.column("action", sa.String),
+)
 
 
 def _get_new_objects_count():
@@ -26,10 +38,22 @@ def _get_new_objects_count():
                             "FROM objects_without_revisions").scalar()
 
 
-def _get_chunks(objects, size):
-  """Yield sized chunks from objects."""
-  for i in xrange(0, len(objects), size):
-    yield objects[i:i + size]
+def _get_new_objects_chunks(chunk_size):
+  """Yield chunks of (obj_id, obj_type, action) rows of new objects.
+
+  Object ids are unique within a type, so new objects of every type are
+  paged by their ids.
+  """
+  table = OBJECTS_WITHOUT_REVISIONS
+  obj_types = [obj_type for obj_type, in db.session.query(
+      table.c.obj_type).distinct()]
+  for obj_type in obj_types:
+    query = db.session.query(
+        table.c.obj_id, table.c.obj_type, table.c.action,
+    ).filter(table.c.obj_type == obj_type)
+    for query_chunk in generate_query_chunks(query, chunk_size,
+                                             id_column=table.c.obj_id):
+      yield query_chunk.all()
 
 
 def build_revision_body(obj_id, obj_type, obj_content, event_id, action):
@@ -64,8 +88,7 @@ def do_missing_revisions():
   count = _get_new_objects_count()
   chunk_size = 100
   logger.info("Crating revision content...")
-  for index, chunk in enumerate(_get_chunks(_get_new_objects(),
-                                            chunk_size), 1):
+  for index, chunk in enumerate(_get_new_objects_chunks(chunk_size), 1):
     logger.info("Processing chunk %s of %s", index, count / chunk_size + 1)
     revisions = []
     for obj_id, obj_type, action in chunk:
@@ -100,6 +123,7 @@ def do_missing_revisions():
             obj_id, obj_type, obj_content, event.id, action
         ))
     db.session.execute(revisions_table.insert(), revisions)
+    data_version.mark_changed(db.session)
     db.session.commit()
   db.session.execute("truncate objects_without_revisions")
 
@@ -120,3 +144,70 @@ def get_last_revision_content(obj_type, obj_id):
   else:
     content = last_revision.content if last_revision else None
   return content
+
+
+def get_revisions_by_type(resource_type, chunk_size=LATEST_CHUNK_SIZE):
+  """Get ids of latest revisions of all objects of a type.
+
+  Objects are paged by their ids and latest revisions are found for every
+  page of objects separately.
+
+  Returns:
+    dict {object id: id of the latest revision of the object}.
+  """
+  model = getattr(all_models, resource_type)
+  revision = all_models.Revision
+  result = {}
+  for ids in iter_id_chunks(db.session.query(model.id), model.id, chunk_size):
+    result.update(db.session.query(
+        revision.resource_id,
+        sa.func.max(revision.id),
+    ).filter(
+        revision.resource_type == resource_type,
+        revision.resource_id.in_(ids),
+    ).group_by(revision.resource_id))
+  return result
+
+
+def compact_revision_contents(chunk_size=COMPACT_CHUNK_SIZE):
+  """Convert Json text content of revisions into the compact format.
+
+  Revisions are converted in chunks ordered by id, every chunk is locked and
+  committed in its own transaction, so the conversion can run while the
+  application is in use and can be restarted at any time.
+
+  Returns:
+    number of converted revisions.
+  """
+  table = all_models.Revision.__table__
+  last_id = 0
+  converted = 0
+  while True:
+    with benchmark("Compact chunk of revisions"):
+      rows = db.session.execute(
+          sa.select([
+              table.c.id,
+              sa.type_coerce(table.c.content, sa.UnicodeText),
+          ]).where(sa.and_(
+              table.c.id > last_id,
+              table.c.content.isnot(None),
+              table.c.content_compact.is_(None),
+          )).order_by(table.c.id).limit(chunk_size).with_for_update()
+      ).fetchall()
+      if not rows:
+        db.session.commit()
+        return converted
+      db.session.execute(
+          table.update().where(
+              table.c.id == sa.bindparam("_id")
+          ).values(
+              content_compact=sa.bindparam("_content",
+                                           type_=CompactJsonType),
+              content=None,
+          ),
+          [{"_id": id_, "_content": content} for id_, content in rows],
+      )
+      db.session.commit()
+    last_id = rows[-1][0]
+    converted += len(rows)
+    logger.info("Compacted %s revisions up to id %s", converted, last_id)
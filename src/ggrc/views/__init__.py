@@ -15,10 +15,14 @@ from werkzeug import exceptions
 
 from ggrc import fulltext, login, models, settings, utils as ggrc_utils, \
     extensions as ggrc_extensions, converters as ggrc_converters
+from ggrc.access_control import propagation_queue
 from ggrc.app import app, db
 from ggrc.builder import json as builder_json
+from ggrc.cache import resource_cache
 from ggrc.cache import utils as cache_utils
 from ggrc.fulltext import mixin
+from ggrc.fulltext import queue as fulltext_queue
+from ggrc.fulltext import reindex as fulltext_reindex
 from ggrc.integrations import integrations_errors, issues
 from ggrc.models import background_task, reflection, revision
 from ggrc.notifications import common
@@ -32,7 +36,6 @@ from ggrc.views import converters, cron, filters, notifications, registry, \
 
 
 logger = logging.getLogger(__name__)
-REINDEX_CHUNK_SIZE = 100
 
 
 # Needs to be secured as we are removing @login_required
@@ -52,6 +55,14 @@ def create_missing_revisions(_):
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/compact_revisions", methods=["POST"])
+@background_task.queued_task
+def compact_revisions(_):
+  """Web hook to convert revision content into the compact format."""
+  revisions.compact_revision_contents()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
 @app.route("/_background_tasks/reindex_snapshots", methods=["POST"])
 @background_task.queued_task
 def reindex_snapshots(_):
@@ -70,6 +81,22 @@ def reindex(_):
   return app.make_response(("success", 200, [("Content-Type", "text/html")]))
 
 
+@app.route("/_background_tasks/drain_fulltext_queue", methods=["POST"])
+@background_task.queued_task
+def drain_fulltext_queue(_):
+  """Web hook to index objects from the deferred fulltext index queue."""
+  fulltext_queue.drain()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
+@app.route("/_background_tasks/drain_acl_propagation_queue", methods=["POST"])
+@background_task.queued_task
+def drain_acl_propagation_queue(_):
+  """Web hook to propagate entries from the deferred ACL propagation queue."""
+  propagation_queue.drain()
+  return app.make_response(("success", 200, [("Content-Type", "text/html")]))
+
+
 @app.route("/_background_tasks/full_reindex", methods=["POST"])
 @background_task.queued_task
 def full_reindex(_):
@@ -242,29 +269,7 @@ def do_reindex(with_reindex_snapshots=False):
       m.__name__: m for m in models.all_models.all_models
       if issubclass(m, mixin.Indexed) and m.REQUIRED_GLOBAL_REINDEX
   }
-  people_query = db.session.query(
-      models.all_models.Person.id,
-      models.all_models.Person.name,
-      models.all_models.Person.email
-  )
-  indexer.cache["people_map"] = {p.id: (p.name, p.email) for p in people_query}
-  indexer.cache["ac_role_map"] = dict(db.session.query(
-      models.all_models.AccessControlRole.id,
-      models.all_models.AccessControlRole.name,
-  ))
-  for model_name in sorted(indexed_models.keys()):
-    logger.info("Updating index for: %s", model_name)
-    with benchmark("Create records for %s" % model_name):
-      model = indexed_models[model_name]
-      ids = [id_[0] for id_ in db.session.query(model.id)]
-      ids_count = len(ids)
-      handled_ids = 0
-      ids_chunks = ggrc_utils.list_chunks(ids, chunk_size=REINDEX_CHUNK_SIZE)
-      for ids_chunk in ids_chunks:
-        handled_ids += len(ids_chunk)
-        logger.info("%s: %s / %s", model.__name__, handled_ids, ids_count)
-        model.bulk_record_update_for(ids_chunk)
-        db.session.plain_commit()
+  fulltext_reindex.run(indexed_models.keys())
 
   if with_reindex_snapshots:
     logger.info("Updating index for: %s", "Snapshot")
@@ -290,7 +295,7 @@ class SetEncoder(json.JSONEncoder):
   def default(self, obj):  # pylint: disable=arguments-differ
     """If we get a set we first transform it to a list and then just use
        the default encoder"""
-    if isinstance(obj, set):
+    if isinstance(obj, collections.Set):
       return list(obj)
     return super(SetEncoder, self).default(obj)
 
@@ -585,6 +590,38 @@ def admin_full_reindex():
                          [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/drain_fulltext_queue", methods=["POST"])
+@login.login_required
+@login.admin_required
+def admin_drain_fulltext_queue():
+  """Calls a webhook that indexes objects from the fulltext index queue
+  """
+  task_queue = background_task.create_task(
+      name="drain_fulltext_queue",
+      url=flask.url_for(drain_fulltext_queue.__name__),
+      queued_callback=drain_fulltext_queue
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/drain_acl_propagation_queue", methods=["POST"])
+@login.login_required
+@login.admin_required
+def admin_drain_acl_propagation_queue():
+  """Calls a webhook that propagates entries from the ACL propagation queue
+  """
+  task_queue = background_task.create_task(
+      name="drain_acl_propagation_queue",
+      url=flask.url_for(drain_acl_propagation_queue.__name__),
+      queued_callback=drain_acl_propagation_queue
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                         [('Content-Type', 'text/html')])))
+
+
 @app.route("/admin/compute_attributes", methods=["POST"])
 @login.login_required
 @login.admin_required
@@ -634,6 +671,34 @@ def admin_create_missing_revisions():
                         [('Content-Type', 'text/html')])))
 
 
+@app.route("/admin/compact_revisions", methods=["POST"])
+@login.login_required
+@login.admin_required
+def admin_compact_revisions():
+  """Convert content of all revisions into the compact format"""
+  admins = getattr(settings, "BOOTSTRAP_ADMIN_USERS", [])
+  if login.get_current_user().email not in admins:
+    raise exceptions.Forbidden()
+
+  task_queue = background_task.create_task(
+      "compact_revisions",
+      flask.url_for(compact_revisions.__name__),
+      compact_revisions
+  )
+  return task_queue.make_response(
+      app.make_response(("scheduled %s" % task_queue.name, 200,
+                        [('Content-Type', 'text/html')])))
+
+
+@app.route("/admin/cache_stats")
+@login.login_required
+@login.admin_required
+def admin_cache_stats():
+  """Counters of the REST resource cache of this instance"""
+  return app.make_response((json.dumps(resource_cache.STATS.as_dict()), 200,
+                            [("Content-Type", "application/json")]))
+
+
 @app.route("/admin")
 @login.login_required
 @login.admin_required
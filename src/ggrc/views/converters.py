@@ -7,6 +7,7 @@ This module handles all view related function to import and export pages
 including the import/export api endponts.
 """
 
+import os
 import re
 
 from functools import wraps
@@ -19,6 +20,7 @@ from google.appengine.ext import deferred
 
 from flask import current_app
 from flask import request
+from flask import stream_with_context
 from flask import json
 from flask import render_template
 from flask import g
@@ -95,6 +97,16 @@ def export_file(export_to, filename, csv_string=None):
   raise BadRequest(app_errors.BAD_PARAMS)
 
 
+def stream_csv_file(csv_chunks):
+  """Make streamed csv file response from generator of csv chunks"""
+  headers = [
+      ("Content-Type", "text/csv"),
+      ("Content-Disposition", "attachment"),
+  ]
+  return current_app.response_class(stream_with_context(csv_chunks),
+                                    200, headers)
+
+
 def handle_export_request_error(handle_function):
   """Decorator for handle exceptions during exporting"""
   @wraps(handle_function)
@@ -161,14 +173,19 @@ def handle_export_csv_template_request():
   return export_file(export_to, filename, csv_string)
 
 
-def make_export(objects, exportable_objects=None):
-  """Make export"""
+def make_export_converter(objects, exportable_objects=None):
+  """Make export converter for the objects of export queries"""
   query_helper = QueryHelper(objects)
   ids_by_type = query_helper.get_ids()
-  converter = ExportConverter(
+  return ExportConverter(
       ids_by_type=ids_by_type,
       exportable_queries=exportable_objects
   )
+
+
+def make_export(objects, exportable_objects=None):
+  """Make export"""
+  converter = make_export_converter(objects, exportable_objects)
   csv_data = converter.export_csv_data()
   object_names = "_".join(converter.get_object_names())
   return csv_data, object_names
@@ -214,10 +231,11 @@ def make_response(data):
   return current_app.make_response((response_json, 200, headers))
 
 
-def make_import(csv_data, dry_run):
+def make_import(csv_data, dry_run, progress=None):
   """Make import"""
   try:
-    converter = ImportConverter(dry_run=dry_run, csv_data=csv_data)
+    converter = ImportConverter(dry_run=dry_run, csv_data=csv_data,
+                                progress=progress)
     converter.import_csv_data()
     return converter.get_info()
   except Exception as e:  # pylint: disable=broad-except
@@ -239,19 +257,22 @@ def check_for_previous_run():
 def run_export(objects, ie_id, user_id, url_root, exportable_objects):
   """Run export"""
   with app.app_context():
+    ie_job = None
     try:
       user = person.Person.query.get(user_id)
       setattr(g, '_current_user', user)
       ie = import_export.get(ie_id)
       check_for_previous_run()
 
-      content, _ = make_export(objects, exportable_objects)
-      db.session.refresh(ie)
-      if ie.status == "Stopped":
-        return
+      converter = make_export_converter(objects, exportable_objects)
+      with import_export.ContentSink(ie_id) as sink:
+        for csv_chunk in converter.iter_csv_data():
+          sink.write(csv_chunk)
+        sink.flush()
+        if sink.get_status() == "Stopped":
+          return
       ie.status = "Finished"
       ie.end_at = datetime.utcnow()
-      ie.content = content
       db.session.commit()
       job_emails.send_email(job_emails.EXPORT_COMPLETED, user.email, url_root,
                             ie.title, ie_id)
@@ -266,14 +287,41 @@ def run_export(objects, ie_id, user_id, url_root, exportable_objects):
         logger.exception("%s: %s", app_errors.STATUS_SET_FAILED, e.message)
 
 
+def _task_retry_count():
+  """Get number of previous attempts of the current task queue task."""
+  return int(os.environ.get("HTTP_X_APPENGINE_TASKRETRYCOUNT") or 0)
+
+
+def _should_retry_import(ie_job):
+  """Check if a failed import should be retried by the task queue.
+
+  Imports that failed in the commit phase after some rows were committed
+  are retried a limited number of times, they continue after the committed
+  rows.
+  """
+  if ie_job is None or _task_retry_count() >= settings.IMPORT_COMMIT_RETRIES:
+    return False
+  db.session.rollback()
+  if ie_job.status != "In Progress":
+    return False
+  return bool(import_export.ImportProgress.load(ie_job.id).blocks)
+
+
 def run_import_phases(ie_id, user_id, url_root):  # noqa: ignore=C901
   """Execute import phases"""
   with app.app_context():
+    ie_job = None
     try:
       user = person.Person.query.get(user_id)
       setattr(g, '_current_user', user)
       ie_job = import_export.get(ie_id)
-      check_for_previous_run()
+      progress = None
+      if settings.IMPORT_COMMIT_CHUNK_ROWS:
+        progress = import_export.ImportProgress.load(ie_id)
+      is_resumed = (ie_job.status == "In Progress" and
+                    progress is not None and progress.blocks)
+      if not is_resumed:
+        check_for_previous_run()
 
       csv_data = read_csv_file(StringIO(ie_job.content.encode("utf-8")))
 
@@ -303,7 +351,7 @@ def run_import_phases(ie_id, user_id, url_root):  # noqa: ignore=C901
         db.session.commit()
 
       if ie_job.status == "In Progress":
-        info = make_import(csv_data, False)
+        info = make_import(csv_data, False, progress)
         ie_job.results = json.dumps(info)
         for block_info in info:
           if block_info["block_errors"] or block_info["row_errors"]:
@@ -320,6 +368,8 @@ def run_import_phases(ie_id, user_id, url_root):  # noqa: ignore=C901
                               url_root, ie_job.title)
     except Exception as e:  # pylint: disable=broad-except
       logger.exception(e.message)
+      if _should_retry_import(ie_job):
+        raise
       try:
         ie_job.status = "Failed"
         ie_job.end_at = datetime.utcnow()
@@ -501,7 +551,12 @@ def handle_file_download(id2):
   try:
     export_to = request.args.get("export_to")
     ie = import_export.get(id2)
-    return export_file(export_to, ie.title, ie.content.encode("utf-8"))
+    if export_to == "csv":
+      return stream_csv_file(
+          chunk.encode("utf-8") for chunk in import_export.iter_content(ie.id)
+      )
+    content = u"".join(import_export.iter_content(ie.id))
+    return export_file(export_to, ie.title, content.encode("utf-8"))
   except (Forbidden, NotFound, Unauthorized):
     raise
   except Exception as e:
@@ -59,6 +59,11 @@ def half_hour_cron_endpoint():
   return job_runner("HALF_HOUR_CRON_JOBS")
 
 
+def minute_cron_endpoint():
+  """Endpoint running jobs from all modules that run every minute"""
+  return job_runner("MINUTE_CRON_JOBS")
+
+
 def init_cron_views(app):
   """Init all cron jobs' endpoints"""
   app.add_url_rule(
@@ -75,3 +80,8 @@ def init_cron_views(app):
       "/half_hour_cron_endpoint", "half_hour_cron_endpoint",
       view_func=half_hour_cron_endpoint
   )
+
+  app.add_url_rule(
+      "/minute_cron_endpoint", "minute_cron_endpoint",
+      view_func=minute_cron_endpoint
+  )
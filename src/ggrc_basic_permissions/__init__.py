@@ -20,15 +20,17 @@ from ggrc.login import is_external_app_user
 from ggrc.login import get_current_user
 from ggrc.models import all_models
 
+from ggrc.access_control import permissions_store
 from ggrc.access_control.roleable import Roleable
 from ggrc.models.audit import Audit
 from ggrc.models.program import Program
 from ggrc.rbac import permissions as rbac_permissions
 from ggrc.rbac.permissions_provider import DefaultUserPermissions
-from ggrc.cache import utils as cache_utils
+from ggrc.cache import backends as cache_backends
 from ggrc.services import signals
 from ggrc.services.registry import service
 from ggrc.utils import benchmark
+from ggrc.utils import structures
 from ggrc_basic_permissions.contributed_roles import BasicRoleDeclarations
 from ggrc_basic_permissions.converters.handlers import COLUMN_HANDLERS
 from ggrc_basic_permissions.models import Role
@@ -149,7 +151,7 @@ def query_memcache(key):
   Args:
       key (string): key of the stored permissions
   Returns:
-      cache (memcache_client): memcache client or None if caching
+      cache (cache client): cache backend client or None if caching
                                is not available
       permissions_cache (dict): dict with all permissions or None if there
                                 was a cache miss
@@ -157,7 +159,7 @@ def query_memcache(key):
   if not getattr(settings, 'MEMCACHE_MECHANISM', False):
     return None, None
 
-  cache = cache_utils.get_cache_manager().cache_object.memcache_client
+  cache = cache_backends.get_cache_client()
   cached_keys_set = cache.get('permissions:list') or set()
   if key not in cached_keys_set:
     # We set the permissions:list variable so that we are able to batch
@@ -359,8 +361,22 @@ def _get_acl_filter(acl_model):
   ]
 
 
+def load_materialized_access_control_list(user, permissions):
+  """Load permissions from the materialized ACL permissions of the user"""
+  acl_permissions = permissions_store.get_acl_permissions(user.id)
+  for action, resources in acl_permissions.iteritems():
+    for object_type, object_ids in resources.iteritems():
+      permissions.setdefault(action, {})\
+          .setdefault(object_type, {})\
+          .setdefault('resources', structures.IdSet())\
+          .update(object_ids)
+
+
 def load_access_control_list(user, permissions):
   """Load permissions from access_control_list"""
+  if getattr(flask.g, "referenced_object_stubs", None) is None:
+    load_materialized_access_control_list(user, permissions)
+    return
   acl_base = db.aliased(all_models.AccessControlList, name="acl_base")
   acl_propagated = db.aliased(all_models.AccessControlList,
                               name="acl_propagated")
@@ -390,7 +406,7 @@ def load_access_control_list(user, permissions):
         continue
       permissions.setdefault(action, {})\
           .setdefault(object_type, {})\
-          .setdefault('resources', set())\
+          .setdefault('resources', structures.IdSet())\
           .add(object_id)
 
 
@@ -0,0 +1,96 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for materialized ACL permissions."""
+
+from ggrc import db
+from ggrc.access_control import permissions_store
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestPermissionsStore(TestCase):
+  """Tests for incremental maintenance of materialized permissions."""
+
+  def setUp(self):
+    super(TestPermissionsStore, self).setUp()
+    self.person = factories.PersonFactory()
+    self.program = factories.ProgramFactory()
+    factories.AccessControlPersonFactory(
+        ac_list=self.program.acr_name_acl_map["Program Managers"],
+        person=self.person,
+    )
+    self.person_id = self.person.id
+    self.program_id = self.program.id
+
+  def _stored_row(self):
+    return permissions_store.PersonAclPermissions.query.get(self.person_id)
+
+  def test_build(self):
+    """Permissions are materialized on first load."""
+    permissions = permissions_store.get_acl_permissions(self.person_id)
+    self.assertIn(self.program_id, permissions["read"]["Program"])
+    self.assertIsNotNone(self._stored_row().content)
+
+  def test_merge_propagated(self):
+    """Propagated entries are merged without rebuilding permissions."""
+    permissions_store.get_acl_permissions(self.person_id)
+    control = factories.ControlFactory()
+    control_id = control.id
+
+    factories.RelationshipFactory(source=self.program, destination=control)
+
+    row = self._stored_row()
+    self.assertIsNotNone(row.content)
+    self.assertNotEqual(row.version, 0)
+    permissions = permissions_store.get_acl_permissions(self.person_id)
+    self.assertIn(control_id, permissions["read"]["Control"])
+
+  def test_invalidate_removed_person(self):
+    """Removing a person from an ACL drops only their permissions."""
+    other = factories.PersonFactory()
+    other_id = other.id
+    control = factories.ControlFactory()
+    factories.AccessControlPersonFactory(
+        ac_list=control.acr_name_acl_map["Admin"],
+        person=other,
+    )
+    permissions_store.get_acl_permissions(self.person_id)
+    permissions_store.get_acl_permissions(other_id)
+
+    acl = self.program.acr_name_acl_map["Program Managers"]
+    acl.remove_person(self.person)
+    db.session.commit()
+
+    self.assertIsNone(self._stored_row().content)
+    self.assertIsNotNone(
+        permissions_store.PersonAclPermissions.query.get(other_id).content
+    )
+    permissions = permissions_store.get_acl_permissions(self.person_id)
+    self.assertNotIn("Program", permissions.get("read", {}))
+
+  def test_merge_bumps_empty_rows(self):
+    """Merge bumps version of rows without materialized permissions."""
+    permissions_store.get_acl_permissions(self.person_id)
+    permissions_store.invalidate([self.person_id])
+    version = self._stored_row().version
+    control = factories.ControlFactory()
+
+    factories.RelationshipFactory(source=self.program, destination=control)
+
+    row = self._stored_row()
+    self.assertIsNone(row.content)
+    self.assertGreater(row.version, version)
+
+  def test_pending_changes_not_stored(self):
+    """Permissions with uncommitted ACL changes are not stored."""
+    control = factories.ControlFactory()
+    control_id = control.id
+    permissions_store.invalidate([self.person_id])
+    acl = control.acr_name_acl_map["Admin"]
+    acl.add_person(self.person)
+
+    permissions = permissions_store.get_acl_permissions(self.person_id)
+
+    self.assertIn(self.program_id, permissions["read"]["Program"])
+    self.assertIsNone(self._stored_row().content)
@@ -0,0 +1,77 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for prefetch of exported column data."""
+
+from ggrc.utils import QueryCounter
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestExportPrefetch(TestCase):
+  """Tests for number of queries of export."""
+
+  def setUp(self):
+    super(TestExportPrefetch, self).setUp()
+    self.client.get("/login")
+    self.headers = {
+        "Content-Type": "application/json",
+        "X-Requested-By": "GGRC",
+        "X-export-view": "blocks",
+    }
+    with factories.single_commit():
+      self.cad_id = factories.CustomAttributeDefinitionFactory(
+          title="person cad",
+          definition_type="control",
+          attribute_type="Map:Person",
+      ).id
+
+  def _create_controls(self, count):
+    """Create controls that refer to different people."""
+    with factories.single_commit():
+      for _ in range(count):
+        person = factories.PersonFactory()
+        control = factories.ControlFactory(modified_by=person)
+        factories.CustomAttributeValueFactory(
+            custom_attribute_id=self.cad_id,
+            attributable=control,
+            attribute_value="Person",
+            attribute_object_id=person.id,
+        )
+
+  def _export_query_count(self):
+    """Export all controls and return number of executed queries."""
+    data = [{
+        "object_name": "Control",
+        "fields": "all",
+        "filters": {"expression": {}},
+    }]
+    self.assert200(self.export_csv(data))
+    with QueryCounter() as counter:
+      response = self.export_csv(data)
+      self.assert200(response)
+      return counter.get
+
+  def test_query_count(self):
+    """Number of export queries does not depend on number of rows."""
+    self._create_controls(1)
+    single_count = self._export_query_count()
+
+    self._create_controls(4)
+    chunk_count = self._export_query_count()
+
+    self.assertEqual(single_count, chunk_count)
+
+  def test_exported_values(self):
+    """Prefetched values are exported."""
+    self._create_controls(3)
+    data = [{
+        "object_name": "Control",
+        "fields": "all",
+        "filters": {"expression": {}},
+    }]
+    rows = self.export_parsed_csv(data)["Control"]
+    self.assertEqual(len(rows), 3)
+    for row in rows:
+      self.assertTrue(row["Last Updated By"])
+      self.assertEqual(row["Last Updated By"], row["person cad"])
@@ -0,0 +1,83 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for streamed csv export."""
+
+from datetime import datetime
+
+import mock
+
+from ggrc.converters.base import ExportConverter
+from ggrc.models import import_export
+from ggrc.views import converters
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestExportStreaming(TestCase):
+  """Tests for export of csv in chunks."""
+
+  def setUp(self):
+    super(TestExportStreaming, self).setUp()
+    self.client.get("/login")
+    self.headers = {
+        "Content-Type": "application/json",
+        "X-Requested-By": "GGRC",
+        "X-export-view": "blocks",
+    }
+    with factories.single_commit():
+      for i in range(5):
+        factories.ControlFactory(title="Streamed control {}".format(i))
+    self.objects = [{"object_name": "Control", "fields": "all",
+                     "filters": {"expression": {}}}]
+
+  def test_chunks(self):
+    """Chunks of streamed export make the same csv as a single string."""
+    csv_string, _ = converters.make_export(self.objects)
+    with mock.patch.object(ExportConverter, "CSV_CHUNK_ROWS", 2):
+      converter = converters.make_export_converter(self.objects)
+      chunks = list(converter.iter_csv_data())
+
+    self.assertEqual(len(chunks), 3)
+    self.assertEqual("".join(chunks), csv_string)
+
+  def test_streamed_response(self):
+    """Export to csv returns rows of all objects."""
+    response = self.export_csv(self.objects)
+
+    self.assert200(response)
+    for i in range(5):
+      self.assertIn("Streamed control {}".format(i), response.data)
+
+  def _create_export_job(self):
+    return factories.ImportExportFactory(
+        job_type="Export",
+        status="In Progress",
+        created_by=factories.PersonFactory(),
+        created_at=datetime.now(),
+    ).id
+
+  def test_content_sink(self):
+    """Content sink stores chunks of export as content of the job."""
+    ie_id = self._create_export_job()
+    csv_string, _ = converters.make_export(self.objects)
+    with import_export.ContentSink(ie_id, chunk_size=10) as sink:
+      for csv_chunk in converters.make_export_converter(
+          self.objects).iter_csv_data():
+        sink.write(csv_chunk)
+
+    content = u"".join(import_export.iter_content(ie_id))
+    self.assertEqual(content.encode("utf-8"), csv_string)
+    self.assertGreater(import_export.ImportExportContentChunk.query.filter_by(
+        import_export_id=ie_id).count(), 1)
+
+  def test_content_sink_error(self):
+    """Partial content is removed if export fails."""
+    ie_id = self._create_export_job()
+    with self.assertRaises(ValueError):
+      with import_export.ContentSink(ie_id, chunk_size=1) as sink:
+        sink.write(u"partial")
+        raise ValueError()
+
+    self.assertEqual(import_export.ImportExportContentChunk.query.filter_by(
+        import_export_id=ie_id).count(), 0)
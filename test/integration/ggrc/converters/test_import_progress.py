@@ -0,0 +1,135 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for chunked import with resumable progress."""
+
+import json
+from datetime import datetime
+
+import mock
+
+from ggrc import db
+from ggrc.access_control import propagation_queue
+from ggrc.fulltext import mysql
+from ggrc.fulltext import queue as fulltext_queue
+from ggrc.models import all_models
+from ggrc.models import import_export
+from ggrc.views import converters
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@mock.patch("ggrc.settings.IMPORT_COMMIT_CHUNK_ROWS", 2)
+@mock.patch("ggrc.notifications.job_emails.send_email")
+@mock.patch("ggrc.views.converters.check_for_previous_run")
+class TestImportProgress(TestCase):
+  """Tests for progress of chunked import."""
+
+  def setUp(self):
+    super(TestImportProgress, self).setUp()
+    self.client.get("/login")
+    self.user = factories.PersonFactory()
+    lines = [u"Object type,,", u"Program,Code*,Title"]
+    lines.extend(u",PROGRAM-{0},Chunked program {0}".format(i)
+                 for i in range(5))
+    with factories.single_commit():
+      self.ie_id = factories.ImportExportFactory(
+          job_type="Import",
+          status="In Progress",
+          created_by=self.user,
+          created_at=datetime.now(),
+          content=u"\n".join(lines) + u"\n",
+      ).id
+
+  def _run_import(self):
+    """Run commit phase of the import job and return its block info."""
+    converters.run_import_phases(self.ie_id, self.user.id,
+                                 "http://localhost/")
+    ie_job = all_models.ImportExport.query.get(self.ie_id)
+    self.assertEqual(ie_job.status, "Finished")
+    return json.loads(ie_job.results)[0]
+
+  def test_progress_stored(self, check_for_previous_run, _):
+    """Progress of the chunks and of the final commit is stored on the job."""
+    info = self._run_import()
+
+    check_for_previous_run.assert_called_once_with()
+    progress = import_export.ImportProgress.load(self.ie_id)
+    self.assertEqual(progress.get(0)["rows"], 5)
+    self.assertEqual(progress.get(0)["info"]["created"], 5)
+    self.assertEqual(info["created"], 5)
+    self.assertIn("rows_per_second", info)
+    self.assertEqual(all_models.Program.query.count(), 5)
+
+  def test_resume(self, check_for_previous_run, _):
+    """Retried import continues after the committed rows."""
+    info = {
+        "rows": 3,
+        "created": 3,
+        "updated": 0,
+        "ignored": 0,
+        "deleted": 0,
+        "deprecated": 0,
+        "row_errors": [],
+        "row_warnings": [],
+    }
+    all_models.ImportExport.query.filter_by(id=self.ie_id).update({
+        "progress": json.dumps({"0": {"rows": 3, "info": info}}),
+    })
+    db.session.commit()
+    factories.ProgramFactory(slug="PROGRAM-2", title="Chunked program 2")
+
+    info = self._run_import()
+
+    check_for_previous_run.assert_not_called()
+    self.assertEqual(info["rows"], 5)
+    self.assertEqual(info["created"], 5)
+    self.assertEqual(
+        sorted(slug for slug, in all_models.Program.query.with_entities(
+            all_models.Program.slug)),
+        ["PROGRAM-2", "PROGRAM-3", "PROGRAM-4"],
+    )
+
+  def _store_progress(self):
+    """Store progress of committed rows of the job."""
+    all_models.ImportExport.query.filter_by(id=self.ie_id).update({
+        "progress": json.dumps({"0": {"rows": 2, "info": {"rows": 2}}}),
+    })
+    db.session.commit()
+
+  @mock.patch("ggrc.views.converters.make_import",
+              side_effect=ValueError("commit failed"))
+  def test_retry_with_progress(self, *_):
+    """Import that failed after committing rows is retried."""
+    self._store_progress()
+
+    with self.assertRaises(ValueError):
+      converters.run_import_phases(self.ie_id, self.user.id,
+                                   "http://localhost/")
+
+    ie_job = all_models.ImportExport.query.get(self.ie_id)
+    self.assertEqual(ie_job.status, "In Progress")
+
+  @mock.patch.dict("os.environ", {"HTTP_X_APPENGINE_TASKRETRYCOUNT": "3"})
+  @mock.patch("ggrc.settings.IMPORT_COMMIT_RETRIES", 3)
+  @mock.patch("ggrc.views.converters.make_import",
+              side_effect=ValueError("commit failed"))
+  def test_retries_exhausted(self, *_):
+    """Import fails once its retries are exhausted."""
+    self._store_progress()
+
+    converters.run_import_phases(self.ie_id, self.user.id,
+                                 "http://localhost/")
+
+    ie_job = all_models.ImportExport.query.get(self.ie_id)
+    self.assertEqual(ie_job.status, "Failed")
+
+  def test_hooks_queued_with_rows(self, *_):
+    """Reindex and propagation of imported rows are queued and drained."""
+    self._run_import()
+
+    self.assertEqual(fulltext_queue.FulltextIndexQueue.query.count(), 0)
+    self.assertEqual(propagation_queue.AclPropagationQueue.query.count(), 0)
+    program = all_models.Program.query.filter_by(slug="PROGRAM-4").one()
+    self.assertTrue(mysql.MysqlRecordProperty.query.filter_by(
+        type="Program", key=program.id).count())
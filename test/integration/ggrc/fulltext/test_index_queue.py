@@ -0,0 +1,132 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for deferred fulltext indexing queue."""
+
+import datetime
+
+import mock
+
+from ggrc import db
+from ggrc import fulltext
+from ggrc import settings
+from ggrc.fulltext import mysql
+from ggrc.fulltext import queue
+from ggrc.models import all_models
+from integration.ggrc import Api
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from integration.ggrc.query_helper import WithQueryApi
+
+
+@mock.patch("ggrc.settings.FULLTEXT_DEFERRED_INDEXING", True)
+class TestIndexQueue(WithQueryApi, TestCase):
+  """Tests for deferred fulltext indexing."""
+
+  def setUp(self):
+    super(TestIndexQueue, self).setUp()
+    self.api = Api()
+    self.client.get("/login")
+
+  @staticmethod
+  def _title_records(control_id):
+    """Query for indexed title of the control."""
+    return fulltext.get_indexer().record_type.query.filter(
+        mysql.MysqlRecordProperty.type == "Control",
+        mysql.MysqlRecordProperty.key == control_id,
+        mysql.MysqlRecordProperty.property == "title",
+    )
+
+  def test_commit_enqueues(self):
+    """Committed objects are queued instead of being indexed."""
+    with factories.single_commit():
+      control_id = factories.ControlFactory(title="queued control").id
+
+    self.assertEqual(self._title_records(control_id).count(), 0)
+    self.assertEqual(queue.FulltextIndexQueue.query.filter_by(
+        object_type="Control", object_id=control_id).count(), 1)
+
+    stats = queue.drain()
+
+    self.assertEqual(stats["queued"], 1)
+    self.assertEqual(self._title_records(control_id).one().content,
+                     "queued control")
+    self.assertEqual(queue.FulltextIndexQueue.query.count(), 0)
+
+  def test_read_your_writes(self):
+    """Query API text search sees queued edits of the current user."""
+    response = self.api.post(all_models.Control, {
+        "control": {
+            "title": "fresh edit",
+            "context": None,
+        },
+    })
+    self.assertEqual(response.status_code, 201)
+    self.assertNotEqual(queue.FulltextIndexQueue.query.count(), 0)
+
+    controls = self._get_first_result_set(
+        self._make_query_dict("Control",
+                              expression=["title", "~", "fresh edit"]),
+        "Control",
+    )
+    self.assertEqual(controls["count"], 1)
+    self.assertEqual(queue.FulltextIndexQueue.query.count(), 0)
+
+  def test_read_skips_other_users(self):
+    """Query API reads do not drain entries queued by other users."""
+    with factories.single_commit():
+      control_id = factories.ControlFactory(title="other edit").id
+    queue.FulltextIndexQueue.query.update({"modified_by_id": None})
+    db.session.commit()
+
+    self._get_first_result_set(
+        self._make_query_dict("Control",
+                              expression=["title", "~", "other edit"]),
+        "Control",
+    )
+
+    self.assertEqual(queue.FulltextIndexQueue.query.filter_by(
+        object_type="Control", object_id=control_id).count(), 1)
+
+  def test_read_drains_stale_entries(self):
+    """Query API reads drain entries older than the staleness limit."""
+    with factories.single_commit():
+      control_id = factories.ControlFactory(title="stale edit").id
+    queue.FulltextIndexQueue.query.update({
+        "modified_by_id": None,
+        "created_at": datetime.datetime.utcnow() - datetime.timedelta(
+            seconds=settings.FULLTEXT_INDEX_MAX_STALENESS + 1),
+    })
+    db.session.commit()
+
+    controls = self._get_first_result_set(
+        self._make_query_dict("Control",
+                              expression=["title", "~", "stale edit"]),
+        "Control",
+    )
+
+    self.assertEqual(controls["count"], 1)
+    self.assertEqual(queue.FulltextIndexQueue.query.filter_by(
+        object_type="Control", object_id=control_id).count(), 0)
+
+  def test_read_reindexes_claimed_entries(self):
+    """Query API reads reindex own entries claimed by another worker."""
+    response = self.api.post(all_models.Control, {
+        "control": {
+            "title": "claimed edit",
+            "context": None,
+        },
+    })
+    self.assertEqual(response.status_code, 201)
+    queued = queue.FulltextIndexQueue.query.count()
+    queue.FulltextIndexQueue.claim(
+        db.session.query(queue.FulltextIndexQueue.id), 1000)
+
+    controls = self._get_first_result_set(
+        self._make_query_dict("Control",
+                              expression=["title", "~", "claimed edit"]),
+        "Control",
+    )
+
+    self.assertEqual(controls["count"], 1)
+    self.assertEqual(queue.FulltextIndexQueue.query.count(), queued)
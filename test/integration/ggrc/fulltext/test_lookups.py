@@ -0,0 +1,101 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for fulltext record builder lookups."""
+
+from ggrc import db
+from ggrc import fulltext
+from ggrc.fulltext import mysql
+from ggrc.models import all_models
+from ggrc.utils import QueryCounter
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestIndexerLookups(TestCase):
+  """Tests for indexing with preloaded lookups."""
+
+  def setUp(self):
+    super(TestIndexerLookups, self).setUp()
+    self.indexer = fulltext.get_indexer()
+    self.indexer.invalidate_cache()
+    with factories.single_commit():
+      self.text_cad = factories.CustomAttributeDefinitionFactory(
+          title="text cad",
+          definition_type="assessment",
+      )
+      self.person_cad = factories.CustomAttributeDefinitionFactory(
+          title="person cad",
+          definition_type="assessment",
+          attribute_type="Map:Person",
+      )
+      self.label = factories.LabelFactory(name="chunk label")
+    self.text_cad_id = self.text_cad.id
+    self.person_cad_id = self.person_cad.id
+    self.label_id = self.label.id
+
+  def tearDown(self):
+    self.indexer.invalidate_cache()
+    super(TestIndexerLookups, self).tearDown()
+
+  def _create_assessments(self, count):
+    """Create assessments with custom attribute values and labels."""
+    with factories.single_commit():
+      person = factories.PersonFactory(email="cad@example.com")
+      ids = []
+      for _ in range(count):
+        assessment = factories.AssessmentFactory()
+        factories.CustomAttributeValueFactory(
+            custom_attribute_id=self.text_cad_id,
+            attributable=assessment,
+            attribute_value="text value",
+        )
+        factories.CustomAttributeValueFactory(
+            custom_attribute_id=self.person_cad_id,
+            attributable=assessment,
+            attribute_value="Person",
+            attribute_object_id=person.id,
+        )
+        factories.ObjectLabelFactory(label_id=self.label_id,
+                                     labeled_object=assessment)
+        ids.append(assessment.id)
+    db.session.expire_all()
+    return ids
+
+  def _records(self, assessment_id):
+    return {
+        (record.property, record.subproperty): record.content
+        for record in mysql.MysqlRecordProperty.query.filter(
+            mysql.MysqlRecordProperty.type == "Assessment",
+            mysql.MysqlRecordProperty.key == assessment_id,
+        )
+    }
+
+  def test_chunk_records(self):
+    """Records built from lookups contain CAs, people and labels."""
+    assessment_id = self._create_assessments(1)[0]
+    person_id = all_models.Person.query.filter_by(
+        email="cad@example.com").one().id
+
+    all_models.Assessment.bulk_record_update_for([assessment_id])
+
+    records = self._records(assessment_id)
+    self.assertEqual(records[("text cad", "")], "text value")
+    self.assertEqual(records[("person cad", "{}-email".format(person_id))],
+                     "cad@example.com")
+    self.assertEqual(records[("label", "{}-name".format(self.label_id))],
+                     "chunk label")
+
+  def test_warm_lookups(self):
+    """Number of queries does not depend on chunk size with warm lookups."""
+    ids = self._create_assessments(5)
+    self.indexer.cache.warm_up()
+
+    with QueryCounter() as counter:
+      all_models.Assessment.bulk_record_update_for(ids[:1])
+      single_count = counter.get
+    with QueryCounter() as counter:
+      all_models.Assessment.bulk_record_update_for(ids)
+      chunk_count = counter.get
+
+    self.assertEqual(single_count, chunk_count)
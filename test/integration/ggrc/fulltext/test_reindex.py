@@ -41,3 +41,33 @@ class TestReindex(TestCase):
 
     # Check that all Assessment.archived were properly reindexed
     self.assertEqual(archived_index.count(), obj_count)
+
+  def test_diff_reindex(self):
+    """Test that reindex touches only changed records."""
+    with factories.single_commit():
+      control = factories.ControlFactory(title="old title")
+      control_id = control.id
+    indexer = fulltext.get_indexer()
+    records = indexer.record_type.query.filter(
+        mysql.MysqlRecordProperty.type == "Control",
+        mysql.MysqlRecordProperty.key == control_id,
+    )
+    records_before = {(r.property, r.subproperty): r.content for r in records}
+
+    control = control.__class__.query.get(control_id)
+    control.title = "new title"
+    stats = control.__class__.bulk_record_diff_update_for([control_id])
+
+    self.assertEqual(stats["inserted"], 0)
+    self.assertEqual(stats["updated"], 1)
+    self.assertEqual(stats["deleted"], 0)
+    records_after = {(r.property, r.subproperty): r.content for r in records}
+    records_before[("title", "")] = "new title"
+    self.assertEqual(records_after, records_before)
+
+  def test_diff_reindex_unchanged(self):
+    """Test that reindex of unchanged object does not touch records."""
+    with factories.single_commit():
+      control = factories.ControlFactory()
+    stats = control.__class__.bulk_record_diff_update_for([control.id])
+    self.assertEqual(sum(stats.values()), 0)
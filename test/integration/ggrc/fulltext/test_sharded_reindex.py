@@ -0,0 +1,92 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for sharded and resumable full reindex."""
+
+import datetime
+
+from ggrc import db
+from ggrc import fulltext
+from ggrc.fulltext import mysql
+from ggrc.fulltext import reindex
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestShardedReindex(TestCase):
+  """Tests for fulltext reindex checkpoints."""
+
+  @staticmethod
+  def _indexed_ids():
+    """Ids of controls that have indexed title."""
+    return {key for key, in db.session.query(
+        mysql.MysqlRecordProperty.key
+    ).filter(
+        mysql.MysqlRecordProperty.type == "Control",
+        mysql.MysqlRecordProperty.property == "title",
+    )}
+
+  def setUp(self):
+    super(TestShardedReindex, self).setUp()
+    with factories.single_commit():
+      self.control_ids = sorted(
+          factories.ControlFactory().id for _ in range(5)
+      )
+    fulltext.get_indexer().record_type.query.delete()
+    db.session.commit()
+
+  def test_full_run(self):
+    """Reindex indexes every object and removes checkpoints."""
+    reindex.run(["Control"], processes=1)
+    self.assertEqual(self._indexed_ids(), set(self.control_ids))
+    self.assertEqual(reindex.ReindexCheckpoint.query.count(), 0)
+
+  def test_resume(self):
+    """Interrupted reindex continues from the stored checkpoint."""
+    db.session.add(reindex.ReindexCheckpoint(
+        model_name="Control",
+        start_id=self.control_ids[0],
+        end_id=self.control_ids[-1],
+        last_id=self.control_ids[1],
+        done=False,
+        updated_at=datetime.datetime.utcnow(),
+    ))
+    db.session.commit()
+
+    reindex.run(["Control"], processes=1)
+
+    self.assertEqual(self._indexed_ids(), set(self.control_ids[2:]))
+    self.assertEqual(reindex.ReindexCheckpoint.query.count(), 0)
+
+  def test_resume_other_models(self):
+    """Checkpoints of other models are neither resumed nor removed."""
+    db.session.add(reindex.ReindexCheckpoint(
+        model_name="Program",
+        start_id=1,
+        end_id=1,
+        last_id=0,
+        done=False,
+        updated_at=datetime.datetime.utcnow(),
+    ))
+    db.session.commit()
+
+    reindex.run(["Control"], processes=1)
+
+    self.assertEqual(self._indexed_ids(), set(self.control_ids))
+    self.assertEqual(
+        [checkpoint.model_name
+         for checkpoint in reindex.ReindexCheckpoint.query],
+        ["Program"],
+    )
+
+  def test_concurrent_run(self):
+    """Reindex does nothing while another run holds the lock."""
+    with reindex._run_lock() as acquired:  # pylint: disable=protected-access
+      self.assertTrue(acquired)
+      with db.engine.connect() as connection:
+        self.assertFalse(connection.execute(
+            "SELECT IS_FREE_LOCK(%s)", reindex.RUN_LOCK_NAME
+        ).scalar())
+      reindex.run(["Control"], processes=1)
+
+    self.assertEqual(self._indexed_ids(), set())
@@ -197,6 +197,26 @@ class TestPropagation(BaseTestPropagation):
     # one for PR, PE, PM
     self.assertEqual(len(assessment_acls), 3)
 
+  def test_propagated_count(self):
+    """Test that deep propagation reports the number of inserted entries."""
+    with factories.single_commit():
+      audit = factories.AuditFactory()
+      assessment = factories.AssessmentFactory(audit=audit)
+      factories.RelationshipFactory(source=audit.program, destination=audit)
+      factories.RelationshipFactory(source=audit, destination=assessment)
+
+    acl_ids = [acl.id for acl in audit.program._access_control_list]
+    acl_count = all_models.AccessControlList.query.count()
+
+    propagated = propagation._propagate(acl_ids, self.user_id)
+
+    self.assertGreater(propagated, 0)
+    self.assertEqual(
+        propagated,
+        all_models.AccessControlList.query.count() - acl_count,
+    )
+    self.assertEqual(propagation._propagate(acl_ids, self.user_id), 0)
+
   def test_relationship_single_layer(self):
     """Test single layer propagation through relationships.
 
@@ -0,0 +1,97 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for deferred ACL propagation queue."""
+
+import mock
+
+from ggrc import db
+from ggrc.access_control import propagation_queue as queue
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+@mock.patch("ggrc.settings.ACL_DEFERRED_PROPAGATION", True)
+class TestPropagationQueue(TestCase):
+  """Tests for deferred ACL propagation."""
+
+  def setUp(self):
+    super(TestPropagationQueue, self).setUp()
+    with factories.single_commit():
+      audit = factories.AuditFactory()
+      factories.RelationshipFactory(source=audit, destination=audit.program)
+    self.acl_count = all_models.AccessControlList.query.count()
+
+  @staticmethod
+  def _propagated_count():
+    return all_models.AccessControlList.query.filter(
+        all_models.AccessControlList.parent_id.isnot(None)
+    ).count()
+
+  def test_commit_enqueues(self):
+    """Committed ACL entries are queued instead of being propagated."""
+    self.assertEqual(self._propagated_count(), 0)
+    self.assertNotEqual(queue.AclPropagationQueue.query.count(), 0)
+
+    stats = queue.drain()
+
+    self.assertEqual(stats["propagated"], self._propagated_count())
+    self.assertEqual(all_models.AccessControlList.query.count(),
+                     self.acl_count + stats["propagated"])
+    self.assertEqual(queue.AclPropagationQueue.query.count(), 0)
+
+  def test_request_propagates_user_entries(self):
+    """Requests propagate queued entries that affect the current user."""
+    self.client.get("/login")
+    user = all_models.Person.query.filter_by(email="user@example.com").one()
+    audit = all_models.Audit.query.one()
+    factories.AccessControlPersonFactory(
+        ac_list=audit.acr_name_acl_map["Audit Captains"],
+        person=user,
+    )
+
+    self.assert200(self.client.get("/api/audits"))
+
+    self.assertNotEqual(self._propagated_count(), 0)
+    self.assertEqual(queue.AclPropagationQueue.query.filter(
+        queue.AclPropagationQueue.object_type == "Relationship"
+    ).count(), 0)
+
+  def test_request_skips_other_entries(self):
+    """Requests do not propagate entries unrelated to the current user."""
+    queued = queue.AclPropagationQueue.query.count()
+    self.client.get("/login")
+
+    self.assert200(self.client.get("/api/audits"))
+
+    self.assertEqual(queue.AclPropagationQueue.query.count(), queued)
+
+  def test_claimed_entries_skipped(self):
+    """Entries claimed by another worker are not propagated again."""
+    token = queue.AclPropagationQueue.claim(
+        db.session.query(queue.AclPropagationQueue.id), 1000)
+
+    stats = queue.drain()
+
+    self.assertEqual(stats["queued"], 0)
+    queue.AclPropagationQueue.release(token)
+    self.assertNotEqual(queue.drain()["queued"], 0)
+
+  def test_request_propagates_claimed_entries(self):
+    """Requests propagate user entries claimed by another worker."""
+    self.client.get("/login")
+    user = all_models.Person.query.filter_by(email="user@example.com").one()
+    audit = all_models.Audit.query.one()
+    factories.AccessControlPersonFactory(
+        ac_list=audit.acr_name_acl_map["Audit Captains"],
+        person=user,
+    )
+    queued = queue.AclPropagationQueue.query.count()
+    queue.AclPropagationQueue.claim(
+        db.session.query(queue.AclPropagationQueue.id), 1000)
+
+    self.assert200(self.client.get("/api/audits"))
+
+    self.assertNotEqual(self._propagated_count(), 0)
+    self.assertEqual(queue.AclPropagationQueue.query.count(), queued)
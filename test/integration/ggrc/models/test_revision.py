@@ -12,6 +12,8 @@ from integration.ggrc import TestCase
 
 from integration.ggrc.models import factories
 from integration.ggrc import api_helper
+from ggrc.utils import QueryCounter
+from ggrc.utils import revisions as revisions_utils
 
 
 def _get_revisions(obj, field="resource"):
@@ -337,3 +339,93 @@ class TestRevisions(TestCase):
     content = revisions[0].content
     self.assertEqual(
         content["custom_attribute_values"][0]["attribute_value"], "0")
+
+
+class TestCompactRevisions(TestCase):
+  """Tests for compact storage of revision content."""
+  # pylint: disable=protected-access
+
+  def _get_program_revision(self):
+    program = factories.ProgramFactory(title="compact program")
+    return all_models.Revision.query.filter_by(
+        resource_type="Program", resource_id=program.id,
+    ).one()
+
+  @mock.patch("ggrc.settings.REVISION_CONTENT_COMPACT", True)
+  def test_compact_storage(self):
+    """Content of new revisions is stored in the compact format."""
+    revision_id = self._get_program_revision().id
+    ggrc.db.session.expunge_all()
+
+    revision = all_models.Revision.query.get(revision_id)
+    self.assertIsNone(revision._content_text)
+    self.assertEqual(revision.content["title"], "compact program")
+    content, = ggrc.db.session.query(
+        all_models.Revision.content_keys("title", "missing"),
+    ).filter(all_models.Revision.id == revision_id).one()
+    self.assertEqual(content, {"title": "compact program"})
+
+  def test_compact_existing(self):
+    """Json text content of existing revisions is compacted."""
+    revision = self._get_program_revision()
+    revision_id = revision.id
+    content = revision.content
+    self.assertIsNotNone(revision._content_text)
+
+    self.assertEqual(revisions_utils.compact_revision_contents(chunk_size=1),
+                     all_models.Revision.query.count())
+    ggrc.db.session.expunge_all()
+
+    revision = all_models.Revision.query.get(revision_id)
+    self.assertIsNone(revision._content_text)
+    self.assertIsNotNone(revision._content_compact)
+    self.assertEqual(revision.content, content)
+    self.assertEqual(revisions_utils.compact_revision_contents(), 0)
+
+
+class TestRevisionContentPopulation(TestCase):
+  """Tests for batch population of revision content."""
+
+  def setUp(self):
+    super(TestRevisionContentPopulation, self).setUp()
+    self.api_helper = api_helper.Api()
+    factories.CustomAttributeDefinitionFactory(
+        title="program cad",
+        definition_type="program",
+        attribute_type="Text",
+    )
+
+  def _get_program_revisions(self):
+    """Get revisions of all programs and number of executed queries."""
+    with QueryCounter() as counter:
+      response = self.api_helper.get_query(all_models.Revision,
+                                           "resource_type=Program")
+      self.assert200(response)
+      return response.json["revisions_collection"]["revisions"], counter.get
+
+  def test_query_count(self):
+    """Number of queries does not depend on number of revisions."""
+    factories.ProgramFactory()
+    revisions, single_count = self._get_program_revisions()
+    self.assertEqual(len(revisions), 1)
+
+    with factories.single_commit():
+      for _ in range(4):
+        factories.ProgramFactory()
+    revisions, batch_count = self._get_program_revisions()
+    self.assertEqual(len(revisions), 5)
+
+    self.assertEqual(single_count, batch_count)
+
+  def test_populated_cads(self):
+    """Content of every revision contains CADs of the resource."""
+    with factories.single_commit():
+      for _ in range(3):
+        factories.ProgramFactory()
+    revisions, _ = self._get_program_revisions()
+    for revision in revisions:
+      self.assertEqual(
+          [cad["title"]
+           for cad in revision["content"]["custom_attribute_definitions"]],
+          ["program cad"],
+      )
@@ -2,8 +2,11 @@
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
 """Tests of assessment notifications."""
+import mock
+
 from ggrc import db
 from ggrc.notifications import common
+from ggrc.notifications import data_handlers
 from ggrc.models import Person, Assessment, AccessControlRole
 from ggrc.models import all_models
 from integration.ggrc import api_helper
@@ -175,6 +178,43 @@ class TestAssessmentNotification(TestCase):
     self.assertEqual(updated[self.assessment.id]["updated_fields"],
                      ["PRIMARY CONTACTS", "SECONDARY CONTACTS"])
 
+  @mock.patch("ggrc.settings.DIGEST_BATCH_SIZE", 1)
+  @mock.patch("ggrc.notifications.common.send_email")
+  def test_digest_batches(self, send_email):
+    """Test daily digest is sent to recipients in batches"""
+    assignee_acr = all_models.AccessControlRole.query.filter_by(
+        object_type="Assessment",
+        name="Assignees",
+    ).first()
+    person_id = factories.PersonFactory(email="other@example.com").id
+    response = self.api.put(self.assessment, {
+        "access_control_list": [
+            acl_helper.get_acl_json(self.primary_role_id, self.auditor.id),
+            acl_helper.get_acl_json(assignee_acr.id, self.auditor.id),
+            acl_helper.get_acl_json(assignee_acr.id, person_id),
+        ],
+    })
+    self.assert200(response)
+    self.assertEqual(len(common.get_daily_notifications()[0]), 1)
+
+    with mock.patch.object(common, "render_digests",
+                           wraps=common.render_digests) as render_digests:
+      common.send_daily_digest_notifications()
+
+    # every batch holds data of its own recipient only
+    self.assertEqual(
+        sorted(email for call in render_digests.call_args_list
+               for email, _ in call[0][0]),
+        ["other@example.com", "user@example.com"],
+    )
+    self.assertEqual(render_digests.call_count, 2)
+    self.assertEqual(
+        sorted(call[0][0] for call in send_email.call_args_list),
+        ["other@example.com", "user@example.com"],
+    )
+    self.assertEqual(len(common.get_daily_notifications()[0]), 0)
+    self.assertEqual(all_models.NotificationHistory.query.count(), 1)
+
   def test_multiply_updates(self):
     """Test notification for multiply updates"""
     response = self.api.put(self.assessment, {"test_plan": "steps"})
@@ -189,6 +229,24 @@ class TestAssessmentNotification(TestCase):
     self.assertEqual(sorted(updated[self.assessment.id]["updated_fields"]),
                      ["ASSESSMENT PROCEDURE", "TITLE"])
 
+  def test_preloaded_revisions(self):
+    """Test preloaded revisions are the same as queried ones"""
+    # pylint: disable=protected-access
+    response = self.api.put(self.assessment, {"test_plan": "steps"})
+    self.assert200(response)
+    response = self.api.put(self.assessment, {"title": "new title"})
+    self.assert200(response)
+
+    notifs = common.get_daily_notifications()[0]
+    preloaded = data_handlers._preload_revisions(notifs)
+    self.assertEqual(len(preloaded), len(notifs))
+    assessment = Assessment.query.get(self.assessment.id)
+    for notif in notifs:
+      self.assertEqual(
+          preloaded[notif.object_type, notif.object_id, notif.created_at],
+          data_handlers._get_revisions(assessment, notif.created_at),
+      )
+
   def test_multiply_mapping(self):
     """Test notification for multiply mapping"""
     controls = [factories.ControlFactory() for _ in xrange(5)]
@@ -0,0 +1,72 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for ETags of collections derived from the data version."""
+
+import json
+
+from ggrc import db
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from appengine import base
+
+
+@base.with_memcache
+class TestCollectionEtag(TestCase):
+  """Tests for conditional GETs of collections."""
+
+  def setUp(self):
+    super(TestCollectionEtag, self).setUp()
+    self.client.get("/login")
+    with factories.single_commit():
+      self.control_id = factories.ControlFactory().id
+
+  def _get_controls(self, etag=None):
+    headers = {"If-None-Match": etag} if etag else {}
+    return self.client.get("/api/controls", headers=headers)
+
+  def _query_controls(self, etag=None):
+    headers = {"Content-Type": "application/json"}
+    if etag:
+      headers["If-None-Match"] = etag
+    return self.client.post(
+        "/query",
+        data=json.dumps([{"object_name": "Control", "type": "ids",
+                          "filters": {"expression": {}}}]),
+        headers=headers,
+    )
+
+  def _update_control(self):
+    control = all_models.Control.query.get(self.control_id)
+    control.title = "updated title"
+    db.session.commit()
+
+  def test_collection_not_modified(self):
+    """Unchanged collection is confirmed with 304."""
+    response = self._get_controls()
+    self.assert200(response)
+    etag = response.headers["Etag"]
+
+    response = self._get_controls(etag)
+    self.assertStatus(response, 304)
+    self.assertEqual(response.headers["Etag"], etag)
+
+  def test_collection_modified(self):
+    """Changed collection is sent again with a new ETag."""
+    etag = self._get_controls().headers["Etag"]
+    self._update_control()
+
+    response = self._get_controls(etag)
+    self.assert200(response)
+    self.assertNotEqual(response.headers["Etag"], etag)
+
+  def test_query_not_modified(self):
+    """Results of an unchanged query are confirmed with 304."""
+    response = self._query_controls()
+    self.assert200(response)
+    etag = response.headers["Etag"]
+
+    self.assertStatus(self._query_controls(etag), 304)
+    self._update_control()
+    self.assert200(self._query_controls(etag))
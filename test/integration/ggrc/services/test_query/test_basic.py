@@ -214,6 +214,64 @@ class TestAdvancedQueryAPI(WithQueryApi, TestCase):
 
     self.assertEqual(programs_limit["total"], programs_no_limit["total"])
 
+  def test_query_found_rows_paging(self):
+    """"found_rows" paging returns the same page and total."""
+    query = self._make_query_dict("Program",
+                                  expression=["title", "~", "Cat ipsum"],
+                                  order_by=[{"name": "title"}],
+                                  limit=[1, 12])
+    programs = self._get_first_result_set(query, "Program")
+    query["paging"] = "found_rows"
+    programs_found_rows = self._get_first_result_set(query, "Program")
+
+    self.assertEqual(programs_found_rows["total"], 23)
+    self.assertEqual(programs_found_rows["total"], programs["total"])
+    self.assertEqual(programs_found_rows["values"], programs["values"],
+                     sort_sublists=True)
+
+  @ddt.data(
+      [{"name": "title"}],
+      [{"name": "title", "desc": True}],
+      [{"name": "effective date"}, {"name": "title", "desc": True}],
+  )
+  def test_query_cursor_paging(self, order_by):
+    """Pages fetched with a cursor cover the whole ordered result."""
+    # Cursor pages are ordered by the sort keys and id
+    all_ids = self._get_first_result_set(
+        self._make_query_dict("Program", type_="ids",
+                              order_by=order_by + [{"name": "id"}]),
+        "Program", "ids",
+    )
+    page_ids = []
+    cursor = {"page_size": 5, "after": None}
+    while True:
+      query = self._make_query_dict("Program", type_="ids",
+                                    order_by=order_by)
+      query["cursor"] = cursor
+      page = self._get_first_result_set(query, "Program")
+      if cursor["after"] is None:
+        self.assertEqual(page["total"], len(all_ids))
+      else:
+        self.assertNotIn("total", page)
+      page_ids.extend(page["ids"])
+      if not page["next_cursor"]:
+        break
+      cursor = {"page_size": 5, "after": page["next_cursor"]}
+
+    self.assertEqual(page_ids, all_ids)
+
+  def test_query_invalid_cursor(self):
+    """Malformed cursor is a bad request."""
+    query = self._make_query_dict("Program")
+    query["cursor"] = {"page_size": 5, "after": "not a cursor"}
+    self.assert400(self._post(query))
+
+  def test_query_invalid_paging(self):
+    """Unknown paging mode is a bad request."""
+    query = self._make_query_dict("Program", limit=[0, 5])
+    query["paging"] = "unknown"
+    self.assert400(self._post(query))
+
   def test_query_limit(self):
     """The limit parameter trims the result set."""
     def make_query_dict(limit=None):
@@ -674,6 +732,27 @@ class TestAdvancedQueryAPI(WithQueryApi, TestCase):
 
     self.assertEqual(programs_values["count"], programs_count["count"])
 
+  @ddt.data(
+      ["id", "type", "title"],
+      ["id", "title", "selfLink", "viewLink", "context"],
+      ["id", "title", "custom_attribute_values"],
+      ["id", "slug", "modified_by", "not_an_attribute"],
+  )
+  def test_query_fields_projection(self, fields):
+    """Values limited by "fields" match the full representation."""
+    full_query = self._make_query_dict("Program")
+    full_values = self._get_first_result_set(full_query, "Program", "values")
+    projected_query = self._make_query_dict("Program")
+    projected_query["fields"] = fields
+    projected_values = self._get_first_result_set(projected_query,
+                                                   "Program", "values")
+
+    self.assertEqual(
+        [{field: value.get(field) for field in fields}
+         for value in full_values],
+        projected_values,
+    )
+
   @ddt.data("Regulation",
             "System",
             "Process",
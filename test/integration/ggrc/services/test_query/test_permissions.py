@@ -0,0 +1,64 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for permission filters of /query."""
+
+import mock
+
+from ggrc.models import all_models
+from integration.ggrc import TestCase
+from integration.ggrc import generator
+from integration.ggrc.api_helper import Api
+from integration.ggrc.models import factories
+
+
+class TestQueryPermissions(TestCase):
+  """Tests for filtering /query results by permission resources."""
+
+  def setUp(self):
+    super(TestQueryPermissions, self).setUp()
+    self.api = Api()
+    self.generator = generator.ObjectGenerator()
+    _, self.creator = self.generator.generate_person(user_role="Creator")
+    creator = all_models.Person.query.get(self.creator.id)
+    with factories.single_commit():
+      controls = [factories.ControlFactory() for _ in range(5)]
+    with factories.single_commit():
+      for control in controls[:3]:
+        factories.AccessControlPersonFactory(
+            ac_list=control.acr_name_acl_map["Admin"],
+            person=creator,
+        )
+    self.readable_ids = [control.id for control in controls[:3]]
+
+  def _query_control_ids(self):
+    """Query ids of controls as creator."""
+    self.api.set_user(self.creator)
+    response = self.api.send_request(
+        self.api.client.post,
+        data=[{
+            "object_name": "Control",
+            "filters": {"expression": {}},
+            "type": "ids",
+        }],
+        api_link="/query",
+    )
+    self.assert200(response)
+    return response.json[0]["Control"]["ids"]
+
+  def test_in_list(self):
+    """Small resource sets are filtered with IN list."""
+    self.assertItemsEqual(self._query_control_ids(), self.readable_ids)
+
+  @mock.patch("ggrc.query.utils.IN_LIST_LIMIT", 1)
+  def test_id_ranges(self):
+    """Large resource sets are filtered with id ranges."""
+    self.assertItemsEqual(self._query_control_ids(), self.readable_ids)
+
+  @mock.patch("ggrc.query.utils.IN_LIST_LIMIT", 1)
+  def test_acl_subquery(self):
+    """Large ACL resource sets are filtered with subquery on ACL."""
+    with mock.patch("ggrc.query.utils.structures.IdSet.ranges",
+                    return_value=[]) as ranges:
+      self.assertItemsEqual(self._query_control_ids(), self.readable_ids)
+    self.assertTrue(ranges.called)
@@ -0,0 +1,77 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for the batched cache of REST collection resources."""
+
+from ggrc.cache import resource_cache
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+from appengine import base
+
+
+@base.with_memcache
+class TestResourceCache(TestCase):
+  """Tests for cached collection GETs."""
+
+  def setUp(self):
+    super(TestResourceCache, self).setUp()
+    self.client.get("/login")
+    with factories.single_commit():
+      self.control_ids = [factories.ControlFactory().id for _ in range(3)]
+
+  def _get_controls(self):
+    """Get collection of controls and return hits and misses of the cache."""
+    response = self.client.get("/api/controls?id__in={}".format(
+        ",".join(str(id_) for id_ in self.control_ids)))
+    self.assert200(response)
+    self.assertEqual(len(response.json["controls_collection"]["controls"]),
+                     len(self.control_ids))
+    return (int(response.headers["X-GGRC-Cache-Hits"]),
+            int(response.headers["X-GGRC-Cache-Misses"]))
+
+  def test_cache_hits(self):
+    """Resources loaded from the database are cached for next requests."""
+    self.assertEqual(self._get_controls(), (0, 3))
+    self.assertEqual(self._get_controls(), (3, 0))
+
+  def test_only_misses_loaded(self):
+    """Only resources missing in the cache are loaded and written back."""
+    self._get_controls()
+    self.control_ids.append(factories.ControlFactory().id)
+    self.memcache_client.delete(resource_cache.ResourceCache.get_key(
+        (self.control_ids[0], "Control")))
+
+    self.assertEqual(self._get_controls(), (2, 2))
+    self.assertEqual(self._get_controls(), (4, 0))
+
+  def test_blocked_resources(self):
+    """Resources that are being modified are not read from the cache."""
+    self._get_controls()
+    key = resource_cache.ResourceCache.get_key(
+        (self.control_ids[0], "Control"))
+    self.memcache_client.add("DeleteOp:" + key, {"status": "InProgress"})
+
+    self.assertEqual(self._get_controls(), (2, 1))
+    self.assertEqual(self._get_controls(), (2, 1))
+
+  def test_blocked_before_write(self):
+    """Resources blocked after they were loaded are not written back."""
+    match = (self.control_ids[0], "Control")
+    key = resource_cache.ResourceCache.get_key(match)
+    cache = resource_cache.ResourceCache(self.memcache_client, {"Control"})
+    cache.get_multi([match])
+    self.memcache_client.add("DeleteOp:" + key, {"status": "InProgress"})
+
+    cache.set_multi({match: {"selfLink": "/api/controls/1"}})
+
+    self.assertIsNone(self.memcache_client.get(key))
+
+  def test_stats(self):
+    """Process counters of the cache are exposed to admins."""
+    before = resource_cache.STATS.as_dict()
+    self._get_controls()
+    self._get_controls()
+    response = self.client.get("/admin/cache_stats")
+    self.assert200(response)
+    self.assertEqual(response.json["hits"] - before["hits"], 3)
+    self.assertEqual(response.json["misses"] - before["misses"], 3)
@@ -0,0 +1,72 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Tests for keyset chunk iteration of queries."""
+
+import threading
+
+from ggrc import db
+from ggrc import utils
+from ggrc.models import all_models
+from ggrc.utils import revisions
+from integration.ggrc import TestCase
+from integration.ggrc.models import factories
+
+
+class TestQueryChunks(TestCase):
+  """Tests for chunks of queries."""
+
+  def setUp(self):
+    super(TestQueryChunks, self).setUp()
+    with factories.single_commit():
+      self.control_ids = [factories.ControlFactory().id for _ in range(7)]
+
+  def test_query_chunks(self):
+    """Chunks of a query contain every row once in order of ids."""
+    query = db.session.query(all_models.Control.title).filter(
+        all_models.Control.id.in_(self.control_ids[1:]))
+    chunks = [query_chunk.all() for query_chunk in
+              utils.generate_query_chunks(query, chunk_size=4)]
+
+    self.assertEqual([len(chunk) for chunk in chunks], [4, 2])
+    titles = [title for title, in db.session.query(
+        all_models.Control.title
+    ).filter(
+        all_models.Control.id.in_(self.control_ids[1:])
+    ).order_by(all_models.Control.id)]
+    self.assertEqual([title for chunk in chunks for title, in chunk], titles)
+
+  def test_id_chunks(self):
+    """Id chunks start after the given id."""
+    query = db.session.query(all_models.Control.id)
+    chunks = list(utils.iter_id_chunks(query, all_models.Control.id, 3,
+                                       after_id=self.control_ids[0]))
+    self.assertEqual([len(chunk) for chunk in chunks], [3, 3])
+    self.assertEqual(sum(chunks, []), self.control_ids[1:])
+
+  def test_parallel_chunks(self):
+    """Partitions of a query are handled by workers."""
+    handled = []
+    lock = threading.Lock()
+
+    def handler(query_chunk):
+      with lock:
+        handled.extend(id_ for id_, in query_chunk)
+
+    utils.process_query_chunks(
+        db.session.query(all_models.Control.id), handler,
+        chunk_size=2, workers=3,
+    )
+    self.assertEqual(sorted(handled), self.control_ids)
+
+  def test_latest_revisions(self):
+    """Latest revisions are found for every object of a type."""
+    result = revisions.get_revisions_by_type("Control", chunk_size=3)
+    latest = dict(db.session.query(
+        all_models.Revision.resource_id,
+        db.func.max(all_models.Revision.id),
+    ).filter(
+        all_models.Revision.resource_type == "Control",
+    ).group_by(all_models.Revision.resource_id))
+    self.assertEqual(result, latest)
+    self.assertEqual(sorted(result), self.control_ids)
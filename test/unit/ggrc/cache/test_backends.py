@@ -0,0 +1,156 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Test backends of the shared cache."""
+
+import socket
+import threading
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from ggrc.cache import backends
+from ggrc.cache import server
+
+
+class TestLocalBackend(unittest.TestCase):
+  """Test in-process LRU cache."""
+
+  def setUp(self):
+    self.backend = backends.LocalBackend(Mock(CACHE_LOCAL_MAX_ENTRIES=2,
+                                              CACHE_LOCAL_TTL=0))
+
+  def test_lru_eviction(self):
+    """Least recently used entries are evicted first."""
+    self.backend.set_multi({"a": 1, "b": 2})
+    self.assertEqual(self.backend.get("a"), 1)
+    self.backend.set("c", 3)
+    self.assertEqual(self.backend.get_multi(["a", "b", "c"]),
+                     {"a": 1, "c": 3})
+
+  def test_expiration(self):
+    """Expired entries are not returned."""
+    with patch("ggrc.cache.backends._now", return_value=100):
+      self.backend.set("a", 1, time=10)
+    with patch("ggrc.cache.backends._now", return_value=105):
+      self.assertEqual(self.backend.get("a"), 1)
+    with patch("ggrc.cache.backends._now", return_value=110):
+      self.assertIsNone(self.backend.get("a"))
+
+  def test_add(self):
+    """Add does not overwrite existing entries."""
+    self.assertTrue(self.backend.add("a", 1))
+    self.assertFalse(self.backend.add("a", 2))
+    self.assertEqual(self.backend.add_multi({"a": 3, "b": 4}), ["a"])
+    self.assertEqual(self.backend.get_multi(["a", "b"]), {"a": 1, "b": 4})
+
+  def test_delete(self):
+    """Delete reports missing keys like memcache."""
+    self.backend.set("a", 1)
+    self.assertEqual(self.backend.delete("a"), backends.DELETE_SUCCESSFUL)
+    self.assertEqual(self.backend.delete("a"), backends.DELETE_ITEM_MISSING)
+
+  def test_cas(self):
+    """Cas sets only values that did not change since they were read."""
+    self.backend.set("a", 1)
+    self.assertFalse(self.backend.cas("a", 2))
+    self.assertEqual(self.backend.gets("a"), 1)
+    self.backend.set("a", 3)
+    self.assertFalse(self.backend.cas("a", 2))
+    self.assertEqual(self.backend.gets("a"), 3)
+    self.assertTrue(self.backend.cas("a", 4))
+    self.assertEqual(self.backend.get("a"), 4)
+
+  def test_cas_multi(self):
+    """Cas_multi returns keys that changed since they were read."""
+    self.backend.set_multi({"a": 1, "b": 2})
+    self.backend.get_multi(["a", "b"], for_cas=True)
+    self.backend.set("b", 3)
+    self.assertEqual(self.backend.cas_multi({"a": 5, "b": 6}), ["b"])
+    self.assertEqual(self.backend.get_multi(["a", "b"]), {"a": 5, "b": 3})
+
+  def test_other_process(self):
+    """Backend is not usable from another process."""
+    with patch("os.getpid", return_value=-1):
+      with self.assertRaises(RuntimeError):
+        self.backend.client()
+
+  def test_values_copied(self):
+    """Cached values are not shared with the callers."""
+    value = {"a": [1]}
+    self.backend.set("a", value)
+    value["a"].append(2)
+    self.assertEqual(self.backend.get("a"), {"a": [1]})
+
+
+class TestSocketBackend(unittest.TestCase):
+  """Test client of the stand-in cache server."""
+
+  SECRET = "test secret"
+
+  def setUp(self):
+    self.server = server.CacheServer(
+        ("127.0.0.1", 0),
+        backends.LocalBackend(Mock(CACHE_LOCAL_MAX_ENTRIES=10,
+                                   CACHE_LOCAL_TTL=0)),
+        self.SECRET,
+    )
+    thread = threading.Thread(target=self.server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    host, port = self.server.server_address
+    self.client = backends.SocketBackend(Mock(CACHE_SERVER_HOST=host,
+                                              CACHE_SERVER_PORT=port,
+                                              SECRET_KEY=self.SECRET))
+
+  def tearDown(self):
+    self.client.close()
+    self.server.shutdown()
+    self.server.server_close()
+
+  def test_round_trip(self):
+    """Entries are shared through the server."""
+    self.assertEqual(self.client.set_multi({"a": 1, "b": 2}), [])
+    self.assertEqual(self.client.get_multi(["a", "b", "c"]),
+                     {"a": 1, "b": 2})
+    self.assertEqual(self.client.add_multi({"a": 3}), ["a"])
+    self.client.delete_multi(["a"])
+    self.assertEqual(self.client.get_multi(["a", "b"]), {"b": 2})
+
+  def test_cas(self):
+    """Cas versions are checked by the server."""
+    self.client.set("a", 1)
+    self.assertEqual(self.client.gets("a"), 1)
+    self.client.set("a", 2)
+    self.assertFalse(self.client.cas("a", 3))
+    self.assertEqual(self.client.gets("a"), 2)
+    self.assertTrue(self.client.cas("a", 3))
+    self.assertEqual(self.client.get("a"), 3)
+
+  def test_invalid_signature(self):
+    """Messages signed with another key are rejected."""
+    host, port = self.server.server_address
+    client = backends.SocketBackend(Mock(CACHE_SERVER_HOST=host,
+                                         CACHE_SERVER_PORT=port,
+                                         SECRET_KEY="other secret"))
+    self.assertEqual(client.set_multi({"a": 1}), ["a"])
+    self.assertEqual(self.client.get_multi(["a"]), {})
+    client.close()
+
+  def test_default_secret(self):
+    """Default secret key is not accepted."""
+    with self.assertRaises(ValueError):
+      backends.SocketBackend(Mock(SECRET_KEY=backends.DEFAULT_SECRET_KEY))
+
+  def test_server_unavailable(self):
+    """Calls fail like memcache calls when the server is down."""
+    unused = socket.socket()
+    unused.bind(("127.0.0.1", 0))
+    host, port = unused.getsockname()
+    unused.close()
+    client = backends.SocketBackend(Mock(CACHE_SERVER_HOST=host,
+                                         CACHE_SERVER_PORT=port,
+                                         SECRET_KEY=self.SECRET))
+    self.assertEqual(client.get_multi(["a"]), {})
+    self.assertEqual(client.set_multi({"a": 1}), ["a"])
@@ -185,3 +185,96 @@ class TestModelColumntHandler(unittest.TestCase):
       self.assertEqual(
           {"col_a": test_custom_handler, "col_b": test_handler},
           model_column_handlers(test_custom_class))
+
+
+class TestDependentBlockGroups(unittest.TestCase):
+
+  """Tests for grouping of csv blocks that depend on each other"""
+
+  @staticmethod
+  def _block(rows):
+    """Make data block tuple from csv rows without the object type line"""
+    data = [["Object type"]] + rows
+    return (0, data, data)
+
+  @mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL", None)
+  def test_independent_blocks(self):
+    """Blocks without common values are imported independently"""
+    data_blocks = [
+        self._block([["Program", "Code*", "Title"],
+                     ["", "PROGRAM-1", "program"]]),
+        self._block([["Market", "Code*", "Title"],
+                     ["", "MARKET-1", "market"]]),
+    ]
+    self.assertEqual([[0], [1]],
+                     import_helper.get_dependent_block_groups(data_blocks))
+
+  @mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL", None)
+  def test_mapped_blocks(self):
+    """Block mapping codes of another block depends on it"""
+    data_blocks = [
+        self._block([["Program", "Code*", "Title"],
+                     ["", "PROGRAM-1", "program"]]),
+        self._block([["Market", "Code*", "Title"],
+                     ["", "MARKET-1", "market"]]),
+        self._block([["Standard", "Code*", "map:program"],
+                     ["", "STANDARD-1", "program-1\nprogram-2"]]),
+    ]
+    self.assertEqual([[0, 2], [1]],
+                     import_helper.get_dependent_block_groups(data_blocks))
+
+  @mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL", None)
+  def test_same_object_type(self):
+    """Blocks of the same object type depend on each other"""
+    data_blocks = [
+        self._block([["Market", "Code*", "Title"],
+                     ["", "MARKET-1", "market"]]),
+        self._block([["Program", "Code*", "Title"],
+                     ["", "PROGRAM-1", "program"]]),
+        self._block([["Market", "Code*", "Title"],
+                     ["", "MARKET-2", "second market"]]),
+    ]
+    self.assertEqual([[0, 2], [1]],
+                     import_helper.get_dependent_block_groups(data_blocks))
+
+  def test_common_emails(self):
+    """Blocks with common emails depend on each other if people are created"""
+    data_blocks = [
+        self._block([["Program", "Code*", "Program Managers"],
+                     ["", "PROGRAM-1", "user@example.com"]]),
+        self._block([["Market", "Code*", "Admin"],
+                     ["", "MARKET-1", "user@example.com"]]),
+    ]
+    with mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL", None):
+      self.assertEqual([[0], [1]],
+                       import_helper.get_dependent_block_groups(data_blocks))
+    with mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL",
+                    "http://integration.example.com"):
+      self.assertEqual([[0, 1]],
+                       import_helper.get_dependent_block_groups(data_blocks))
+
+  @mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL", None)
+  def test_related_models(self):
+    """Blocks of related models depend on each other"""
+    data_blocks = [
+        self._block([["Audit", "Code*", "Title"],
+                     ["", "AUDIT-1", "audit"]]),
+        self._block([["Market", "Code*", "Title"],
+                     ["", "MARKET-1", "market"]]),
+        self._block([["Assessment", "Code*", "Title"],
+                     ["", "ASSESSMENT-1", "assessment"]]),
+    ]
+    self.assertEqual([[0, 2], [1]],
+                     import_helper.get_dependent_block_groups(data_blocks))
+
+  @mock.patch("ggrc.settings.INTEGRATION_SERVICE_URL", None)
+  def test_people_block(self):
+    """Block of people depends on blocks of models related to people"""
+    data_blocks = [
+        self._block([["Person", "Email*", "Name"],
+                     ["", "user@example.com", "user"]]),
+        self._block([["Market", "Code*", "Title"],
+                     ["", "MARKET-1", "market"]]),
+    ]
+    self.assertEqual([[0, 1]],
+                     import_helper.get_dependent_block_groups(data_blocks))
@@ -0,0 +1,54 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unittests for custom ORM data types."""
+
+import datetime
+import json
+import unittest
+
+from ggrc.models import types
+
+
+class TestCompactJsonType(unittest.TestCase):
+  """Tests for compact Json serialization."""
+
+  CONTENT = {
+      "title": u"Title \u2713",
+      "id": 3,
+      "archived": False,
+      "custom_attribute_values": [{"id": 1, "attribute_value": None}],
+  }
+
+  def test_round_trip(self):
+    """Compact data is deserialized into the same Json object."""
+    data = types.CompactJsonType.dumps(self.CONTENT)
+    self.assertTrue(types.CompactJsonType.is_compact(data))
+    self.assertEqual(types.CompactJsonType.loads(data), self.CONTENT)
+    self.assertEqual(
+        types.CompactJsonType.loads(types.CompactJsonType.dumps(
+            json.dumps(self.CONTENT))),
+        self.CONTENT,
+    )
+
+  def test_json_values(self):
+    """Values are stored as their Json representation."""
+    data = types.CompactJsonType.dumps({
+        "created_at": datetime.datetime(2018, 11, 13, 16, 27, 48),
+    })
+    self.assertEqual(types.CompactJsonType.loads(data),
+                     {"created_at": "2018-11-13T16:27:48"})
+
+  def test_loads_keys(self):
+    """Selected keys are loaded from compact and text data."""
+    expected = {"title": self.CONTENT["title"]}
+    self.assertEqual(
+        types.CompactJsonType.loads_keys(
+            types.CompactJsonType.dumps(self.CONTENT), ["title", "missing"]),
+        expected,
+    )
+    self.assertEqual(
+        types.CompactJsonType.loads_keys(
+            json.dumps(self.CONTENT), ["title", "missing"]),
+        expected,
+    )
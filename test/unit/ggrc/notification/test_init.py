@@ -12,18 +12,34 @@ from ggrc.notifications import common
 
 class TestNotificationsInit(unittest.TestCase):
 
-  @patch("ggrc.notifications.common.deleted_task_rels_cache")
-  @patch("ggrc.notifications.common.cycle_tasks_cache")
-  @patch("ggrc.notifications.common.get_filter_data")
-  def test_get_notification_data(self, get_filter_data, *cache_mocks):
+  @patch("ggrc.notifications.common.should_receive", return_value=True)
+  @patch("ggrc.notifications.common.load_people")
+  @patch("ggrc.notifications.common.get_services_data")
+  def test_get_notification_data(self, get_services_data, *_):
     """ Test that data does not contain empty emails """
-    for cache_func in cache_mocks:
-      cache_func.return_value = {}
-
-    get_filter_data.return_value = {
-        "email@example.com": {},
-        "": {},
+    data = {
+        "email@example.com": {"user": {"id": 1}},
+        "": {"user": {"id": 2}},
     }
+    get_services_data.return_value = [(1, data), (2, data)]
     notification_data = common.get_notification_data([1, 2])
     self.assertIn("email@example.com", notification_data)
     self.assertNotIn("", notification_data)
+
+  @patch("ggrc.notifications.common.NOTIFICATIONS_CHUNK_SIZE", 2)
+  @patch("ggrc.notifications.common.should_receive", return_value=True)
+  @patch("ggrc.notifications.common.load_people")
+  @patch("ggrc.notifications.common.get_services_data")
+  def test_notification_chunks(self, get_services_data, load_people, _):
+    """ Test that data of notifications is loaded in chunks """
+    get_services_data.side_effect = lambda chunk: [
+        (notif, {"{}@example.com".format(notif): {"user": {"id": notif}}})
+        for notif in chunk
+    ]
+    notification_data = common.get_notification_data([1, 2, 3])
+    self.assertEqual(get_services_data.call_count, 2)
+    self.assertEqual(load_people.call_count, 2)
+    self.assertEqual(
+        sorted(notification_data),
+        ["1@example.com", "2@example.com", "3@example.com"],
+    )
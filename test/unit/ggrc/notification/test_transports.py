@@ -0,0 +1,65 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Test transports of notification emails."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from mock import Mock
+from mock import patch
+
+from ggrc.notifications import transports
+
+
+class TestTransports(unittest.TestCase):
+  """Test sending of email batches by transports."""
+
+  def setUp(self):
+    self.directory = tempfile.mkdtemp()
+    self.settings = Mock(
+        APPENGINE_EMAIL="sender@example.com",
+        NOTIFICATION_FILE_DIR=self.directory,
+        NOTIFICATION_SMTP_HOST="smtp.example.com",
+        NOTIFICATION_SMTP_PORT=2525,
+    )
+    self.messages = [
+        ("user1@example.com", "Digest", u"<b>body 1</b>"),
+        ("user2@example.com", "Digest", u"<b>body 2 \u2713</b>"),
+    ]
+
+  def tearDown(self):
+    shutil.rmtree(self.directory)
+
+  @patch("ggrc.notifications.common.send_email")
+  def test_app_engine(self, send_email):
+    """App Engine transport sends every email of the batch."""
+    transports.AppEngineTransport(self.settings).send(self.messages)
+    self.assertEqual([call[0] for call in send_email.call_args_list],
+                     self.messages)
+
+  def test_file(self):
+    """File transport writes every email of the batch into a file."""
+    transports.FileTransport(self.settings).send(self.messages)
+    contents = []
+    for name in os.listdir(self.directory):
+      with open(os.path.join(self.directory, name)) as email_file:
+        contents.append(email_file.read())
+    self.assertEqual(len(contents), 2)
+    self.assertEqual(sorted("To: user1@example.com" in content
+                            for content in contents),
+                     [False, True])
+
+  @patch("smtplib.SMTP")
+  def test_smtp(self, smtp):
+    """Smtp transport sends the batch over a single connection."""
+    transports.SmtpTransport(self.settings).send(self.messages)
+    smtp.assert_called_once_with("smtp.example.com", 2525)
+    connection = smtp.return_value
+    self.assertEqual(
+        [call[0][1] for call in connection.sendmail.call_args_list],
+        [["user1@example.com"], ["user2@example.com"]],
+    )
+    connection.quit.assert_called_once_with()
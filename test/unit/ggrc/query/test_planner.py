@@ -0,0 +1,81 @@
+# Copyright (C) 2018 Google Inc.
+# Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
+
+"""Unit tests for the /query planner."""
+
+import unittest
+
+import mock
+
+from ggrc.query import planner
+
+
+class TestQueryPlanner(unittest.TestCase):
+  """Tests for QueryPlanner memoization."""
+
+  def setUp(self):
+    self.object_class = mock.MagicMock(__name__="Control")
+    self.query = [
+        {"object_name": "Program", "ids": [1, 2]},
+        {"object_name": "Control"},
+    ]
+    self.planner = planner.QueryPlanner(self.query)
+
+  def test_memoize(self):
+    """Value is computed only once for the same key."""
+    func = mock.MagicMock(return_value=[1, 2, 3])
+    self.assertEqual(self.planner.memoize("key", func), [1, 2, 3])
+    self.assertEqual(self.planner.memoize("key", func), [1, 2, 3])
+    func.assert_called_once_with()
+    self.assertEqual(self.planner.hits, 1)
+    self.assertEqual(self.planner.misses, 1)
+
+  def test_cheap_expression_not_memoized(self):
+    """Simple operators are always built directly."""
+    exp = {"op": {"name": "="}, "left": "title", "right": "a"}
+    func = mock.MagicMock()
+    self.planner.expression(exp, self.object_class, self.object_class, func)
+    self.planner.expression(exp, self.object_class, self.object_class, func)
+    self.assertEqual(func.call_count, 2)
+
+  def test_relevant_previous_shared(self):
+    """Relevant to __previous__ is shared with the same explicit filter."""
+    previous_exp = {
+        "op": {"name": "relevant"},
+        "object_name": "__previous__",
+        "ids": [0],
+    }
+    explicit_exp = {
+        "op": {"name": "relevant"},
+        "object_name": "Program",
+        "ids": [1, 2],
+    }
+    func = mock.MagicMock()
+    self.planner.expression(previous_exp, self.object_class,
+                            self.object_class, func)
+    self.planner.expression(explicit_exp, self.object_class,
+                            self.object_class, func)
+    func.assert_called_once_with()
+
+  def test_relevant_ids_order_ignored(self):
+    """Relevant filters differing only by order of ids are shared."""
+    func = mock.MagicMock()
+    for ids in ([2, 1], [1, 2, 2]):
+      exp = {"op": {"name": "relevant"}, "object_name": "Program",
+             "ids": ids}
+      self.planner.expression(exp, self.object_class, self.object_class,
+                              func)
+    func.assert_called_once_with()
+
+  def test_object_ids_ignore_result_type(self):
+    """Object queries differing only by result type are evaluated once."""
+    func = mock.MagicMock(return_value=([1], {"total": 1}))
+    values_query = {"object_name": "Control", "type": "values",
+                    "filters": {"expression": {}}}
+    ids_query = {"object_name": "Control", "type": "ids",
+                 "filters": {"expression": {}}}
+    self.assertEqual(self.planner.object_ids(0, values_query, func),
+                     ([1], {"total": 1}))
+    self.assertEqual(self.planner.object_ids(1, ids_query, func),
+                     ([1], {"total": 1}))
+    func.assert_called_once_with()
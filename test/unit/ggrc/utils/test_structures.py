@@ -1,6 +1,7 @@
 # Copyright (C) 2018 Google Inc.
 # Licensed under http://www.apache.org/licenses/LICENSE-2.0 <see LICENSE file>
 
+import pickle
 import unittest
 
 from ggrc.utils import structures
@@ -93,3 +94,49 @@ class TestCaseInsensitiveDefDict(unittest.TestCase):
         sorted(self.ci_dict.lower_items()),
         sorted([("hello", "World"), ("foo", "BAR")])
     )
+
+
+class TestIdSet(unittest.TestCase):
+  """Tests for compact id set."""
+
+  def test_membership(self):
+    """Ids are deduplicated, sorted and found with binary search."""
+    id_set = structures.IdSet([5, 3, 3, 9])
+    id_set.add(1)
+    self.assertEqual(list(id_set), [1, 3, 5, 9])
+    self.assertEqual(len(id_set), 4)
+    self.assertIn(3, id_set)
+    self.assertNotIn(4, id_set)
+    id_set.discard(3)
+    self.assertNotIn(3, id_set)
+
+  def test_union(self):
+    """Union merges ids without changing the operands."""
+    left = structures.IdSet([1, 3, 5])
+    right = structures.IdSet([2, 3, 6])
+    self.assertEqual(list(left | right), [1, 2, 3, 5, 6])
+    self.assertEqual(list(left.union([7], right)), [1, 2, 3, 5, 6, 7])
+    self.assertEqual(list(left), [1, 3, 5])
+    self.assertEqual(list(right | left | []), [1, 2, 3, 5, 6])
+
+  def test_ranges(self):
+    """Consecutive ids are grouped into ranges."""
+    id_set = structures.IdSet([7, 1, 2, 3, 5, 8])
+    self.assertEqual(id_set.ranges(), [(1, 3), (5, 5), (7, 8)])
+    self.assertEqual(structures.IdSet().ranges(), [])
+
+  def test_pickle(self):
+    """Pickled set keeps its ids."""
+    id_set = structures.IdSet(range(1000))
+    restored = pickle.loads(pickle.dumps(id_set, pickle.HIGHEST_PROTOCOL))
+    self.assertEqual(restored, id_set)
+    restored.add(1000)
+    self.assertIn(1000, restored)
+
+  def test_pickle_empty(self):
+    """Empty set can be pickled with every protocol."""
+    for protocol in range(pickle.HIGHEST_PROTOCOL + 1):
+      restored = pickle.loads(pickle.dumps(structures.IdSet(), protocol))
+      self.assertEqual(list(restored), [])
+      restored.add(1)
+      self.assertIn(1, restored)